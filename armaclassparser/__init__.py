@@ -1,30 +1,34 @@
 from armaclassparser import generator, lexer, parser, preprocessor
 
 
-def parse_from_file(file_path: str, pre_process=True):
+def parse_from_file(file_path: str, pre_process=True, class_filter=None, keep_tokens=True, typed_arrays=False,
+                    include_roots=None, token_spans=False):
     with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
         input_data = fp.read()
 
-    tokens = lexer.Lexer(input_data, file_path).tokenize()
+    tokens = lexer.Lexer(input_data, file_path, token_spans).tokenize()
 
     if pre_process:
-        pre_processor = preprocessor.PreProcessor(tokens, file_path)
+        pre_processor = preprocessor.PreProcessor(tokens, file_path, include_roots, token_spans)
         tokens = pre_processor.preprocess()
 
-    p = parser.Parser(tokens, file_path)
+    p = parser.Parser(tokens, file_path, class_filter=class_filter, keep_tokens=keep_tokens,
+                      typed_arrays=typed_arrays)
     ast = p.parse()
 
     return ast
 
 
-def parse_from_string(input_data: str, pre_process=True):
-    tokens = lexer.Lexer(input_data, lexer.STRING_INPUT_FILE).tokenize()
+def parse_from_string(input_data: str, pre_process=True, class_filter=None, keep_tokens=True, typed_arrays=False,
+                      include_roots=None, token_spans=False):
+    tokens = lexer.Lexer(input_data, lexer.STRING_INPUT_FILE, token_spans).tokenize()
 
     if pre_process:
-        pre_processor = preprocessor.PreProcessor(tokens, lexer.STRING_INPUT_FILE)
+        pre_processor = preprocessor.PreProcessor(tokens, lexer.STRING_INPUT_FILE, include_roots, token_spans)
         tokens = pre_processor.preprocess()
 
-    p = parser.Parser(tokens, lexer.STRING_INPUT_FILE)
+    p = parser.Parser(tokens, lexer.STRING_INPUT_FILE, class_filter=class_filter, keep_tokens=keep_tokens,
+                      typed_arrays=typed_arrays)
     ast = p.parse()
 
     return ast
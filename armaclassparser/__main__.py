@@ -0,0 +1,5 @@
+import sys
+
+from armaclassparser.cli import main
+
+sys.exit(main())
@@ -0,0 +1,163 @@
+import asyncio
+import functools
+
+import armaclassparser
+from armaclassparser.batch import BatchResult, _largest_first
+from armaclassparser.errors import BatchParsingError
+
+
+def _parse_file(file_path: str, **kwargs) -> list:
+    return armaclassparser.parse_from_file(file_path, **kwargs)
+
+
+def _parse_string(input_data: str, **kwargs) -> list:
+    return armaclassparser.parse_from_string(input_data, **kwargs)
+
+
+class _Unlimited:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _ParseResults:
+    def __init__(self, parser, paths, pre_process: bool, class_filter, keep_tokens: bool, typed_arrays: bool):
+        # asynchronous iterator of the results of AsyncParser.parse_many(), asynchronous generators need Python 3.6
+        self.parser = parser
+        self.paths = paths
+        self.options = pre_process, class_filter, keep_tokens, typed_arrays
+        self._tasks = None
+        self._completed = None
+
+    async def _parse(self, file_path: str) -> BatchResult:
+        try:
+            ast = await self.parser.parse_file(file_path, *self.options)
+            return BatchResult(file_path, ast, None)
+        except asyncio.CancelledError:
+            # an Exception before Python 3.8, cancelled files must not be reported as failed
+            raise
+        except Exception as e:
+            return BatchResult(file_path, None, BatchParsingError(file_path, type(e).__name__, str(e)))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> BatchResult:
+        if self._tasks is None:
+            loop = asyncio.get_event_loop()
+            paths = await loop.run_in_executor(None, _largest_first, list(self.paths))
+            self._tasks = [asyncio.ensure_future(self._parse(file_path)) for file_path in paths]
+            self._completed = iter(asyncio.as_completed(self._tasks))
+        task = next(self._completed, None)
+        if task is None:
+            raise StopAsyncIteration
+        try:
+            return await task
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """
+        Cancels the files which have not been parsed yet, call it when stopping the iteration early.
+        """
+        for task in self._tasks or []:
+            task.cancel()
+
+
+class AsyncParser:
+    def __init__(self, executor=None, max_concurrency=None):
+        """
+        Parses configs without blocking the event loop. Reading, lexing, pre-processing (including reading the
+        included files) and parsing run in the executor. A parser is meant to be shared, e.g., by all requests of a
+        service, so that max_concurrency bounds the number of parses running at the same time.
+
+        :param executor: concurrent.futures.Executor - runs the parsing, None for the default executor of the loop.
+                         With a ProcessPoolExecutor the parsed ASTs are pickled, so keep_tokens=False is recommended.
+        :param max_concurrency: int - maximum number of files parsed at the same time, None for no limit
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('parameter max_concurrency must be positive, got {}'.format(max_concurrency))
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    def _limit(self):
+        # created lazily, as it has to be created inside the running loop on older Python versions
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else _Unlimited()
+        return self._semaphore
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        async with self._limit():
+            return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def parse_file(self, file_path: str, pre_process=True, class_filter=None, keep_tokens=True,
+                         typed_arrays=False) -> list:
+        """
+        See armaclassparser.parse_from_file().
+
+        :return: list of AST nodes - the top-level nodes of the config
+        """
+        return await self._run(_parse_file, file_path, pre_process=pre_process, class_filter=class_filter,
+                               keep_tokens=keep_tokens, typed_arrays=typed_arrays)
+
+    async def parse_string(self, input_data: str, pre_process=True, class_filter=None, keep_tokens=True,
+                           typed_arrays=False) -> list:
+        """
+        See armaclassparser.parse_from_string().
+
+        :return: list of AST nodes - the top-level nodes of the config
+        """
+        return await self._run(_parse_string, input_data, pre_process=pre_process, class_filter=class_filter,
+                               keep_tokens=keep_tokens, typed_arrays=typed_arrays)
+
+    def parse_many(self, paths, pre_process=True, class_filter=None, keep_tokens=False, typed_arrays=False):
+        """
+        Parses many files, the largest ones first, and yields the results as they complete. A file that cannot be
+        parsed yields a result with an error instead of aborting, see batch.parse_many(). Call aclose() on the
+        iterator to cancel the remaining files when stopping early.
+
+        :param paths: iterable of strings - the files to parse
+        :return: asynchronous iterator of BatchResult
+        """
+        return _ParseResults(self, paths, pre_process, class_filter, keep_tokens, typed_arrays)
+
+
+_default_parser = AsyncParser()
+
+
+async def parse_file_async(file_path: str, pre_process=True, class_filter=None, keep_tokens=True, typed_arrays=False,
+                           parser=None) -> list:
+    """
+    Shortcut for AsyncParser.parse_file().
+
+    :param parser: AsyncParser - the parser to use, None for a shared one using the default executor
+    """
+    return await (parser or _default_parser).parse_file(file_path, pre_process, class_filter, keep_tokens,
+                                                        typed_arrays)
+
+
+async def parse_string_async(input_data: str, pre_process=True, class_filter=None, keep_tokens=True,
+                             typed_arrays=False, parser=None) -> list:
+    """
+    Shortcut for AsyncParser.parse_string().
+
+    :param parser: AsyncParser - the parser to use, None for a shared one using the default executor
+    """
+    return await (parser or _default_parser).parse_string(input_data, pre_process, class_filter, keep_tokens,
+                                                          typed_arrays)
+
+
+def parse_many_async(paths, max_concurrency=8, executor=None, pre_process=True, class_filter=None, keep_tokens=False,
+                     typed_arrays=False):
+    """
+    Shortcut for AsyncParser(executor, max_concurrency).parse_many().
+
+    :return: asynchronous iterator of BatchResult
+    """
+    return AsyncParser(executor, max_concurrency).parse_many(paths, pre_process, class_filter, keep_tokens,
+                                                             typed_arrays)
@@ -1,6 +1,12 @@
+import functools
+import sys
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
 from enum import Enum
 
-from armaclassparser.lexer import Token, TokenType
+from armaclassparser.lexer import Token, TokenType, source_text
 
 
 class ASTNodeType(Enum):
@@ -14,17 +20,49 @@ class ASTNodeType(Enum):
     EXTERNAL_CLASS_REFERENCE = 'EXTERNAL_CLASS_REFERENCE'
 
 
+# string values up to this length are interned, longer ones are usually unique texts such as descriptions
+INTERN_MAX_LENGTH = 64
+
+# number of lower-case names cached by lower_name(), the cache is bounded so that long-running processes (e.g.,
+# incremental.IncrementalParser.watch()) do not keep every name they have ever seen alive
+LOWER_NAME_CACHE_SIZE = 65536
+
+
+def parse_number(value: str):
+    return float(value) if '.' in value else int(value)
+
+
+def intern_value(value: str) -> str:
+    return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+
+
+@functools.lru_cache(maxsize=LOWER_NAME_CACHE_SIZE)
+def lower_name(name: str) -> str:
+    # lower-case version of a class or property name, cached and interned so that all lookups share one object
+    return sys.intern(name.lower())
+
+
+def _node_class(node) -> type:
+    # the class of node defined in this module, subclasses defined elsewhere (e.g., rap.LazyClassDefinition) only
+    # change how a node is loaded and compare equal to their base class
+    cls = type(node)
+    while cls.__module__ != __name__:
+        cls = cls.__base__
+    return cls
+
+
 class ASTNode:
-    def __init__(self, node_type: ASTNodeType, tokens: list, line_no: int, line_pos: int):
+    __slots__ = ('type', 'tokens', 'line_no', 'line_pos', 'parent', '_shared_parents', '_hash')
+
+    def __init__(self, node_type: ASTNodeType, tokens, line_no: int, line_pos: int):
+        # tokens is None for slim nodes, which only keep their start position and values
         if node_type is None:
             raise TypeError('parameter node_type cannot be None')
-        if tokens is None:
-            raise TypeError('parameter tokens cannot be None')
         if line_no is None:
             raise TypeError('parameter line_no cannot be None')
         if line_pos is None:
             raise TypeError('parameter line_pos cannot be None')
-        if len(tokens) == 0:
+        if tokens is not None and len(tokens) == 0:
             raise ValueError('parameter tokens cannot be empty')
         if line_no <= 0:
             raise ValueError('parameter line_no must be greater than 0')
@@ -35,9 +73,20 @@ class ASTNode:
         self.tokens = tokens
         self.line_no = line_no
         self.line_pos = line_pos
+        self.parent = None
+        # the parents of other trees sharing this node, e.g., classes merged by merge.merge_classes()
+        self._shared_parents = None
+        self._hash = None
 
     def __eq__(self, other):
         if isinstance(other, ASTNode):
+            if self.tokens is None or other.tokens is None:
+                # at least one slim node, compare the values instead
+                return self.type == other.type \
+                       and self.line_no == other.line_no \
+                       and self.line_pos == other.line_pos \
+                       and _node_class(self) is _node_class(other) \
+                       and str(self) == str(other)
             return self.type == other.type \
                    and self.tokens == other.tokens \
                    and self.line_no == other.line_no \
@@ -45,17 +94,95 @@ class ASTNode:
         else:
             return False
 
+    def __hash__(self):
+        # consistent with __eq__ and stable when the node is modified, see structural_hash() for comparing structures
+        return hash((self.type, self.line_no, self.line_pos))
+
+    def _structure(self) -> tuple:
+        # (values, child nodes) that make up the structure of this node, independent of any positions
+        return (), ()
+
+    def structural_hash(self) -> int:
+        # cached, call invalidate() on the modified node and all of its ancestors after modifying the tree
+        if self._hash is None:
+            values, children = self._structure()
+            self._hash = hash((self.type, _node_class(self).__name__, values,
+                               tuple(child.structural_hash() for child in children)))
+        return self._hash
+
+    def invalidate(self):
+        self._hash = None
+
+    def mark_dirty(self):
+        # call after modifying this node, invalidates the node and all of its ancestors, in all trees sharing them
+        pending = [self]
+        visited = set()
+        while pending:
+            node = pending.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            node.invalidate()
+            if node.parent is not None:
+                pending.append(node.parent)
+            for parent in node._shared_parents or ():
+                if isinstance(parent, weakref.ref):
+                    parent = parent()
+                if parent is not None:
+                    pending.append(parent)
+
+    def _share(self, parent):
+        # classes are referenced weakly, so that classes merged again and again do not stay alive through the nodes
+        # they shared
+        shared_parents = [shared for shared in self._shared_parents or ()
+                          if not isinstance(shared, weakref.ref) or shared() is not None]
+        for shared in shared_parents:
+            if (shared() if isinstance(shared, weakref.ref) else shared) is parent:
+                break
+        else:
+            shared_parents.append(weakref.ref(parent) if isinstance(parent, ClassDefinition) else parent)
+        self._shared_parents = shared_parents
+
+    def _adopt(self, children):
+        for child in children:
+            if child.parent is None:
+                child.parent = self
+            elif child.parent is not self:
+                child._share(self)
+
+    @classmethod
+    def _new_slim(cls, node_type: ASTNodeType, line_no: int, line_pos: int):
+        node = cls.__new__(cls)
+        ASTNode.__init__(node, node_type, None, line_no, line_pos)
+        return node
+
 
 class StringLiteral(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, tokens: list):
         ASTNode.__init__(self, ASTNodeType.STRING_LITERAL, tokens, tokens[0].line_no, tokens[0].line_pos)
-        self.value = ''.join(token.value for token in tokens[1:-1])
+        value = source_text(tokens[1:-1])
+        if value is None:
+            value = ''.join(token.value for token in tokens[1:-1])
+        self.value = intern_value(value)
+
+    @classmethod
+    def from_values(cls, value: str, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.STRING_LITERAL, line_no, line_pos)
+        node.value = value
+        return node
+
+    def _structure(self) -> tuple:
+        return (self.value,), ()
 
     def __str__(self):
         return '"{}"'.format(self.value)
 
 
 class Constant(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, number_token: Token):
         if number_token is None:
             raise TypeError('parameter number_token cannot be None')
@@ -63,13 +190,25 @@ class Constant(ASTNode):
             raise ValueError('parameter number_token must be of type {}'.format(TokenType.NUMBER))
 
         ASTNode.__init__(self, ASTNodeType.CONSTANT, [number_token], number_token.line_no, number_token.line_pos)
-        self.value = float(number_token.value) if '.' in number_token.value else int(number_token.value)
+        self.value = parse_number(number_token.value)
+
+    @classmethod
+    def from_values(cls, value, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.CONSTANT, line_no, line_pos)
+        node.value = value
+        return node
+
+    def _structure(self) -> tuple:
+        # 1 and 1.0 are equal in python, but not in the generated config
+        return (isinstance(self.value, float), self.value), ()
 
     def __str__(self):
         return str(self.value)
 
 
 class Identifier(ASTNode):
+    __slots__ = ('name_token', 'value')
+
     def __init__(self, name_token: Token):
         if name_token is None:
             raise TypeError('parameter name_token cannot be None')
@@ -80,11 +219,23 @@ class Identifier(ASTNode):
         self.name_token = name_token
         self.value = name_token.value
 
+    @classmethod
+    def from_values(cls, value: str, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.IDENTIFIER, line_no, line_pos)
+        node.name_token = None
+        node.value = value
+        return node
+
+    def _structure(self) -> tuple:
+        return (self.value,), ()
+
     def __str__(self):
         return '{}'.format(self.value)
 
 
 class ArrayDeclaration(ASTNode):
+    __slots__ = ('identifier',)
+
     def __init__(self, identifier: Identifier, left_bracket_token: Token, right_bracket_token: Token):
         if identifier is None:
             raise TypeError('parameter identifier cannot be None')
@@ -101,12 +252,43 @@ class ArrayDeclaration(ASTNode):
                          identifier.tokens + [left_bracket_token, right_bracket_token], identifier.line_no,
                          identifier.line_pos)
         self.identifier = identifier
+        self._adopt((identifier,))
+
+    @classmethod
+    def from_values(cls, identifier: Identifier):
+        node = cls._new_slim(ASTNodeType.ARRAY_DECLARATION, identifier.line_no, identifier.line_pos)
+        node.identifier = identifier
+        node._adopt((identifier,))
+        return node
+
+    def _structure(self) -> tuple:
+        return (), (self.identifier,)
 
     def __str__(self):
         return '{}[]'.format(self.identifier.value)
 
 
+class NumericChildren(Sequence):
+    __slots__ = ('values', 'line_no', 'line_pos')
+
+    def __init__(self, values: array, line_no: int, line_pos: int):
+        # read-only view that presents the elements of a typed array as slim Constants
+        self.values = values
+        self.line_no = line_no
+        self.line_pos = line_pos
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Constant.from_values(value, self.line_no, self.line_pos) for value in self.values[index]]
+        return Constant.from_values(self.values[index], self.line_no, self.line_pos)
+
+
 class Array(ASTNode):
+    __slots__ = ('_children', 'values')
+
     def __init__(self, left_curly_token: Token, children: list, right_curly_token: Token):
         if left_curly_token is None:
             raise TypeError('parameter left_curly_token cannot be None')
@@ -123,7 +305,79 @@ class Array(ASTNode):
                          left_curly_token.line_pos)
         self.children = children
 
+    @classmethod
+    def from_values(cls, children: list, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.ARRAY, line_no, line_pos)
+        node.children = children
+        return node
+
+    @classmethod
+    def from_numbers(cls, values: array, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.ARRAY, line_no, line_pos)
+        node._children = None
+        node.values = values
+        return node
+
+    @property
+    def children(self):
+        if self.values is not None:
+            return NumericChildren(self.values, self.line_no, self.line_pos)
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self.values = None
+        self._adopt(children)
+
+    def pack(self, numbers=None) -> bool:
+        # stores arrays consisting only of integers or only of floats in a typed buffer (8 bytes per element) instead
+        # of Constant nodes, returns True if the array is packed afterwards. If numbers is given, it replaces the
+        # current children.
+        if numbers is None:
+            if self.values is not None:
+                return True
+            if not all(type(child) is Constant for child in self._children):
+                return False
+            numbers = [child.value for child in self._children]
+        if len(numbers) == 0:
+            return False
+
+        if all(type(number) is int for number in numbers):
+            try:
+                self.values = array('q', numbers)
+            except OverflowError:
+                return False
+        elif all(type(number) is float for number in numbers):
+            self.values = array('d', numbers)
+        else:
+            return False
+        self._children = None
+        self._hash = None
+        return True
+
+    def numpy(self):
+        # zero-copy numpy view of a packed array
+        if self.values is None:
+            raise ValueError('array is not packed')
+        import numpy
+        return numpy.frombuffer(self.values, dtype=numpy.float64 if self.values.typecode == 'd' else numpy.int64)
+
+    def structural_hash(self) -> int:
+        if self._hash is None and self.values is not None:
+            # same hash as the unpacked array, without creating Constant nodes
+            is_float = self.values.typecode == 'd'
+            constant_hashes = tuple(hash((ASTNodeType.CONSTANT, Constant.__name__, (is_float, value), ()))
+                                    for value in self.values)
+            self._hash = hash((self.type, type(self).__name__, (), constant_hashes))
+        return ASTNode.structural_hash(self)
+
+    def _structure(self) -> tuple:
+        return (), self.children
+
     def __str__(self):
+        if self.values is not None:
+            return '{' + ','.join(map(str, self.values)) + '}'
         strings = ["{"]
         child_strings = []
         for child in self.children:
@@ -134,6 +388,8 @@ class Array(ASTNode):
 
 
 class Assignment(ASTNode):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left: ASTNode, equals_token: Token, right: ASTNode, semicolon_token: Token):
         if left is None:
             raise TypeError('parameter left cannot be None')
@@ -154,33 +410,109 @@ class Assignment(ASTNode):
                          equals_token.line_pos)
         self.left = left
         self.right = right
+        self._adopt((left, right))
+
+    @classmethod
+    def from_values(cls, left: ASTNode, right: ASTNode, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.ARRAY_DECLARATION, line_no, line_pos)
+        node.left = left
+        node.right = right
+        node._adopt((left, right))
+        return node
+
+    @property
+    def name(self) -> str:
+        if isinstance(self.left, ArrayDeclaration):
+            return self.left.identifier.value
+        return self.left.value
+
+    def _structure(self) -> tuple:
+        return (), (self.left, self.right)
 
     def __str__(self):
         return '{} = {};\n'.format(self.left, self.right)
 
 
 class IncludeStatement(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, include_token: Token, string_literal: StringLiteral):
         ASTNode.__init__(self, ASTNodeType.INCLUDE_STATEMENT, [include_token] + string_literal.tokens,
                          include_token.line_no, include_token.line_pos)
         self.value = string_literal.value
 
+    @classmethod
+    def from_values(cls, value: str, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.INCLUDE_STATEMENT, line_no, line_pos)
+        node.value = value
+        return node
+
+    def _structure(self) -> tuple:
+        return (self.value,), ()
+
     def __str__(self):
         return '#include "{}"'.format(self.value)
 
 
 class ClassDefinition(ASTNode):
+    __slots__ = ('class_name', 'parent_class', '_body', '_index', '_output', '__weakref__')
+
     def __init__(self, class_keyword_token: Token, class_name_token: Token, body, parent_class_token: Token):
         tokens = [class_keyword_token, class_name_token] + ([parent_class_token] if parent_class_token else [])
         ASTNode.__init__(self, ASTNodeType.CLASS_DEFINITION, tokens, class_keyword_token.line_no,
                          class_keyword_token.line_pos)
         self.class_name = class_name_token.value
         self.parent_class = parent_class_token.value if parent_class_token else None
+        self._index = None
+        self._output = None
         self.body = body
 
+    @classmethod
+    def from_values(cls, class_name: str, body: list, parent_class, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.CLASS_DEFINITION, line_no, line_pos)
+        node.class_name = class_name
+        node.parent_class = parent_class
+        node._index = None
+        node._output = None
+        node.body = body
+        return node
+
+    @property
+    def body(self):
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        self._body = body
+        self._adopt(body)
+
+    @property
+    def index(self):
+        # built on first access, call invalidate_index() after modifying body
+        if self._index is None:
+            self._index = BodyIndex(self.body)
+        return self._index
+
+    def invalidate_index(self):
+        self._index = None
+
+    def invalidate(self):
+        ASTNode.invalidate(self)
+        self._index = None
+        self._output = None
+
+    def _structure(self) -> tuple:
+        return (self.class_name, self.parent_class), self.body
+
+    def get_class(self, name: str):
+        return self.index.get_class(name)
+
+    def get_property(self, name: str):
+        return self.index.get_property(name)
+
     def __str__(self):
         strings = ["class " + self.class_name]
-        strings += [self.parent_class] if self.parent_class else []
+        strings += [" : " + self.parent_class] if self.parent_class else []
         strings += [" {\n"]
         for child in self.body:
             strings.append(str(child))
@@ -189,12 +521,70 @@ class ClassDefinition(ASTNode):
 
 
 class ExternalClassReference(ASTNode):
+    __slots__ = ('class_name',)
+
     def __init__(self, class_keyword_token: Token, class_name_token: Token):
         tokens = [class_keyword_token, class_name_token]
         ASTNode.__init__(self, ASTNodeType.EXTERNAL_CLASS_REFERENCE, tokens, class_keyword_token.line_no,
                          class_keyword_token.line_pos)
         self.class_name = class_name_token.value
 
+    @classmethod
+    def from_values(cls, class_name: str, line_no: int, line_pos: int):
+        node = cls._new_slim(ASTNodeType.EXTERNAL_CLASS_REFERENCE, line_no, line_pos)
+        node.class_name = class_name
+        return node
+
+    def _structure(self) -> tuple:
+        return (self.class_name,), ()
+
     def __str__(self):
         strings = ["class ", self.class_name, ";\n"]
         return ''.join(strings)
+
+
+def structurally_equal(a, b) -> bool:
+    """
+    Compares two AST nodes (or lists of AST nodes) by their structure, ignoring tokens and positions. Subtrees with
+    different structural hashes are rejected without comparing them.
+
+    :param a: ASTNode or list of ASTNodes
+    :param b: ASTNode or list of ASTNodes
+    :return: True if both have the same structure, False otherwise
+    """
+    if a is b:
+        return True
+    if isinstance(a, (list, tuple, NumericChildren)) and isinstance(b, (list, tuple, NumericChildren)):
+        return len(a) == len(b) and all(structurally_equal(x, y) for x, y in zip(a, b))
+    if not isinstance(a, ASTNode) or not isinstance(b, ASTNode) or _node_class(a) is not _node_class(b):
+        return False
+    if a.structural_hash() != b.structural_hash():
+        return False
+
+    values_a, children_a = a._structure()
+    values_b, children_b = b._structure()
+    return values_a == values_b and structurally_equal(children_a, children_b)
+
+
+class BodyIndex:
+    __slots__ = ('classes', 'properties')
+
+    def __init__(self, nodes: list):
+        # maps lower-case names to classes/properties in declaration order, later definitions replace earlier ones,
+        # but a forward declaration never replaces an actual class definition (OrderedDict as plain dicts are not
+        # ordered on Python 3.5)
+        self.classes = OrderedDict()
+        self.properties = OrderedDict()
+        for node in nodes:
+            if isinstance(node, ClassDefinition):
+                self.classes[lower_name(node.class_name)] = node
+            elif isinstance(node, ExternalClassReference):
+                self.classes.setdefault(lower_name(node.class_name), node)
+            elif isinstance(node, Assignment):
+                self.properties[lower_name(node.name)] = node
+
+    def get_class(self, name: str):
+        return self.classes.get(lower_name(name))
+
+    def get_property(self, name: str):
+        return self.properties.get(lower_name(name))
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import armaclassparser
+from armaclassparser import serialize
+from armaclassparser.errors import BatchParsingError
+
+EXTENSIONS = ('.cpp', '.hpp', '.sqm')
+
+
+class BatchResult:
+    __slots__ = ('file_path', 'ast', 'error')
+
+    def __init__(self, file_path: str, ast, error):
+        """
+        :param file_path: string - the parsed file
+        :param ast: list of AST nodes - the top-level nodes of the config, None if parsing failed
+        :param error: BatchParsingError - the reason parsing failed, None on success
+        """
+        self.file_path = file_path
+        self.ast = ast
+        self.error = error
+
+    def __repr__(self):
+        return '<BatchResult {} {}>'.format(self.file_path, 'failed' if self.error else 'ok')
+
+
+def _parse_file(file_path: str, pre_process: bool, class_filter, typed_arrays: bool, include_roots,
+                serialized=False) -> tuple:
+    # runs in the worker processes, exceptions are turned into strings as not all of them can be pickled. The ASTs of
+    # workers are sent in the compact binary format, which is far smaller than pickling the nodes.
+    try:
+        ast = armaclassparser.parse_from_file(file_path, pre_process=pre_process, class_filter=class_filter,
+                                              keep_tokens=False, typed_arrays=typed_arrays,
+                                              include_roots=include_roots)
+        return file_path, serialize.dumps(ast) if serialized else ast, None
+    except Exception as e:
+        return file_path, None, (type(e).__name__, str(e))
+
+
+def _result(file_path: str, ast, error) -> BatchResult:
+    if error is not None:
+        error = BatchParsingError(file_path, *error)
+    elif isinstance(ast, bytes):
+        ast = serialize.loads(ast)
+    return BatchResult(file_path, ast, error)
+
+
+def _largest_first(paths) -> list:
+    def size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+
+    return sorted(paths, key=size, reverse=True)
+
+
+def parse_many(paths, jobs=None, pre_process=True, class_filter=None, typed_arrays=False, include_roots=None):
+    """
+    Parses many files in parallel processes. Results are yielded as soon as they are available, in no particular order.
+    The largest files are started first, so that a few big configs do not delay the end of the batch. A file that
+    cannot be parsed, or whose worker process dies, yields a result with an error instead of aborting the batch.
+    Closing the iterator early cancels the files that have not been started yet. The ASTs are slim (see
+    parser.Parser's keep_tokens) and are transferred between processes in the format of serialize.BinaryWriter.
+
+    :param paths: iterable of strings - the files to parse
+    :param jobs: int - number of worker processes, None for one per CPU, 1 to parse in the calling process
+    :param pre_process: bool - if True, the files are pre-processed
+    :param class_filter: ClassPathFilter, string or list of strings - only parse the matching classes
+    :param typed_arrays: bool - if True, numeric arrays are packed, see parser.Parser
+    :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+    :return: iterator of BatchResult
+    """
+    if jobs is not None and jobs < 1:
+        raise ValueError('parameter jobs must be positive, got {}'.format(jobs))
+    paths = _largest_first(paths)
+
+    if jobs == 1 or len(paths) <= 1:
+        for file_path in paths:
+            yield _result(*_parse_file(file_path, pre_process, class_filter, typed_arrays, include_roots))
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(paths))) as executor:
+        futures = {executor.submit(_parse_file, file_path, pre_process, class_filter, typed_arrays, include_roots,
+                                   True): file_path for file_path in paths}
+        try:
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    result = _result(*future.result())
+                except Exception as e:
+                    # the worker died (e.g., killed by the OOM killer, which breaks the whole pool) or the result could
+                    # not be transferred
+                    result = BatchResult(file_path, None, BatchParsingError(file_path, type(e).__name__, str(e)))
+                yield result
+        finally:
+            # if the caller stops early, only wait for the files that are already being parsed
+            for future in futures:
+                future.cancel()
+
+
+def find_files(directory: str, extensions=EXTENSIONS) -> list:
+    """
+    :param directory: string - the directory to search, including all of its sub-directories
+    :param extensions: tuple of strings - the file extensions to include (case-insensitive)
+    :return: list of strings - the paths of all matching files, sorted
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    paths = []
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if file_name.lower().endswith(extensions):
+                paths.append(os.path.join(root, file_name))
+    return sorted(paths)
+
+
+def parse_directory(directory: str, jobs=None, extensions=EXTENSIONS, pre_process=True, class_filter=None,
+                    typed_arrays=False, include_roots=None):
+    """
+    Parses all configs in a directory tree, e.g., a mod, see parse_many().
+
+    :param directory: string - the directory to search, including all of its sub-directories
+    :param jobs: int - number of worker processes, None for one per CPU, 1 to parse in the calling process
+    :param extensions: tuple of strings - the file extensions to parse
+    :param pre_process: bool - if True, the files are pre-processed
+    :param class_filter: ClassPathFilter, string or list of strings - only parse the matching classes
+    :param typed_arrays: bool - if True, numeric arrays are packed, see parser.Parser
+    :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+    :return: iterator of BatchResult
+    """
+    return parse_many(find_files(directory, extensions), jobs, pre_process, class_filter, typed_arrays, include_roots)
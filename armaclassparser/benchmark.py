@@ -0,0 +1,343 @@
+import gc
+import math
+import os
+import platform
+import tempfile
+import time
+
+from armaclassparser import generator, lexer, parser, preprocessor, profiling, serialize
+
+REPORT_FORMAT = 1
+
+STAGES = ('lex', 'preprocess', 'parse', 'generate', 'load')
+
+SCALES = (1, 2, 4, 8, 16)
+
+
+def generate_deep_inheritance(classes: int, depth: int) -> str:
+    """
+    CfgVehicles with chains of classes inheriting from each other, each with a few properties and nested turrets.
+
+    :param classes: int - total number of vehicle classes
+    :param depth: int - length of each inheritance chain
+    :return: string - the config
+    """
+    lines = ['class CfgVehicles {', '    class All;']
+    for index in range(classes):
+        parent = 'All' if index % depth == 0 else 'Vehicle_{}'.format(index - 1)
+        lines += [
+            '    class Vehicle_{} : {} {{'.format(index, parent),
+            '        scope = {};'.format(2 if index % 3 else 1),
+            '        displayName = "Vehicle {}";'.format(index),
+            '        armor = {}.5;'.format(100 + index),
+            '        hiddenSelections[] = {"camo1", "camo2"};',
+            '        class Turrets {',
+            '            class MainTurret {',
+            '                gunnerType = "Crew_{}";'.format(index % 7),
+            '                weapons[] = {"Cannon", "MG"};',
+            '            };',
+            '        };',
+            '    };',
+        ]
+    lines.append('};')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_numeric_arrays(arrays: int, length: int) -> str:
+    """
+    :param arrays: int - number of array properties
+    :param length: int - number of elements of each array, alternating between integers and floats
+    :return: string - the config
+    """
+    lines = ['class CfgSurfaces {']
+    for index in range(arrays):
+        values = ', '.join(str(i) if i % 2 else '{}.25'.format(i) for i in range(length))
+        lines.append('    values_{}[] = {{{}}};'.format(index, values))
+    lines.append('};')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_macro_header(usages: int) -> str:
+    """
+    CBA-style header with macros that are used many times, e.g., to define items of a box.
+
+    :param usages: int - number of macro usages
+    :return: string - the config
+    """
+    lines = [
+        '#define SCOPE_PUBLIC 2',
+        '#define QUOTE(var) #var',
+        '#define POS(x,y,z) {x,y,z}',
+        '#define ITEM(NAME,COUNT) class NAME { name = QUOTE(NAME); count = COUNT; position[] = POS(COUNT,0,1); '
+        'scope = SCOPE_PUBLIC; }',
+        '#ifdef DEBUG_MODE',
+        '#define LOG_LEVEL 3',
+        '#else',
+        '#define LOG_LEVEL 0',
+        '#endif',
+        'class CfgVehicles {',
+        '    class Box {',
+        '        logLevel = LOG_LEVEL;',
+        '        class TransportItems {',
+    ]
+    for index in range(usages):
+        lines.append('            ITEM(item_{},{});'.format(index, index % 10))
+    lines += ['        };', '    };', '};']
+    return '\n'.join(lines) + '\n'
+
+
+def generate_mission(entities: int) -> str:
+    """
+    mission.sqm-like list of entities.
+
+    :param entities: int - number of entities
+    :return: string - the mission
+    """
+    lines = ['version = 53;', 'class Mission {', '    class Entities {', '        items = {};'.format(entities)]
+    for index in range(entities):
+        lines += [
+            '        class Item{} {{'.format(index),
+            '            dataType = "Object";',
+            '            class PositionInfo {',
+            '                position[] = {{{}.125, 5.0, {}.75}};'.format(1000 + index, 2000 + index),
+            '                angles[] = {0, 1.5707964, 0};',
+            '            };',
+            '            side = "West";',
+            '            flags = 6;',
+            '            class Attributes {',
+            '                isPlayable = {};'.format(index % 2),
+            '            };',
+            '            id = {};'.format(index),
+            '            type = "B_Soldier_F";',
+            '        };',
+        ]
+    lines += ['    };', '};']
+    return '\n'.join(lines) + '\n'
+
+
+def write_include_fanout(directory: str, files: int, classes_per_file: int) -> str:
+    """
+    Writes a config.cpp that includes many headers, each defining some classes.
+
+    :param directory: string - the directory to write the files into
+    :param files: int - number of included files
+    :param classes_per_file: int - number of classes in each included file
+    :return: string - path of the config.cpp
+    """
+    includes = []
+    for file_index in range(files):
+        file_name = 'Cfg_{}.hpp'.format(file_index)
+        lines = []
+        for class_index in range(classes_per_file):
+            lines.append('class Item_{}_{} {{ scope = 2; mass = {}; }};'.format(file_index, class_index, class_index))
+        _write(os.path.join(directory, file_name), '\n'.join(lines) + '\n')
+        includes.append('    #include "{}"'.format(file_name))
+    config = 'class CfgPatches { class fanout { units[] = {}; }; };\nclass CfgWeapons {\n' + \
+             '\n'.join(includes) + '\n};\n'
+    return _write(os.path.join(directory, 'config.cpp'), config)
+
+
+def _write(file_path: str, content: str) -> str:
+    with open(file_path, 'w', encoding='utf-8') as fp:
+        fp.write(content)
+    return file_path
+
+
+# workloads at scale 1, each writes its input into a directory and returns the path of the file to parse
+WORKLOADS = {
+    'deep_inheritance': lambda scale, directory: _write(os.path.join(directory, 'inheritance.cpp'),
+                                                        generate_deep_inheritance(200 * scale, 10)),
+    'numeric_arrays': lambda scale, directory: _write(os.path.join(directory, 'arrays.cpp'),
+                                                      generate_numeric_arrays(20 * scale, 500)),
+    'macro_header': lambda scale, directory: _write(os.path.join(directory, 'macros.cpp'),
+                                                    generate_macro_header(100 * scale)),
+    'include_fanout': lambda scale, directory: write_include_fanout(directory, 20 * scale, 10),
+    'mission': lambda scale, directory: _write(os.path.join(directory, 'mission.sqm'), generate_mission(100 * scale)),
+}
+
+# smaller versions of the workloads for measure_scaling(), macro_expansions and includes scale only the number of macro
+# usages and included files
+SCALING_SCENARIOS = {
+    'deep_inheritance': lambda scale, directory: _write(os.path.join(directory, 'inheritance.cpp'),
+                                                        generate_deep_inheritance(12 * scale, 6)),
+    'numeric_arrays': lambda scale, directory: _write(os.path.join(directory, 'arrays.cpp'),
+                                                      generate_numeric_arrays(3 * scale, 100)),
+    'macro_expansions': lambda scale, directory: _write(os.path.join(directory, 'macros.cpp'),
+                                                        generate_macro_header(100 * scale)),
+    'includes': lambda scale, directory: write_include_fanout(directory, 20 * scale, 5),
+    'mission': lambda scale, directory: _write(os.path.join(directory, 'mission.sqm'), generate_mission(8 * scale)),
+}
+
+
+def time_stages(file_path: str, repeat=3, include_roots=None, token_spans=False) -> dict:
+    """
+    Times each stage of parsing a file separately: Lexer.tokenize, PreProcessor.preprocess, Parser.parse,
+    generator.from_ast and serialize.loads, which is what a cache hit costs instead of parsing. Reading the file and
+    serializing the config are not timed.
+
+    :param file_path: string - the file to parse
+    :param repeat: int - number of runs, the best time of each stage is reported
+    :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+    :param token_spans: bool - if True, the tokens reference the input instead of holding their values, see lexer.Lexer
+    :return: dict - 'size' (characters), 'tokens' (after pre-processing) and 'stages' (maps stages to seconds)
+    """
+    if repeat < 1:
+        raise ValueError('parameter repeat must be positive, got {}'.format(repeat))
+    with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+        input_data = fp.read()
+
+    best = {}
+
+    def lap(stage, start):
+        now = time.perf_counter()
+        best[stage] = min(best.get(stage, now - start), now - start)
+        return now
+
+    # like timeit, the garbage collector is disabled so that its pauses are not attributed to a random stage
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tokens = lexer.Lexer(input_data, file_path, token_spans).tokenize()
+            start = lap('lex', start)
+            tokens = preprocessor.PreProcessor(tokens, file_path, include_roots, token_spans).preprocess()
+            start = lap('preprocess', start)
+            ast = parser.Parser(tokens, file_path).parse()
+            start = lap('parse', start)
+            generator.from_ast(ast)
+            lap('generate', start)
+            data = serialize.dumps(ast)
+            start = time.perf_counter()
+            serialize.loads(data)
+            lap('load', start)
+            token_count = len(tokens)
+            del tokens, ast, data
+            gc.collect()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {'size': len(input_data), 'tokens': token_count, 'stages': {stage: best[stage] for stage in STAGES}}
+
+
+def _measure(file_path: str, repeat: int, include_roots, memory: bool) -> dict:
+    result = time_stages(file_path, repeat, include_roots)
+    if memory:
+        # a separate run, as tracing allocations distorts the timings
+        stages = profiling.profile_file(file_path, include_roots=include_roots)
+        result['memory'] = {stage.stage: stage.to_dict() for stage in stages}
+    return result
+
+
+def run_suite(scale=1, repeat=3, workloads=None, memory=False) -> dict:
+    """
+    Runs the synthetic workloads and times each stage, see time_stages().
+
+    :param scale: int - multiplies the size of each workload
+    :param repeat: int - number of runs per workload, the best time of each stage is reported
+    :param workloads: list of strings - names of the workloads to run (see WORKLOADS), None for all
+    :param memory: bool - if True, the results also contain the 'memory' of each stage, see profiling.profile_memory()
+    :return: dict - the report, can be stored as JSON and compared with compare()
+    """
+    names = list(WORKLOADS) if workloads is None else list(workloads)
+    for name in names:
+        if name not in WORKLOADS:
+            raise ValueError('unknown workload {}, expected one of {}'.format(repr(name), ', '.join(WORKLOADS)))
+
+    results = {}
+    for name in names:
+        with tempfile.TemporaryDirectory() as directory:
+            results[name] = _measure(WORKLOADS[name](scale, directory), repeat, None, memory)
+    return _report(results, repeat, scale=scale)
+
+
+def run_files(paths, repeat=3, include_roots=None, memory=False) -> dict:
+    """
+    Like run_suite(), but times real configs instead of the synthetic workloads.
+
+    :param paths: iterable of strings - the files to time
+    :param repeat: int - number of runs per file, the best time of each stage is reported
+    :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+    :param memory: bool - if True, the results also contain the 'memory' of each stage, see profiling.profile_memory()
+    :return: dict - the report, the results are keyed by file path
+    """
+    return _report({file_path: _measure(file_path, repeat, include_roots, memory) for file_path in paths}, repeat)
+
+
+def _report(results: dict, repeat: int, **extra) -> dict:
+    report = {
+        'format': REPORT_FORMAT,
+        'python': '{} {}'.format(platform.python_implementation(), platform.python_version()),
+        'repeat': repeat,
+    }
+    report.update(extra)
+    report['results'] = results
+    return report
+
+
+def compare(baseline: dict, report: dict) -> dict:
+    """
+    :param baseline: dict - an earlier report of run_suite()
+    :param report: dict - the current report
+    :return: dict - maps the workloads in both reports to {stage: current time / baseline time}, values above 1 are
+             slowdowns. If both reports contain memory profiles, the ratios of the peak memory are added as
+             'memory.<stage>'.
+    """
+    ratios = {}
+    for name, result in report['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None:
+            continue
+        ratios[name] = {stage: seconds / baseline_result['stages'][stage] if baseline_result['stages'][stage] else None
+                        for stage, seconds in result['stages'].items() if stage in baseline_result['stages']}
+        baseline_memory = baseline_result.get('memory', {})
+        for stage, memory in result.get('memory', {}).items():
+            if stage in baseline_memory:
+                baseline_peak = baseline_memory[stage]['peak']
+                ratios[name]['memory.' + stage] = memory['peak'] / baseline_peak if baseline_peak else None
+    return ratios
+
+
+def growth_exponent(sizes, seconds) -> float:
+    """
+    Fits seconds = c * size ^ k with least squares on the log-log values. Linear stages have k close to 1, n log n
+    stages slightly above 1 (about 1.1 between 1x and 16x of a few thousand tokens) and quadratic ones close to 2.
+
+    :param sizes: list of numbers - the input sizes, at least two different ones
+    :param seconds: list of floats - the time measured for each size
+    :return: float - the exponent k
+    """
+    if len(sizes) != len(seconds) or len(set(sizes)) < 2:
+        raise ValueError('expected the times of at least two different sizes')
+    xs = [math.log(size) for size in sizes]
+    # clamp to the timer resolution, a stage that takes no measurable time has no growth
+    ys = [math.log(max(value, 1e-9)) for value in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+
+
+def measure_scaling(workload, scales=SCALES, repeat=3) -> dict:
+    """
+    Times the stages of a workload at several sizes and fits how each stage grows with the input, see
+    growth_exponent().
+
+    :param workload: function - called with the scale and a directory, writes the input and returns the path of the
+                     file to parse, e.g., one of SCALING_SCENARIOS or WORKLOADS
+    :param scales: list of ints - the sizes to measure, as multiples of the smallest workload
+    :param repeat: int - number of runs per size, the best time of each stage is used
+    :return: dict - 'scales', 'tokens' (after pre-processing, per scale), 'stages' (maps stages to the times per scale)
+             and 'exponents' (maps stages to their growth exponent)
+    """
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as directory:
+            results.append(time_stages(workload(scale, directory), repeat))
+    stages = {stage: [result['stages'][stage] for result in results] for stage in STAGES}
+    return {
+        'scales': list(scales),
+        'tokens': [result['tokens'] for result in results],
+        'stages': stages,
+        'exponents': {stage: growth_exponent(scales, seconds) for stage, seconds in stages.items()},
+    }
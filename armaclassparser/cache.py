@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+
+from armaclassparser import serialize
+from armaclassparser.classfilter import ClassPathFilter
+from armaclassparser.errors import SerializationError
+from armaclassparser.incremental import parse_with_dependencies
+from armaclassparser.preprocessor import content_hash
+
+CACHE_VERSION = 3
+
+# an entry is the length of the JSON encoded dependencies, the dependencies and the serialized AST
+_HEADER = struct.Struct('<I')
+
+
+def _stat(file_path: str):
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _is_current(file_path: str, stat, expected_hash: str) -> bool:
+    current_stat = _stat(file_path)
+    if current_stat is None:
+        return False
+    if current_stat == stat:
+        return True
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+            return content_hash(fp.read()) == expected_hash
+    except (OSError, ValueError):
+        return False
+
+
+class ParseCache:
+    def __init__(self, directory: str):
+        """
+        Persistent cache of parsed configs. An entry stays valid as long as the parsed file and all files it includes
+        have the same content, which is checked using the include graph recorded while parsing. The cached ASTs are
+        slim (see parser.Parser's keep_tokens) and stored in the format of serialize.BinaryWriter. Entries contain no
+        pickled data, so loading them from a shared directory cannot execute code.
+
+        :param directory: string - the directory to store the cache entries in, created if necessary
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_path(self, file_path: str, options: tuple) -> str:
+        key = repr((CACHE_VERSION, os.path.abspath(file_path), options)).encode('utf-8')
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest() + '.cache')
+
+    @staticmethod
+    def _options(pre_process, class_filter, typed_arrays, include_roots) -> tuple:
+        if isinstance(class_filter, ClassPathFilter):
+            class_filter = class_filter.patterns
+        elif isinstance(class_filter, str):
+            class_filter = [class_filter]
+        return (bool(pre_process), tuple(class_filter) if class_filter else None, bool(typed_arrays),
+                tuple(os.path.abspath(include_root) for include_root in include_roots or []))
+
+    def _load(self, entry_path: str):
+        try:
+            with open(entry_path, 'rb') as fp:
+                data = fp.read()
+            length = _HEADER.unpack_from(data)[0]
+            end = _HEADER.size + length
+            # [[file path, modification time, size, content hash], ...], see _store()
+            dependencies = json.loads(data[_HEADER.size:end].decode('utf-8'))
+            for file_path, mtime_ns, size, expected_hash in dependencies:
+                stat = None if mtime_ns is None else (mtime_ns, size)
+                if not _is_current(file_path, stat, expected_hash):
+                    return None
+        except (OSError, struct.error, ValueError, TypeError):
+            return None
+        try:
+            return serialize.loads(memoryview(data)[end:])
+        except SerializationError:
+            return None
+
+    def _store(self, entry_path: str, dependencies: dict, ast: list):
+        header = []
+        for file_path, expected_hash in dependencies.items():
+            stat = _stat(file_path) or (None, None)
+            header.append([file_path, stat[0], stat[1], expected_hash])
+        header = json.dumps(header).encode('utf-8')
+        # write to a temporary file first, so that concurrent readers never see a partial entry
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as fp:
+                # the AST is stored in the compact binary format, it is only decoded if the entry is still valid
+                fp.write(_HEADER.pack(len(header)))
+                fp.write(header)
+                fp.write(serialize.dumps(ast))
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def parse_file(self, file_path: str, pre_process=True, class_filter=None, typed_arrays=False, include_roots=None,
+                   timings=None) -> list:
+        """
+        Returns the cached AST of a file or parses it and stores the result, see armaclassparser.parse_from_file().
+
+        :param timings: dict - if set, the seconds spent looking up the cache ('cache') and parsing are added
+        :return: list of AST nodes - the top-level nodes of the config
+        """
+        timings = timings if timings is not None else {}
+        entry_path = self._entry_path(file_path, self._options(pre_process, class_filter, typed_arrays, include_roots))
+        start = time.perf_counter()
+        ast = self._load(entry_path)
+        timings['cache'] = timings.get('cache', 0.0) + time.perf_counter() - start
+        if ast is not None:
+            self.hits += 1
+            return ast
+
+        self.misses += 1
+        ast, error, dependencies = parse_with_dependencies(file_path, pre_process, class_filter, False, typed_arrays,
+                                                           include_roots, timings)
+        if error is not None:
+            raise error
+        self._store(entry_path, dependencies, ast)
+        return ast
@@ -0,0 +1,128 @@
+from armaclassparser.ast import lower_name
+
+ANY_NAME = '*'
+ANY_DEPTH = '**'
+SEPARATOR = '/'
+
+# marker state: an ancestor class matched a pattern completely, so its whole subtree is kept
+MATCHED = 'MATCHED'
+
+
+class ClassPathFilter:
+    def __init__(self, patterns):
+        """
+        Filter for class paths, used to only parse parts of a config. A pattern is a list of class names separated by
+        '/', e.g., 'CfgVehicles/*/Turrets/**'. Each segment is either a class name (matched case-insensitive), '*' which
+        matches exactly one class of any name or '**' which matches any number of classes (including none). A class is
+        kept if its path matches one of the patterns, if one of its ancestors matches or if one of its descendants might
+        still match.
+
+        :param patterns: string or list of strings - the pattern(s) to match, e.g., 'CfgPatches'
+        """
+        if patterns is None:
+            raise TypeError('parameter patterns cannot be None')
+        if isinstance(patterns, str):
+            patterns = [patterns]
+
+        self.patterns = [self._compile(pattern) for pattern in patterns]
+        if len(self.patterns) == 0:
+            raise ValueError('parameter patterns cannot be empty')
+
+    @staticmethod
+    def _compile(pattern: str) -> tuple:
+        """
+        Splits a pattern into its segments, class names are lower-cased.
+
+        :param pattern: string - the pattern, e.g., 'CfgVehicles/*/Turrets/**'
+        :return: tuple of strings - the segments of the pattern
+        """
+        segments = []
+        for segment in pattern.strip(SEPARATOR).split(SEPARATOR):
+            segment = segment.strip()
+            if len(segment) == 0:
+                raise ValueError('empty class name in pattern {}'.format(repr(pattern)))
+            if segment in [ANY_NAME, ANY_DEPTH]:
+                segments.append(segment)
+            else:
+                segments.append(lower_name(segment))
+        return tuple(segments)
+
+    def _closure(self, positions) -> frozenset:
+        """
+        Extends a set of (pattern index, segment index) positions by all positions reachable by letting '**' match
+        nothing.
+
+        :param positions: iterable of tuples - the positions inside the patterns
+        :return: frozenset of tuples - the positions including all reachable ones
+        """
+        result = set()
+        pending = list(positions)
+        while pending:
+            position = pending.pop()
+            if position in result:
+                continue
+            result.add(position)
+            pattern_index, segment_index = position
+            segments = self.patterns[pattern_index]
+            if segment_index < len(segments) and segments[segment_index] == ANY_DEPTH:
+                pending.append((pattern_index, segment_index + 1))
+        return frozenset(result)
+
+    def _state(self, positions):
+        if len(positions) == 0:
+            return None
+        for pattern_index, segment_index in positions:
+            if segment_index == len(self.patterns[pattern_index]):
+                return MATCHED
+        return positions
+
+    def initial_state(self):
+        """
+        :return: the state for the top-level of a config
+        """
+        return self._state(self._closure((pattern_index, 0) for pattern_index in range(len(self.patterns))))
+
+    def advance(self, state, class_name: str):
+        """
+        Computes the state of a class based on the state of the scope it is defined in.
+
+        :param state: the state of the enclosing scope, as returned by initial_state() or advance()
+        :param class_name: string - the name of the class
+        :return: MATCHED if the class and all of its children are to be kept, None if the class is to be skipped or
+                 a state to be used for the children of the class otherwise
+        """
+        if state is MATCHED:
+            return MATCHED
+        if state is None:
+            return None
+
+        name = lower_name(class_name)
+        positions = []
+        for pattern_index, segment_index in state:
+            segments = self.patterns[pattern_index]
+            if segment_index == len(segments):
+                continue
+            segment = segments[segment_index]
+            if segment == ANY_DEPTH:
+                positions.append((pattern_index, segment_index))
+            elif segment == ANY_NAME or segment == name:
+                positions.append((pattern_index, segment_index + 1))
+
+        return self._state(self._closure(positions))
+
+    def matches(self, class_path) -> bool:
+        """
+        Checks whether a class is kept by this filter.
+
+        :param class_path: string or list of strings - the path of the class, e.g., 'CfgVehicles/Car/Turrets'
+        :return: True if the class is kept, False otherwise
+        """
+        if isinstance(class_path, str):
+            class_path = class_path.strip(SEPARATOR).split(SEPARATOR)
+
+        state = self.initial_state()
+        for class_name in class_path:
+            state = self.advance(state, class_name)
+            if state is None:
+                return False
+        return True
@@ -0,0 +1,277 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from armaclassparser import benchmark, generator, lexer, preprocessor
+from armaclassparser.batch import EXTENSIONS, find_files
+from armaclassparser.cache import ParseCache
+from armaclassparser.export import dump_json
+from armaclassparser.incremental import parse_with_dependencies
+
+STAGES = ('read', 'lex', 'preprocess', 'parse', 'cache', 'output')
+
+# the parse caches of this process by directory, so that each worker opens a cache only once
+_caches = {}
+
+
+class FileResult:
+    __slots__ = ('file_path', 'output', 'error', 'timings', 'cache_hit')
+
+    def __init__(self, file_path: str, output, error, timings: dict, cache_hit: bool):
+        """
+        :param file_path: string - the processed file
+        :param output: string - the output of the command for this file, None if processing failed
+        :param error: string - the reason processing failed, None on success
+        :param timings: dict - maps stages to the seconds spent in them
+        :param cache_hit: bool - True if the AST was taken from the cache
+        """
+        self.file_path = file_path
+        self.output = output
+        self.error = error
+        self.timings = timings
+        self.cache_hit = cache_hit
+
+
+def _lap(timings: dict, stage: str, start: float) -> float:
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + now - start
+    return now
+
+
+def _preprocess(file_path: str, options: dict, timings: dict) -> str:
+    start = time.perf_counter()
+    with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+        input_data = fp.read()
+    start = _lap(timings, 'read', start)
+    tokens = lexer.Lexer(input_data, file_path).tokenize()
+    start = _lap(timings, 'lex', start)
+    tokens = preprocessor.PreProcessor(tokens, file_path, options['include_roots']).preprocess()
+    start = _lap(timings, 'preprocess', start)
+    output = generator.from_tokens(tokens)
+    _lap(timings, 'output', start)
+    return output
+
+
+def _cache(directory: str) -> ParseCache:
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = ParseCache(directory)
+    return cache
+
+
+def _parse(file_path: str, options: dict, timings: dict) -> tuple:
+    # returns the AST and whether it was taken from the cache
+    if options['cache_dir'] is not None:
+        cache = _cache(options['cache_dir'])
+        hits = cache.hits
+        ast = cache.parse_file(file_path, options['pre_process'], options['class_filter'], options['typed_arrays'],
+                               options['include_roots'], timings)
+        return ast, cache.hits > hits
+
+    ast, error, _ = parse_with_dependencies(file_path, options['pre_process'], options['class_filter'], False,
+                                            options['typed_arrays'], options['include_roots'], timings)
+    if error is not None:
+        raise error
+    return ast, False
+
+
+def process_file(file_path: str, command: str, options: dict) -> FileResult:
+    """
+    Runs a command on a single file, used by the worker processes.
+
+    :param file_path: string - the file to process
+    :param command: string - 'parse', 'preprocess' or 'dump-json'
+    :param options: dict - the parsed command line options
+    :return: FileResult
+    """
+    timings = {}
+    cache_hit = False
+    try:
+        if command == 'preprocess':
+            output = _preprocess(file_path, options, timings)
+        else:
+            ast, cache_hit = _parse(file_path, options, timings)
+            start = time.perf_counter()
+            if command == 'dump-json':
+                fp = io.StringIO()
+                dump_json(ast, fp, casefold=options['casefold'], preserve_order=not options['sort_keys'],
+                          indent=options['indent'])
+                output = fp.getvalue() + '\n'
+            elif command == 'parse' and not options['check']:
+                output = generator.from_ast(ast, indent=' ' * options['indent'] if options['indent'] else '')
+            else:
+                output = ''
+            _lap(timings, 'output', start)
+        return FileResult(file_path, output, None, timings, cache_hit)
+    except Exception as e:
+        return FileResult(file_path, None, '{}: {}'.format(type(e).__name__, e), timings, cache_hit)
+
+
+def _expand_paths(paths: list) -> list:
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result += find_files(path, EXTENSIONS)
+        else:
+            result.append(path)
+    return result
+
+
+def _run(command: str, paths: list, options: dict, jobs: int):
+    # yields the results in the order of paths
+    if jobs == 1 or len(paths) <= 1:
+        for file_path in paths:
+            yield process_file(file_path, command, options)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+        futures = [executor.submit(process_file, file_path, command, options) for file_path in paths]
+        try:
+            for file_path, future in zip(paths, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # the worker died (which breaks the whole pool) or the result could not be transferred, see
+                    # batch.parse_many()
+                    result = FileResult(file_path, None, '{}: {}'.format(type(e).__name__, e), {}, False)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _print_stats(results: list, elapsed: float):
+    file = sys.stderr
+    totals = {}
+    for result in results:
+        for stage, seconds in result.timings.items():
+            totals[stage] = totals.get(stage, 0.0) + seconds
+    print('files: {}, failed: {}, cache hits: {}, wall time: {:.3f}s'.format(
+        len(results), sum(1 for result in results if result.error is not None),
+        sum(1 for result in results if result.cache_hit), elapsed), file=file)
+    for stage in STAGES:
+        if stage in totals:
+            print('  {:<10} {:>9.3f}s'.format(stage, totals[stage]), file=file)
+
+
+def _bench(args) -> dict:
+    if args.paths:
+        report = benchmark.run_files(_expand_paths(args.paths), args.repeat, args.include_roots, args.memory)
+    else:
+        report = benchmark.run_suite(args.scale, args.repeat, args.workloads, args.memory)
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as fp:
+            report['comparison'] = benchmark.compare(json.load(fp), report)
+    return report
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    paths_help = 'config files or directories to search for {} files'.format('/'.join(EXTENSIONS))
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-j', '--jobs', type=int, default=1, help='number of parallel processes, 0 for one per CPU')
+    common.add_argument('--include-root', action='append', default=[], dest='include_roots', metavar='DIR',
+                        help=r'directory to resolve absolute includes (\z\...) in, can be repeated')
+    common.add_argument('--stats', action='store_true', help='print per-stage timings to stderr')
+
+    ast_options = argparse.ArgumentParser(add_help=False)
+    ast_options.add_argument('--cache-dir', metavar='DIR', help='directory for a persistent cache of parsed files')
+    ast_options.add_argument('--no-preprocess', action='store_false', dest='pre_process',
+                             help='do not run the pre-processor')
+    ast_options.add_argument('--filter', action='append', dest='class_filter', metavar='PATTERN',
+                             help='only parse classes matching the pattern, e.g., CfgVehicles/*, can be repeated')
+    ast_options.add_argument('--typed-arrays', action='store_true', help='store numeric arrays in typed buffers')
+
+    argument_parser = argparse.ArgumentParser(prog='armaclassparser',
+                                              description='Parse, pre-process and convert Arma 3 config files.')
+    commands = argument_parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    parse = commands.add_parser('parse', parents=[common, ast_options],
+                                help='parse files and print the regenerated configs')
+    parse.add_argument('paths', nargs='+', metavar='PATH', help=paths_help)
+    parse.add_argument('--check', action='store_true', help='only report errors, do not print the configs')
+    parse.add_argument('--indent', type=int, default=0, help='number of spaces to indent nested classes with')
+
+    preprocess = commands.add_parser('preprocess', parents=[common], help='print the pre-processed files')
+    preprocess.add_argument('paths', nargs='+', metavar='PATH', help=paths_help)
+
+    dump = commands.add_parser('dump-json', parents=[common, ast_options],
+                               help='print the parsed configs as JSON, one document per line unless --indent is set')
+    dump.add_argument('paths', nargs='+', metavar='PATH', help=paths_help)
+    dump.add_argument('--indent', type=int, default=None, help='number of spaces to indent nested values with')
+    dump.add_argument('--casefold', action='store_true', help='lower-case all keys')
+    dump.add_argument('--sort-keys', action='store_true', help='sort keys instead of keeping the declaration order')
+
+    bench = commands.add_parser('bench', parents=[common],
+                                help='time the stages of parsing files, or of the synthetic workloads if no files are '
+                                     'given, and print the results as JSON')
+    bench.add_argument('paths', nargs='*', metavar='PATH', help=paths_help)
+    bench.add_argument('--repeat', type=int, default=3, help='number of runs, the best time of each stage is reported')
+    bench.add_argument('--scale', type=int, default=1, help='size multiplier of the synthetic workloads')
+    bench.add_argument('--workload', action='append', dest='workloads', choices=sorted(benchmark.WORKLOADS),
+                       help='synthetic workload to run, can be repeated, all by default')
+    bench.add_argument('--memory', action='store_true',
+                       help='also report the peak and retained memory after each stage, using tracemalloc')
+    bench.add_argument('--output', metavar='FILE', help='write the results to a file instead of stdout')
+    bench.add_argument('--compare', metavar='FILE',
+                       help='earlier results to compare with, adds the ratios of the times (current / earlier)')
+    return argument_parser
+
+
+def main(argv=None) -> int:
+    """
+    Entry point of the armaclassparser command.
+
+    :param argv: list of strings - the command line arguments, None for sys.argv[1:]
+    :return: int - the exit code, 1 if any file failed
+    """
+    args = build_argument_parser().parse_args(argv)
+    options = {
+        'include_roots': args.include_roots,
+        'cache_dir': getattr(args, 'cache_dir', None),
+        'pre_process': getattr(args, 'pre_process', True),
+        'class_filter': getattr(args, 'class_filter', None),
+        'typed_arrays': getattr(args, 'typed_arrays', False),
+        'check': getattr(args, 'check', False),
+        'indent': getattr(args, 'indent', None),
+        'casefold': getattr(args, 'casefold', False),
+        'sort_keys': getattr(args, 'sort_keys', False),
+    }
+    if args.jobs < 0:
+        print('armaclassparser: --jobs must not be negative', file=sys.stderr)
+        return 2
+    jobs = args.jobs or os.cpu_count() or 1
+
+    if args.command == 'bench':
+        try:
+            report = _bench(args)
+        except Exception as e:
+            print('armaclassparser: {}: {}'.format(type(e).__name__, e), file=sys.stderr)
+            return 1
+        if args.output is not None:
+            with open(args.output, 'w', encoding='utf-8') as fp:
+                json.dump(report, fp, indent=2)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        return 0
+
+    start = time.perf_counter()
+    paths = _expand_paths(args.paths)
+    results = []
+    for result in _run(args.command, paths, options, jobs):
+        results.append(result)
+        if result.error is not None:
+            print('{}: {}'.format(result.file_path, result.error), file=sys.stderr)
+        else:
+            sys.stdout.write(result.output)
+            # only the timings are needed from now on
+            result.output = None
+    sys.stdout.flush()
+
+    if args.stats:
+        _print_stats(results, time.perf_counter() - start)
+    return 1 if any(result.error is not None for result in results) else 0
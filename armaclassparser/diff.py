@@ -0,0 +1,113 @@
+from enum import Enum
+
+from armaclassparser.ast import BodyIndex, ClassDefinition, structurally_equal, lower_name
+
+SEPARATOR = '/'
+
+
+class ChangeType(Enum):
+    CLASS_ADDED = 'CLASS_ADDED'
+    CLASS_REMOVED = 'CLASS_REMOVED'
+    PARENT_CHANGED = 'PARENT_CHANGED'
+    PROPERTY_ADDED = 'PROPERTY_ADDED'
+    PROPERTY_REMOVED = 'PROPERTY_REMOVED'
+    PROPERTY_CHANGED = 'PROPERTY_CHANGED'
+
+
+class Change:
+    __slots__ = ('change_type', 'path', 'old', 'new')
+
+    def __init__(self, change_type: ChangeType, path: tuple, old, new):
+        """
+        :param change_type: ChangeType - what changed
+        :param path: tuple of strings - path of the changed class or property, e.g., ('CfgWeapons', 'arifle_MX_F')
+        :param old: the node in the old config, None for additions
+        :param new: the node in the new config, None for removals
+        """
+        self.change_type = change_type
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.change_type.value, SEPARATOR.join(self.path))
+
+    def __str__(self):
+        path = SEPARATOR.join(self.path)
+        if self.change_type in [ChangeType.CLASS_ADDED, ChangeType.PROPERTY_ADDED]:
+            return '+ {}'.format(path)
+        elif self.change_type in [ChangeType.CLASS_REMOVED, ChangeType.PROPERTY_REMOVED]:
+            return '- {}'.format(path)
+        elif self.change_type == ChangeType.PARENT_CHANGED:
+            return '~ {} : {} -> {}'.format(path, self.old.parent_class, self.new.parent_class)
+        else:
+            return '~ {} = {} -> {}'.format(path, self.old.right, self.new.right)
+
+    def __eq__(self, other):
+        if isinstance(other, Change):
+            return self.change_type == other.change_type \
+                   and self.path == other.path \
+                   and self.old is other.old \
+                   and self.new is other.new
+        else:
+            return False
+
+
+def _parent_name(node):
+    if isinstance(node, ClassDefinition) and node.parent_class is not None:
+        return lower_name(node.parent_class)
+    return None
+
+
+def _diff_bodies(path: tuple, old_index: BodyIndex, new_index: BodyIndex, changes: list, pending: list):
+    for name, old_property in old_index.properties.items():
+        if name not in new_index.properties:
+            changes.append(Change(ChangeType.PROPERTY_REMOVED, path + (old_property.name,), old_property, None))
+    for name, new_property in new_index.properties.items():
+        old_property = old_index.properties.get(name)
+        if old_property is None:
+            changes.append(Change(ChangeType.PROPERTY_ADDED, path + (new_property.name,), None, new_property))
+        elif not structurally_equal(old_property.right, new_property.right):
+            changes.append(Change(ChangeType.PROPERTY_CHANGED, path + (new_property.name,), old_property,
+                                  new_property))
+
+    for name, old_class in old_index.classes.items():
+        if name not in new_index.classes:
+            changes.append(Change(ChangeType.CLASS_REMOVED, path + (old_class.class_name,), old_class, None))
+    for name, new_class in new_index.classes.items():
+        old_class = old_index.classes.get(name)
+        if old_class is None:
+            changes.append(Change(ChangeType.CLASS_ADDED, path + (new_class.class_name,), None, new_class))
+        elif isinstance(old_class, ClassDefinition) != isinstance(new_class, ClassDefinition):
+            # forward declaration turned into a definition or vice versa
+            changes.append(Change(ChangeType.CLASS_REMOVED, path + (old_class.class_name,), old_class, None))
+            changes.append(Change(ChangeType.CLASS_ADDED, path + (new_class.class_name,), None, new_class))
+        elif isinstance(new_class, ClassDefinition) and not structurally_equal(old_class, new_class):
+            pending.append((path + (new_class.class_name,), old_class, new_class))
+
+
+def diff(old_ast: list, new_ast: list) -> list:
+    """
+    Computes the differences between two parsed configs. Classes and properties are matched by their name
+    (case-insensitive), identical subtrees are skipped based on their structural hash.
+
+    :param old_ast: list of AST nodes - the top-level nodes of the old config
+    :param new_ast: list of AST nodes - the top-level nodes of the new config
+    :return: list of Change - the added and removed classes, changed parents and added, removed and changed properties
+    """
+    changes = []
+    nested = []
+    _diff_bodies((), BodyIndex(old_ast), BodyIndex(new_ast), changes, nested)
+
+    # process changed classes depth-first in declaration order
+    pending = list(reversed(nested))
+    while pending:
+        path, old_class, new_class = pending.pop()
+        if _parent_name(old_class) != _parent_name(new_class):
+            changes.append(Change(ChangeType.PARENT_CHANGED, path, old_class, new_class))
+
+        nested = []
+        _diff_bodies(path, old_class.index, new_class.index, changes, nested)
+        pending.extend(reversed(nested))
+
+    return changes
@@ -32,3 +32,30 @@ class MissingTokenError(ParsingError):
             super().__init__("reached end of file while looking for token {}".format(target))
         self.target = target
         self.source = source
+
+
+class ResolutionError(Exception):
+    pass
+
+
+class MergeError(Exception):
+    pass
+
+
+class RapError(Exception):
+    pass
+
+
+class SerializationError(Exception):
+    pass
+
+
+class BatchParsingError(Exception):
+    def __init__(self, file_path, error_type, message):
+        self.file_path = file_path
+        self.error_type = error_type
+        self.message = message
+        super().__init__("{} in {}: {}".format(error_type, file_path, message))
+
+    def __reduce__(self):
+        return BatchParsingError, (self.file_path, self.error_type, self.message)
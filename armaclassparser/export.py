@@ -0,0 +1,167 @@
+import json
+from collections import OrderedDict
+
+from armaclassparser.ast import Array, Assignment, BodyIndex, ClassDefinition, ExternalClassReference, Constant, \
+    StringLiteral, Identifier, lower_name
+
+PARENT_KEY = '__parent__'
+
+_END = object()
+
+
+def _members(nodes: list, index: BodyIndex, parent_class, casefold: bool, preserve_order: bool):
+    """
+    Returns the (key, value) pairs of a class body. Members which are overridden later in the same body are skipped,
+    as Arma does. Classes and properties share one namespace in the output, so a class and a property of the same name
+    raise a ValueError.
+    """
+    members = []
+    if parent_class is not None:
+        members.append((PARENT_KEY, parent_class))
+    for node in nodes:
+        if isinstance(node, (ClassDefinition, ExternalClassReference)):
+            name = node.class_name
+            if index.get_class(name) is not node:
+                continue
+        elif isinstance(node, Assignment):
+            name = node.name
+            if index.get_property(name) is not node:
+                continue
+            node = node.right
+        else:
+            continue
+        members.append((lower_name(name) if casefold else name, node))
+
+    if index.classes and index.properties:
+        for name in index.classes:
+            if name in index.properties:
+                raise ValueError('cannot export class {}, a property of the same name exists'.format(
+                    index.classes[name].class_name))
+
+    if not preserve_order:
+        members.sort(key=lambda member: member[0])
+    return members
+
+
+def _scalar(node):
+    if isinstance(node, (Constant, StringLiteral, Identifier)):
+        return node.value
+    elif isinstance(node, ExternalClassReference):
+        return None
+    elif isinstance(node, str):
+        return node
+    raise ValueError('cannot export {}'.format(repr(node)))
+
+
+def to_dict(ast: list, casefold=False, preserve_order=True) -> dict:
+    """
+    Converts a parsed config into nested dicts. Classes become dicts (with the parent class stored under '__parent__'),
+    arrays become lists and forward declarations become None. A class and a property of the same name in one class
+    body cannot be exported and raise a ValueError.
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param casefold: bool - if True, all keys are lower-cased
+    :param preserve_order: bool - if True, keys are in declaration order, otherwise they are sorted
+    :return: OrderedDict - the config
+    """
+    def convert(node):
+        if isinstance(node, ClassDefinition):
+            return OrderedDict((key, convert(value))
+                               for key, value in _members(node.body, node.index, node.parent_class, casefold,
+                                                          preserve_order))
+        elif isinstance(node, Array):
+            return [convert(child) for child in node.children]
+        return _scalar(node)
+
+    return OrderedDict((key, convert(value))
+                       for key, value in _members(ast, BodyIndex(ast), None, casefold, preserve_order))
+
+
+class JSONWriter:
+    def __init__(self, fp, casefold=False, preserve_order=True, indent=None, buffer_size=65536):
+        """
+        Writes parsed configs as JSON to a file object without building the whole document in memory, see to_dict()
+        for the structure.
+
+        :param fp: file object - the target, opened in text mode
+        :param casefold: bool - if True, all keys are lower-cased
+        :param preserve_order: bool - if True, keys are in declaration order, otherwise they are sorted
+        :param indent: int - number of spaces to indent nested values with, None for compact output
+        :param buffer_size: int - number of characters to collect before writing to fp
+        """
+        self.fp = fp
+        self.casefold = casefold
+        self.preserve_order = preserve_order
+        self.indent = indent
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._buffer_length = 0
+        self._stack = []
+
+    def _write(self, string: str):
+        self._buffer.append(string)
+        self._buffer_length += len(string)
+        if self._buffer_length >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.fp.write(''.join(self._buffer))
+        self._buffer = []
+        self._buffer_length = 0
+
+    def _newline(self):
+        if self.indent is not None:
+            self._write('\n' + ' ' * (self.indent * len(self._stack)))
+
+    def _value(self, node):
+        if isinstance(node, ClassDefinition):
+            self._write('{')
+            self._stack.append([iter(_members(node.body, node.index, node.parent_class, self.casefold,
+                                              self.preserve_order)), True, 0])
+        elif isinstance(node, Array):
+            self._write('[')
+            self._stack.append([iter(node.children), False, 0])
+        else:
+            self._write(json.dumps(_scalar(node)))
+
+    def write(self, ast: list):
+        """
+        :param ast: list of AST nodes - the top-level nodes of the config
+        """
+        separator = ': ' if self.indent is not None else ':'
+        self._write('{')
+        self._stack.append([iter(_members(ast, BodyIndex(ast), None, self.casefold, self.preserve_order)), True, 0])
+        while self._stack:
+            frame = self._stack[-1]
+            items, is_object, count = frame
+            item = next(items, _END)
+            if item is _END:
+                self._stack.pop()
+                if count > 0:
+                    self._newline()
+                self._write('}' if is_object else ']')
+                continue
+
+            if count > 0:
+                self._write(',')
+            frame[2] += 1
+            self._newline()
+            if is_object:
+                key, item = item
+                self._write(json.dumps(key))
+                self._write(separator)
+            self._value(item)
+        self.flush()
+
+
+def dump_json(ast: list, fp, casefold=False, preserve_order=True, indent=None):
+    """
+    Writes a parsed config as JSON to a file object, see JSONWriter.
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param fp: file object - the target, opened in text mode
+    :param casefold: bool - if True, all keys are lower-cased
+    :param preserve_order: bool - if True, keys are in declaration order, otherwise they are sorted
+    :param indent: int - number of spaces to indent nested values with, None for compact output
+    """
+    JSONWriter(fp, casefold, preserve_order, indent).write(ast)
@@ -1,12 +1,190 @@
+import io
+
+from armaclassparser.ast import Array, Assignment, ClassDefinition, ExternalClassReference
+
+DEFAULT_BUFFER_SIZE = 65536
+
+# number of packed array values that are converted to text at once
+ARRAY_CHUNK_SIZE = 4096
+
+_END = object()
+
+
+class ASTWriter:
+    def __init__(self, fp, indent='', buffer_size=DEFAULT_BUFFER_SIZE, cache=False):
+        """
+        Writes parsed configs as text to a file object. The tree is walked with an explicit stack and the output is
+        collected in a buffer which is written to fp in bulk, so neither deep nor large configs are built as one string.
+
+        With cache=True, the output of each class is stored in the class, split into text fragments and references to
+        its nested classes. Writing the config again only renders the classes which have been invalidated since, call
+        mark_dirty() on modified nodes. The cache keeps the text of all classes in memory.
+
+        :param fp: file object - the target, opened in text mode
+        :param indent: string - prepended once per nesting level to class members, e.g., '    ' or '\t'
+        :param buffer_size: int - number of characters to collect before writing to fp
+        :param cache: bool - if True, the output of classes is cached and reused
+        """
+        if indent is None:
+            raise TypeError('parameter indent cannot be None')
+        if buffer_size < 1:
+            raise ValueError('parameter buffer_size must be positive, got {}'.format(buffer_size))
+        self.fp = fp
+        self.indent = indent
+        self.buffer_size = buffer_size
+        self.cache = cache
+        self._buffer = []
+        self._buffer_length = 0
+        self._stack = []
+
+    def _write(self, string: str):
+        self._buffer.append(string)
+        self._buffer_length += len(string)
+        if self._buffer_length >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.fp.write(''.join(self._buffer))
+        self._buffer = []
+        self._buffer_length = 0
+
+    def _write_numbers(self, values):
+        self._write('{')
+        for start in range(0, len(values), ARRAY_CHUNK_SIZE):
+            if start > 0:
+                self._write(',')
+            self._write(','.join(map(str, values[start:start + ARRAY_CHUNK_SIZE])))
+        self._write('}')
+
+    def _render(self, node, depth: int) -> str:
+        # renders a single node into a string, using the same writer state
+        state = self._buffer, self._buffer_length, self.buffer_size, self._stack
+        self._buffer, self._buffer_length, self.buffer_size, self._stack = [], 0, float('inf'), []
+        self._stack.append([iter((node,)), depth, None, None, 0])
+        self._run()
+        text = ''.join(self._buffer)
+        self._buffer, self._buffer_length, self.buffer_size, self._stack = state
+        return text
+
+    def _fragments(self, node: ClassDefinition, depth: int) -> list:
+        # cached output of a class: strings and nested classes, which are written using their own cache
+        output = node._output
+        if output is not None and output[0] == self.indent and output[1] == depth:
+            return output[2]
+
+        prefix = self.indent * depth
+        if node.parent_class:
+            strings = ['{}class {} : {} {{\n'.format(prefix, node.class_name, node.parent_class)]
+        else:
+            strings = ['{}class {} {{\n'.format(prefix, node.class_name)]
+        fragments = []
+        for child in node.body:
+            if isinstance(child, ClassDefinition):
+                if strings:
+                    fragments.append(''.join(strings))
+                    strings = []
+                fragments.append(child)
+            else:
+                strings.append(self._render(child, depth + 1))
+        strings.append(prefix + '};\n')
+        fragments.append(''.join(strings))
+
+        node._output = (self.indent, depth, fragments)
+        return fragments
+
+    def _node(self, node, depth: int):
+        if isinstance(node, ClassDefinition) and self.cache:
+            self._stack.append([iter(self._fragments(node, depth)), depth + 1, None, None, 0])
+        elif isinstance(node, ClassDefinition):
+            prefix = self.indent * depth
+            if node.parent_class:
+                self._write('{}class {} : {} {{\n'.format(prefix, node.class_name, node.parent_class))
+            else:
+                self._write('{}class {} {{\n'.format(prefix, node.class_name))
+            self._stack.append([iter(node.body), depth + 1, prefix + '};\n', None, 0])
+        elif isinstance(node, Assignment):
+            self._write('{}{} = '.format(self.indent * depth, node.left))
+            if isinstance(node.right, Array):
+                self._stack.append([iter((node.right,)), depth, ';\n', None, 0])
+            else:
+                self._write(str(node.right))
+                self._write(';\n')
+        elif isinstance(node, Array):
+            if node.values is not None:
+                self._write_numbers(node.values)
+            else:
+                self._write('{')
+                self._stack.append([iter(node.children), depth, '}', ',', 0])
+        elif isinstance(node, ExternalClassReference):
+            self._write(self.indent * depth)
+            self._write(str(node))
+        else:
+            self._write(str(node))
+
+    def _run(self):
+        while self._stack:
+            frame = self._stack[-1]
+            items, depth, closing, separator, count = frame
+            node = next(items, _END)
+            if node is _END:
+                self._stack.pop()
+                if closing is not None:
+                    self._write(closing)
+                continue
+
+            if count > 0 and separator is not None:
+                self._write(separator)
+            frame[4] += 1
+            self._node(node, depth)
+
+    def write(self, ast: list):
+        """
+        :param ast: list of AST nodes - the top-level nodes of the config
+        """
+        self._stack.append([iter(ast), 0, None, None, 0])
+        self._run()
+        self.flush()
+
+    def write_tokens(self, tokens):
+        """
+        :param tokens: iterable of Token - the tokens to write, e.g., the output of the PreProcessor
+        """
+        for token in tokens:
+            self._write(str(token))
+        self.flush()
+
+
+def write_tokens(tokens, fp, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Writes tokens to a file object, see ASTWriter.
+
+    :param tokens: iterable of Token - the tokens to write
+    :param fp: file object - the target, opened in text mode
+    :param buffer_size: int - number of characters to collect before writing to fp
+    """
+    ASTWriter(fp, buffer_size=buffer_size).write_tokens(tokens)
+
+
+def write_ast(ast, fp, indent='', buffer_size=DEFAULT_BUFFER_SIZE, cache=False):
+    """
+    Writes a parsed config as text to a file object, see ASTWriter.
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param fp: file object - the target, opened in text mode
+    :param indent: string - prepended once per nesting level to class members
+    :param buffer_size: int - number of characters to collect before writing to fp
+    :param cache: bool - if True, the output of classes is cached and reused
+    """
+    ASTWriter(fp, indent, buffer_size, cache).write(ast)
+
+
 def from_tokens(tokens):
-    strings = []
-    for token in tokens:
-        strings.append(str(token))
-    return ''.join(strings)
+    fp = io.StringIO()
+    write_tokens(tokens, fp)
+    return fp.getvalue()
 
 
-def from_ast(ast):
-    strings = []
-    for ast_node in ast:
-        strings.append(str(ast_node))
-    return ''.join(strings)
+def from_ast(ast, indent='', cache=False):
+    fp = io.StringIO()
+    write_ast(ast, fp, indent, cache=cache)
+    return fp.getvalue()
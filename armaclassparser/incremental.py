@@ -0,0 +1,221 @@
+import os
+import time
+
+from armaclassparser import lexer, parser, preprocessor
+from armaclassparser.preprocessor import IncludeGraph, content_hash
+
+
+def _normalize(file_path: str) -> str:
+    return os.path.normpath(os.path.abspath(file_path))
+
+
+def _read_hash(file_path: str):
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+            return content_hash(fp.read())
+    except (OSError, ValueError):
+        # ValueError includes UnicodeDecodeError, e.g., while an editor is still writing the file
+        return None
+
+
+def _stat(file_path: str):
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def parse_with_dependencies(file_path: str, pre_process=True, class_filter=None, keep_tokens=True, typed_arrays=False,
+                            include_roots=None, timings=None) -> tuple:
+    """
+    Parses a file like armaclassparser.parse_from_file() and collects the files it depends on.
+
+    :param timings: dict - if set, the seconds spent in the 'read', 'lex', 'preprocess' and 'parse' stages are added
+    :return: tuple - (list of AST nodes or None, exception raised while parsing or None, dict that maps the file and
+             all files it includes to their content hashes)
+    """
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+
+    def lap(stage):
+        nonlocal start
+        now = time.perf_counter()
+        timings[stage] = timings.get(stage, 0.0) + now - start
+        start = now
+
+    with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+        input_data = fp.read()
+    lap('read')
+    include_graph = IncludeGraph()
+    try:
+        tokens = lexer.Lexer(input_data, file_path).tokenize()
+        lap('lex')
+        if pre_process:
+            pre_processor = preprocessor.PreProcessor(tokens, file_path, include_roots)
+            pre_processor.include_graph = include_graph
+            tokens = pre_processor.preprocess()
+            lap('preprocess')
+        ast = parser.Parser(tokens, file_path, class_filter=class_filter, keep_tokens=keep_tokens,
+                            typed_arrays=typed_arrays).parse()
+        lap('parse')
+        error = None
+    except Exception as e:
+        ast = None
+        error = e
+
+    dependencies = include_graph.dependencies(file_path)
+    dependencies[os.path.normpath(file_path)] = content_hash(input_data)
+    return ast, error, dependencies
+
+
+class IncrementalParser:
+    def __init__(self, root_paths=(), pre_process=True, class_filter=None, keep_tokens=False, typed_arrays=False,
+                 include_roots=None):
+        """
+        Keeps the ASTs of a set of root configs up to date. Each root is parsed once, together with the graph of the
+        files it includes. When files change, only the roots which depend on them are parsed again, all other ASTs are
+        reused.
+
+        :param root_paths: iterable of strings - the root configs, e.g., the config.cpp of each addon
+        :param pre_process: bool - if True, the files are pre-processed
+        :param class_filter: ClassPathFilter, string or list of strings - only parse the matching classes
+        :param keep_tokens: bool - if True, the AST nodes keep their tokens, see parser.Parser
+        :param typed_arrays: bool - if True, numeric arrays are packed, see parser.Parser
+        :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+        """
+        self.pre_process = pre_process
+        self.class_filter = class_filter
+        self.keep_tokens = keep_tokens
+        self.typed_arrays = typed_arrays
+        self.include_roots = include_roots
+        # root path -> AST, the last successfully parsed one if the current version of a root fails to parse
+        self.asts = {}
+        # root path -> exception raised while parsing the current version of the root
+        self.errors = {}
+        # root path -> dict of all files the root depends on (including itself) and their content hashes
+        self._dependencies = {}
+        # file path -> set of root paths depending on it
+        self._dependents = {}
+        # file path -> (modification time, size), for polling
+        self._stats = {}
+
+        for root_path in root_paths:
+            self.add(root_path)
+
+    def _set_dependencies(self, root_path: str, dependencies: dict):
+        for file_path in self._dependencies.get(root_path, {}):
+            roots = self._dependents.get(file_path)
+            if roots is not None:
+                roots.discard(root_path)
+                if not roots:
+                    del self._dependents[file_path]
+                    self._stats.pop(file_path, None)
+
+        self._dependencies[root_path] = dependencies
+        for file_path in dependencies:
+            self._dependents.setdefault(file_path, set()).add(root_path)
+            if file_path not in self._stats:
+                self._stats[file_path] = _stat(file_path)
+
+    def add(self, root_path: str):
+        """
+        Parses a root config and keeps its AST up to date from now on.
+
+        :param root_path: string - path of the root config
+        """
+        root_path = _normalize(root_path)
+        try:
+            ast, error, dependencies = parse_with_dependencies(root_path, self.pre_process, self.class_filter,
+                                                               self.keep_tokens, self.typed_arrays, self.include_roots)
+        except (OSError, ValueError) as e:
+            # the root itself cannot be read (yet), e.g., a partially written UTF-8 sequence
+            ast, error, dependencies = None, e, {root_path: None}
+
+        if error is None:
+            self.asts[root_path] = ast
+            self.errors.pop(root_path, None)
+        else:
+            self.errors[root_path] = error
+            # a failed parse might not have reached all includes, so keep watching the previous ones as well
+            dependencies = dict(self._dependencies.get(root_path, {}), **dependencies)
+        self._set_dependencies(root_path, dependencies)
+
+    def remove(self, root_path: str):
+        """
+        :param root_path: string - path of the root config to forget, nothing happens if it was never added
+        """
+        root_path = _normalize(root_path)
+        self.asts.pop(root_path, None)
+        self.errors.pop(root_path, None)
+        self._set_dependencies(root_path, {})
+        self._dependencies.pop(root_path, None)
+
+    def get(self, root_path: str):
+        """
+        :param root_path: string - path of the root config
+        :return: list of AST nodes - the top-level nodes of the root config, None if it never parsed successfully
+        """
+        return self.asts.get(_normalize(root_path))
+
+    def affected_roots(self, changed_paths) -> set:
+        """
+        :param changed_paths: iterable of strings - files that might have changed
+        :return: set of strings - the root configs depending on files whose content differs from the last parse
+        """
+        result = set()
+        for file_path in changed_paths:
+            file_path = _normalize(file_path)
+            roots = self._dependents.get(file_path, ())
+            current_hash = None
+            for root_path in roots:
+                if root_path in result:
+                    continue
+                if current_hash is None:
+                    current_hash = _read_hash(file_path) or ''
+                if self._dependencies[root_path][file_path] != current_hash:
+                    result.add(root_path)
+        return result
+
+    def update(self, changed_paths) -> list:
+        """
+        Parses all root configs again which depend on one of the changed files, directly or through #include.
+
+        :param changed_paths: iterable of strings - files that might have changed
+        :return: list of strings - the root configs that were parsed again, sorted
+        """
+        roots = sorted(self.affected_roots(changed_paths))
+        for root_path in roots:
+            self.add(root_path)
+        return roots
+
+    def poll(self) -> list:
+        """
+        Checks all known files for modifications and updates the affected root configs.
+
+        :return: list of strings - the root configs that were parsed again, sorted
+        """
+        changed_paths = []
+        for file_path, stat in list(self._stats.items()):
+            current_stat = _stat(file_path)
+            if current_stat != stat:
+                self._stats[file_path] = current_stat
+                changed_paths.append(file_path)
+        return self.update(changed_paths) if changed_paths else []
+
+    def watch(self, interval=1.0, callback=None, stop_event=None):
+        """
+        Polls for modified files until stop_event is set (or forever), see poll().
+
+        :param interval: float - seconds between two polls
+        :param callback: function - called with the list of re-parsed root configs after each update
+        :param stop_event: threading.Event - ends watching when set
+        """
+        while stop_event is None or not stop_event.is_set():
+            roots = self.poll()
+            if roots and callback is not None:
+                callback(roots)
+            if stop_event is not None:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
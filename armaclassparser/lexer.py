@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import sys
+from array import array
 from enum import Enum
 
 STRING_INPUT_FILE = '<STRING>'
@@ -54,7 +56,13 @@ class TokenType(Enum):
     NUMBER = 'NUMBER'
 
 
+# characters that may follow the first letter of a word
+WORD_CHARACTERS = '_!%&?'
+
+
 class Token:
+    __slots__ = ('token_type', 'file_path', 'line_no', 'line_pos', 'value')
+
     def __init__(self, token_type: TokenType, file_path: str, line_no: int, line_pos: int, value=None):
         self.token_type = token_type
         self.file_path = file_path
@@ -88,11 +96,122 @@ class Token:
             return False
 
 
+def scan(input_data: str, start: int, number: bool) -> int:
+    """
+    Finds the end of a number or word by index, without building the value character by character.
+
+    :param input_data: string - the lexed input
+    :param start: int - index of the first character after the one that started the number or word
+    :param number: bool - True to scan digits and dots, False to scan the characters of a word
+    :return: int - index behind the last character of the number or word
+    """
+    length = len(input_data)
+    end = start
+    if number:
+        while end < length and (input_data[end].isdecimal() or input_data[end] == '.'):
+            end += 1
+    else:
+        while end < length and (input_data[end].isdecimal() or input_data[end].isalpha() or
+                                input_data[end] in WORD_CHARACTERS):
+            end += 1
+    return end
+
+
+class SourceLines:
+    __slots__ = ('source', 'offsets')
+
+    def __init__(self, source: str):
+        """
+        The lexed input and the index at which each of its lines starts, shared by all SpanTokens of the input.
+
+        :param source: string - the lexed input
+        """
+        self.source = source
+        offsets = array('q', [0])
+        position = source.find('\n')
+        while position >= 0:
+            offsets.append(position + 1)
+            position = source.find('\n', position + 1)
+        self.offsets = offsets
+
+
+class SpanToken(Token):
+    __slots__ = ('lines',)
+
+    def __init__(self, token_type: TokenType, file_path: str, line_no: int, line_pos: int, lines: SourceLines):
+        """
+        Token that references its text in the source instead of holding its own value string. The span is derived from
+        the position of the token, so a SpanToken is only one reference larger than a Token. The value is only set on
+        first access: WORD and NUMBER values are sliced from the source, all other tokens share the value of their
+        type.
+
+        :param lines: SourceLines - the lexed input
+        """
+        self.token_type = token_type
+        self.file_path = file_path
+        self.line_no = line_no
+        self.line_pos = line_pos
+        self.lines = lines
+
+    @property
+    def start(self) -> int:
+        # index of the first character in the source
+        return self.lines.offsets[self.line_no - 1] + self.line_pos - 1
+
+    @property
+    def end(self) -> int:
+        # index behind the last character in the source
+        start = self.start
+        if self.token_type is TokenType.WORD or self.token_type is TokenType.NUMBER:
+            return scan(self.lines.source, start + 1, self.token_type is TokenType.NUMBER)
+        return start + len(self.token_type.value)
+
+    def __getattr__(self, name):
+        # only called while the value slot is still empty, later accesses read the slot directly
+        if name != 'value':
+            raise AttributeError(name)
+        if self.token_type is TokenType.WORD or self.token_type is TokenType.NUMBER:
+            value = sys.intern(self.lines.source[self.start:self.end])
+        else:
+            value = self.token_type.value
+        self.value = value
+        return value
+
+
+def source_text(tokens):
+    """
+    :param tokens: list of tokens - e.g., the content of a string literal
+    :return: string - the text of the tokens, sliced from the source in one go if all of them are adjacent SpanTokens,
+             None if the values of the tokens have to be joined instead
+    """
+    if not tokens:
+        return ''
+    first = tokens[0]
+    if type(first) is not SpanToken:
+        return None
+    lines = first.lines
+    start = first.start
+    end = start
+    for token in tokens:
+        # tokens of expanded macros or around removed comments are not adjacent
+        if type(token) is not SpanToken or token.lines is not lines or token.start != end:
+            return None
+        end = token.end
+    return lines.source[start:end]
+
+
 class Lexer:
-    def __init__(self, input_data, file_name):
+    def __init__(self, input_data, file_name, spans=False):
+        """
+        :param input_data: string - the config
+        :param file_name: string - the name of the lexed file
+        :param spans: bool - if True, the tokens are SpanTokens which reference input_data, so that no value strings
+                      are created for tokens whose value is never used
+        """
         self.input = input_data
         self.length = len(input_data)
         self.file_name = file_name
+        self.lines = SourceLines(input_data) if spans else None
         self.position = 0
         self.line_no = 1
         self.line_pos = 0
@@ -121,20 +240,40 @@ class Lexer:
         end = min(self.position + length, self.length)
         return self.input[start:end]
 
-    def add_token(self, token_type, value=None):
+    def _consume_until(self, end: int):
+        # moves behind the characters of a number or word, which never contain newlines
+        self.line_pos += end - self.position
+        self.position = end
+        self.char = self.input[end - 1]
+
+    def add_token(self, token_type, value=None, start=None):
+        """
+        :param token_type: TokenType - the type of the token ending at the current position
+        :param value: string - the value of NUMBER and WORD tokens
+        :param start: int - index of the first character of NUMBER and WORD tokens, used if value is not given
+        """
         line_no = self.line_no
         line_pos = self.line_pos
 
         if token_type in [TokenType.MCOMMENT_START, TokenType.MCOMMENT_END, TokenType.COMMENT]:
             line_pos -= 1
         elif token_type in [TokenType.NUMBER, TokenType.WORD]:
-            line_pos -= len(value) - 1
+            end = self.position
+            if start is None:
+                start = end - len(value)
+            line_pos -= end - start - 1
+            if self.lines is None:
+                # names and numbers repeat a lot, share one string object for each of them
+                value = sys.intern(value if value is not None else self.input[start:end])
         elif token_type in [TokenType.KEYWORD_CLASS, TokenType.KEYWORD_INCLUDE, TokenType.KEYWORD_IFDEF,
                             TokenType.KEYWORD_IFNDEF, TokenType.KEYWORD_ELSE, TokenType.KEYWORD_ENDIF,
                             TokenType.KEYWORD_DEFINE, TokenType.KEYWORD_UNDEF]:
             line_pos -= len(token_type.value) - 1
 
-        token = Token(token_type, self.file_name, line_no, line_pos, value)
+        if self.lines is not None:
+            token = SpanToken(token_type, self.file_name, line_no, line_pos, self.lines)
+        else:
+            token = Token(token_type, self.file_name, line_no, line_pos, value)
         self.tokens.append(token)
 
     def tokenize(self):
@@ -146,14 +285,9 @@ class Lexer:
             if next_char == '-':
                 peeked_char = self.peek()
                 if peeked_char.isdecimal():
-                    number_literal = next_char
-                    while self.has_next():
-                        peeked_char = self.peek()
-                        if peeked_char.isdecimal() or peeked_char == '.':
-                            number_literal += self.next()
-                        else:
-                            break
-                    self.add_token(TokenType.NUMBER, number_literal)
+                    start = self.position - 1
+                    self._consume_until(scan(self.input, self.position, True))
+                    self.add_token(TokenType.NUMBER, start=start)
                 else:
                     self.add_token(TokenType.MINUS)
 
@@ -213,29 +347,20 @@ class Lexer:
 
             elif next_char.isdecimal():
                 # parse number
-                number_literal = next_char
-                while self.has_next():
-                    peeked_char = self.peek()
-                    if peeked_char.isdecimal() or peeked_char == '.':
-                        number_literal += self.next()
-                    else:
-                        break
-                self.add_token(TokenType.NUMBER, number_literal)
+                start = self.position - 1
+                self._consume_until(scan(self.input, self.position, True))
+                self.add_token(TokenType.NUMBER, start=start)
 
             elif next_char.isalpha():
                 # parse letters and numbers
-                string_literal = next_char
-                while self.has_next():
-                    peeked_char = self.peek()
-                    if peeked_char.isdecimal() or peeked_char.isalpha() or peeked_char in '_!%&?':
-                        string_literal += self.next()
-                    else:
-                        break
+                start = self.position - 1
+                end = scan(self.input, self.position, False)
+                self._consume_until(end)
 
-                if string_literal == 'class':
+                if end - start == 5 and self.input.startswith('class', start):
                     self.add_token(TokenType.KEYWORD_CLASS)
                 else:
-                    self.add_token(TokenType.WORD, string_literal)
+                    self.add_token(TokenType.WORD, start=start)
 
             else:
                 if next_char in token_type_values:
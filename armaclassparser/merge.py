@@ -0,0 +1,212 @@
+import heapq
+from collections import OrderedDict
+
+from armaclassparser.ast import Array, Assignment, BodyIndex, ClassDefinition, ExternalClassReference, \
+    structurally_equal, lower_name
+from armaclassparser.errors import MergeError
+
+
+def get_patches(ast: list) -> tuple:
+    """
+    Reads the CfgPatches of a config.
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :return: tuple of lists - the names of the addons defined by the config and the names of the addons they require
+    """
+    addons = []
+    required_addons = []
+    cfg_patches = BodyIndex(ast).get_class('CfgPatches')
+    if isinstance(cfg_patches, ClassDefinition):
+        for patch in cfg_patches.index.classes.values():
+            if not isinstance(patch, ClassDefinition):
+                continue
+            addons.append(patch.class_name)
+            required = patch.get_property('requiredAddons')
+            if required is not None and isinstance(required.right, Array):
+                required_addons += [str(child.value) for child in required.right.children]
+    return addons, required_addons
+
+
+def sort_by_load_order(asts: list) -> list:
+    """
+    Orders configs the way Arma loads them: every config is loaded after the configs defining the addons listed in its
+    requiredAddons[]. Requirements that are not defined by any of the given configs are ignored, otherwise the input
+    order is kept.
+
+    :param asts: list of lists of AST nodes - the configs to sort
+    :return: list of ints - the indices of the configs in load order
+    """
+    providers = {}
+    patches = [get_patches(ast) for ast in asts]
+    for index, (addons, _) in enumerate(patches):
+        for addon in addons:
+            providers.setdefault(lower_name(addon), index)
+
+    dependencies = []
+    dependents = [[] for _ in asts]
+    for index, (_, required_addons) in enumerate(patches):
+        required = set()
+        for addon in required_addons:
+            provider = providers.get(lower_name(addon))
+            if provider is not None and provider != index:
+                required.add(provider)
+        dependencies.append(len(required))
+        for provider in required:
+            dependents[provider].append(index)
+
+    ready = [index for index in range(len(asts)) if dependencies[index] == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        index = heapq.heappop(ready)
+        order.append(index)
+        for dependent in dependents[index]:
+            dependencies[dependent] -= 1
+            if dependencies[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(order) != len(asts):
+        cyclic = [patches[index][0] for index in range(len(asts)) if dependencies[index] > 0]
+        raise MergeError('cyclic requiredAddons between {}'.format(cyclic))
+    return order
+
+
+def _key(node):
+    if isinstance(node, (ClassDefinition, ExternalClassReference)):
+        return 'class', lower_name(node.class_name)
+    elif isinstance(node, Assignment):
+        return 'property', lower_name(node.name)
+    return None
+
+
+def merge_classes(base: ClassDefinition, overlay: ClassDefinition) -> ClassDefinition:
+    """
+    Merges a class definition into an earlier definition of the same class. Properties of overlay replace those of
+    base, subclasses are merged recursively and the parent class of overlay replaces the one of base. Neither input is
+    modified, unchanged subtrees are shared with the inputs.
+
+    :param base: ClassDefinition - the earlier definition
+    :param overlay: ClassDefinition - the later definition
+    :return: ClassDefinition - the merged class, base itself if overlay does not change anything
+    """
+    body = merge_bodies(base.body, overlay.body)
+    if body is base.body and base.parent_class == overlay.parent_class:
+        return base
+    return ClassDefinition.from_values(base.class_name, body, overlay.parent_class, base.line_no, base.line_pos)
+
+
+def merge_bodies(base: list, overlay: list) -> list:
+    """
+    Merges the nodes of a class body (or of the top-level) into an earlier one, see merge_classes().
+
+    :param base: list of AST nodes - the earlier body
+    :param overlay: list of AST nodes - the later body
+    :return: list of AST nodes - the merged body, base itself if overlay does not change anything
+    """
+    result = None
+    positions = {}
+    for position, node in enumerate(base):
+        key = _key(node)
+        if key is not None:
+            positions[key] = position
+
+    for node in overlay:
+        key = _key(node)
+        position = positions.get(key) if key is not None else None
+        if position is None:
+            merged = node
+        else:
+            current = (result or base)[position]
+            if isinstance(node, ExternalClassReference):
+                # forward declaration of a class that already exists
+                continue
+            elif isinstance(node, ClassDefinition) and isinstance(current, ClassDefinition):
+                merged = merge_classes(current, node)
+            elif isinstance(node, Assignment) and structurally_equal(node, current):
+                continue
+            else:
+                merged = node
+            if merged is current:
+                continue
+
+        if result is None:
+            result = list(base)
+        if position is None:
+            if key is not None:
+                positions[key] = len(result)
+            result.append(merged)
+        else:
+            result[position] = merged
+
+    return base if result is None else result
+
+
+class ConfigMerger:
+    def __init__(self):
+        """
+        Merges many configs into one following their load order (see sort_by_load_order()) and keeps the merged state
+        after each config. If a config is updated, only that config and the ones loaded after it are merged again.
+        """
+        self.configs = OrderedDict()
+        self._dirty = set()
+        self._order = []
+        self._snapshots = []
+
+    def set_config(self, name: str, ast: list):
+        """
+        Adds or replaces a config.
+
+        :param name: string - a unique name for the config, e.g., its file path
+        :param ast: list of AST nodes - the top-level nodes of the config
+        """
+        self.configs[name] = ast
+        self._dirty.add(name)
+
+    def remove_config(self, name: str):
+        """
+        :param name: string - the name of the config to remove
+        """
+        del self.configs[name]
+        self._dirty.add(name)
+
+    @property
+    def load_order(self) -> list:
+        """
+        :return: list of strings - the names of the configs in load order
+        """
+        names = list(self.configs)
+        return [names[index] for index in sort_by_load_order([self.configs[name] for name in names])]
+
+    def merge(self) -> list:
+        """
+        :return: list of AST nodes - the top-level nodes of the merged config
+        """
+        order = self.load_order
+        start = 0
+        while start < min(len(order), len(self._order)) \
+                and order[start] == self._order[start] and order[start] not in self._dirty:
+            start += 1
+
+        snapshots = self._snapshots[:start]
+        merged = snapshots[-1] if snapshots else []
+        for name in order[start:]:
+            merged = merge_bodies(merged, self.configs[name])
+            snapshots.append(merged)
+
+        self._order = order
+        self._snapshots = snapshots
+        self._dirty = set()
+        return merged
+
+
+def merge_configs(asts: list) -> list:
+    """
+    Merges configs into one following their load order, see ConfigMerger.
+
+    :param asts: list of lists of AST nodes - the configs to merge
+    :return: list of AST nodes - the top-level nodes of the merged config
+    """
+    merged = []
+    for index in sort_by_load_order(asts):
+        merged = merge_bodies(merged, asts[index])
+    return merged
@@ -3,9 +3,14 @@ from parser import ParserError
 from typing import Union
 
 from armaclassparser.ast import StringLiteral, Constant, Identifier, ArrayDeclaration, Assignment, ClassDefinition, \
-    Array, ExternalClassReference
+    Array, ExternalClassReference, parse_number, intern_value
+from armaclassparser.classfilter import ClassPathFilter
 from armaclassparser.errors import ParsingError, MissingTokenError, UnexpectedTokenError
-from armaclassparser.lexer import TokenType, Token
+from armaclassparser.lexer import TokenType, Token, source_text
+
+WHITESPACES = [TokenType.WHITESPACE, TokenType.TAB]
+WHITESPACES_AND_NEWLINES = [TokenType.WHITESPACE, TokenType.TAB, TokenType.NEWLINE]
+ARRAY_SEPARATORS = [TokenType.COMMA, TokenType.R_CURLY]
 
 
 class TokenProcessor:
@@ -43,45 +48,69 @@ class TokenProcessor:
         return self.token()
 
     def skip_whitespaces(self, include_newlines=False):
-        skip_tokens = [TokenType.WHITESPACE, TokenType.TAB] + ([TokenType.NEWLINE] if include_newlines else [])
+        skip_tokens = WHITESPACES_AND_NEWLINES if include_newlines else WHITESPACES
         while self.token().token_type in skip_tokens and self.index < len(self.tokens):
             self.next()
 
 
 class Parser(TokenProcessor):
-    def __init__(self, tokens, file_name):
+    def __init__(self, tokens, file_name, class_filter=None, keep_tokens=True, typed_arrays=False):
+        """
+        :param tokens: list of tokens - the (pre-processed) input
+        :param file_name: string - the name of the parsed file
+        :param class_filter: string, list of strings or ClassPathFilter - if set, only classes matching the filter are
+                             parsed, all other classes are skipped, e.g., 'CfgVehicles/*/Turrets/**'
+        :param keep_tokens: bool - if False, the AST nodes only store their start position and values instead of the
+                            tokens they were created from, which greatly reduces memory usage
+        :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are stored in typed
+                             buffers (see Array.pack()) instead of one Constant node per element
+        """
         TokenProcessor.__init__(self, tokens)
         self.stack = []
         self.file_name = file_name
+        if class_filter is not None and not isinstance(class_filter, ClassPathFilter):
+            class_filter = ClassPathFilter(class_filter)
+        self.class_filter = class_filter
+        self.filter_state = class_filter.initial_state() if class_filter else None
+        self.keep_tokens = keep_tokens
+        self.typed_arrays = typed_arrays
 
     def _parse_string_literal(self):
-        tokens = [self.token()]
+        start = self.index
+        quote_token = self.token()
 
-        if tokens[0].token_type not in [TokenType.DOUBLE_QUOTES, TokenType.QUOTE]:
-            raise UnexpectedTokenError([TokenType.DOUBLE_QUOTES, TokenType.QUOTE], tokens[0])
+        if quote_token.token_type not in [TokenType.DOUBLE_QUOTES, TokenType.QUOTE]:
+            raise UnexpectedTokenError([TokenType.DOUBLE_QUOTES, TokenType.QUOTE], quote_token)
 
         self.index += 1
         while self.index < len(self.tokens):
             token = self.tokens[self.index]
-            if token.token_type == tokens[0].token_type:
-                tokens.append(token)
-                self.index += 1
-                return StringLiteral(tokens)
-            else:
-                tokens.append(token)
-                self.index += 1
+            self.index += 1
+            if token.token_type == quote_token.token_type:
+                if self.keep_tokens:
+                    return StringLiteral(self.tokens[start:self.index])
+                content = self.tokens[start + 1:self.index - 1]
+                value = source_text(content)
+                if value is None:
+                    value = ''.join(token.value for token in content)
+                return StringLiteral.from_values(intern_value(value), quote_token.line_no, quote_token.line_pos)
 
-        raise MissingTokenError(tokens[0].token_type)
+        raise MissingTokenError(quote_token.token_type)
 
     def _parse_constant(self):
         number_literal_token = self.expect(TokenType.NUMBER)
         self.next()
-        return Constant(number_literal_token)
+        if self.keep_tokens:
+            return Constant(number_literal_token)
+        return Constant.from_values(parse_number(number_literal_token.value), number_literal_token.line_no,
+                                    number_literal_token.line_pos)
 
     def _parse_identifier(self):
         name_token = self.expect(TokenType.WORD)
         self.index += 1
-        return Identifier(name_token)
+        if self.keep_tokens:
+            return Identifier(name_token)
+        return Identifier.from_values(name_token.value, name_token.line_no, name_token.line_pos)
 
     def _parse_array_declaration(self):
         l_square = self.expect(TokenType.L_SQUARE)
@@ -92,7 +121,9 @@ class Parser(TokenProcessor):
         if not isinstance(identifier, Identifier):
             raise ParserError('expected identifier for array declaration, but got {}'.format(repr(identifier)))
 
-        return ArrayDeclaration(identifier, l_square, r_square)
+        if self.keep_tokens:
+            return ArrayDeclaration(identifier, l_square, r_square)
+        return ArrayDeclaration.from_values(identifier)
 
     def _parse_assignment(self):
         equals_token = self.expect(TokenType.EQUALS)
@@ -120,20 +151,67 @@ class Parser(TokenProcessor):
 
         semicolon_token = self.expect(TokenType.SEMICOLON)
         self.index += 1
-        return Assignment(left_side, equals_token, right_side, semicolon_token)
+        if self.keep_tokens:
+            return Assignment(left_side, equals_token, right_side, semicolon_token)
+        return Assignment.from_values(left_side, right_side, equals_token.line_no, equals_token.line_pos)
+
+    def _scan_number_run(self) -> list:
+        """
+        Collects a run of numbers separated by commas (and whitespaces), e.g., 1, 2.5, -3. Stops after the last number
+        of the run, so that the caller can continue with the next separator.
+
+        :return: list of tokens - the number tokens of the run
+        """
+        tokens = self.tokens
+        length = len(tokens)
+        number_tokens = []
+        index = self.index
+        while True:
+            number_tokens.append(tokens[index])
+            end = index + 1
+            index = end
+            while index < length and tokens[index].token_type in WHITESPACES_AND_NEWLINES:
+                index += 1
+            if index >= length or tokens[index].token_type != TokenType.COMMA:
+                break
+            index += 1
+            while index < length and tokens[index].token_type in WHITESPACES_AND_NEWLINES:
+                index += 1
+            if index >= length or tokens[index].token_type != TokenType.NUMBER:
+                break
+        self.index = end
+        return number_tokens
+
+    def _create_constants(self, number_tokens: list) -> list:
+        """
+        Converts a run of number tokens into Constant nodes at once.
+
+        :param number_tokens: list of tokens - the tokens as returned by _scan_number_run()
+        :return: list of Constants
+        """
+        if self.keep_tokens:
+            return [Constant(token) for token in number_tokens]
+        return [Constant.from_values(parse_number(token.value), token.line_no, token.line_pos)
+                for token in number_tokens]
 
     def _parse_array(self):
         l_curly_token = self.expect(TokenType.L_CURLY)
         token = self.next()
 
         children = []
+        number_tokens = None
         while token.token_type != TokenType.R_CURLY and self.index < len(self.tokens):
-            if token.token_type in [TokenType.WHITESPACE, TokenType.TAB, TokenType.NEWLINE]:
+            if token.token_type in WHITESPACES_AND_NEWLINES:
                 self.skip_whitespaces(include_newlines=True)
             token = self.token()
 
             if token.token_type == TokenType.NUMBER:
-                children.append(self._parse_constant())
+                run = self._scan_number_run()
+                if self.typed_arrays and len(children) == 0 and self._is_array_end():
+                    # array consists only of numbers, try to pack it without creating Constant nodes
+                    number_tokens = run
+                    break
+                children += self._create_constants(run)
             elif token.token_type in [TokenType.QUOTE, TokenType.DOUBLE_QUOTES]:
                 children.append(self._parse_string_literal())
             elif token.token_type == TokenType.WORD:
@@ -144,7 +222,7 @@ class Parser(TokenProcessor):
                 raise ParserError('encountered unexpected token while parsing array: {}'.format(repr(token)))
 
             self.skip_whitespaces(include_newlines=True)
-            self.expect([TokenType.COMMA, TokenType.R_CURLY])
+            self.expect(ARRAY_SEPARATORS)
             if self.token().token_type == TokenType.COMMA:
                 token = self.next()
                 continue
@@ -153,7 +231,48 @@ class Parser(TokenProcessor):
 
         r_curly_token = self.expect(TokenType.R_CURLY)
         self.index += 1
-        return Array(l_curly_token, children, r_curly_token)
+        if self.keep_tokens:
+            array = Array(l_curly_token, children, r_curly_token)
+        else:
+            array = Array.from_values(children, l_curly_token.line_no, l_curly_token.line_pos)
+        if number_tokens is not None:
+            if not array.pack([parse_number(token.value) for token in number_tokens]):
+                array.children = self._create_constants(number_tokens)
+        elif self.typed_arrays:
+            array.pack()
+        return array
+
+    def _is_array_end(self) -> bool:
+        """
+        Skips whitespaces and checks whether the array is closed afterwards.
+
+        :return: True if the next token is }, False otherwise
+        """
+        self.skip_whitespaces(include_newlines=True)
+        return self.token().token_type == TokenType.R_CURLY
+
+    def _skip_class_body(self):
+        """
+        Skips the body of a class by brace matching without creating any AST nodes. Stops at the closing }.
+        """
+        l_curly_token = self.expect(TokenType.L_CURLY)
+        unclosed_l_curlies = 0
+        while self.index < len(self.tokens):
+            token_type = self.tokens[self.index].token_type
+            if token_type == TokenType.L_CURLY:
+                unclosed_l_curlies += 1
+            elif token_type == TokenType.R_CURLY:
+                unclosed_l_curlies -= 1
+                if unclosed_l_curlies == 0:
+                    return
+            elif token_type in [TokenType.DOUBLE_QUOTES, TokenType.QUOTE]:
+                # braces inside of strings do not count
+                self.index += 1
+                while self.index < len(self.tokens) and self.tokens[self.index].token_type != token_type:
+                    self.index += 1
+            self.index += 1
+
+        raise MissingTokenError(TokenType.R_CURLY, l_curly_token)
 
     def _parse_class_definition(self):
         class_keyword_token = self.expect(TokenType.KEYWORD_CLASS)
@@ -164,6 +283,10 @@ class Parser(TokenProcessor):
         self.next()
         self.skip_whitespaces(include_newlines=True)
 
+        previous_filter_state = self.filter_state
+        if self.class_filter is not None:
+            self.filter_state = self.class_filter.advance(previous_filter_state, class_name_token.value)
+
         token = self.token()
         parent_class_token = None
         if token.token_type == TokenType.COLON:
@@ -173,7 +296,16 @@ class Parser(TokenProcessor):
             self.next()
             self.skip_whitespaces(include_newlines=True)
 
-        if self.token().token_type == TokenType.L_CURLY:
+        if self.token().token_type == TokenType.L_CURLY and self.class_filter is not None and self.filter_state is None:
+            # class cannot match the filter, skip it entirely
+            self.filter_state = previous_filter_state
+            self._skip_class_body()
+            colon_token = self.next()
+            if colon_token.token_type != TokenType.SEMICOLON:
+                raise UnexpectedTokenError(TokenType.SEMICOLON, colon_token)
+            self.index += 1
+            return None
+        elif self.token().token_type == TokenType.L_CURLY:
             l_curly_token = self.token()
             self.next()
 
@@ -186,18 +318,30 @@ class Parser(TokenProcessor):
 
             body = self.stack
             self.stack = previous_stack
+            self.filter_state = previous_filter_state
 
             if self.token().token_type == TokenType.R_CURLY:
                 colon_token = self.next()
                 if colon_token.token_type != TokenType.SEMICOLON:
                     raise UnexpectedTokenError(TokenType.SEMICOLON, colon_token)
                 self.index += 1
-                return ClassDefinition(class_keyword_token, class_name_token, body, parent_class_token)
+                if self.keep_tokens:
+                    return ClassDefinition(class_keyword_token, class_name_token, body, parent_class_token)
+                return ClassDefinition.from_values(class_name_token.value, body,
+                                                   parent_class_token.value if parent_class_token else None,
+                                                   class_keyword_token.line_no, class_keyword_token.line_pos)
             else:
                 raise MissingTokenError(TokenType.R_CURLY, l_curly_token)
         elif self.token().token_type == TokenType.SEMICOLON:
             self.index += 1
-            return ExternalClassReference(class_keyword_token, class_name_token)
+            skipped = self.class_filter is not None and self.filter_state is None
+            self.filter_state = previous_filter_state
+            if skipped:
+                return None
+            if self.keep_tokens:
+                return ExternalClassReference(class_keyword_token, class_name_token)
+            return ExternalClassReference.from_values(class_name_token.value, class_keyword_token.line_no,
+                                                      class_keyword_token.line_pos)
         else:
             raise UnexpectedTokenError(TokenType.L_CURLY, self.token())
 
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import sys
 
@@ -16,15 +17,91 @@ class Define:
         return self.args is not None and len(self.args) > 0
 
 
+def content_hash(input_data: str) -> str:
+    """
+    :param input_data: string - the content of a file
+    :return: string - hash of the content, used to detect changed files
+    """
+    return hashlib.sha1(input_data.encode('utf-8')).hexdigest()
+
+
+class IncludeGraph:
+    def __init__(self):
+        """
+        Files included during pre-processing. Each #include is stored as an edge from the including file to the
+        included one, together with the content hash of the included file at the time it was read.
+        """
+        self.includes = {}
+
+    def add_include(self, file_path: str, included_file_path: str, included_content_hash: str):
+        """
+        :param file_path: string - the file containing the #include directive
+        :param included_file_path: string - the resolved path of the included file
+        :param included_content_hash: string - the content hash of the included file, see content_hash()
+        """
+        edges = self.includes.setdefault(os.path.normpath(file_path), [])
+        edges.append((os.path.normpath(included_file_path), included_content_hash))
+
+    def dependencies(self, file_path: str) -> dict:
+        """
+        :param file_path: string - the including file
+        :return: dict - maps all files included by file_path, directly or transitively, to their content hash
+        """
+        result = {}
+        pending = [os.path.normpath(file_path)]
+        while pending:
+            for included_file_path, included_content_hash in self.includes.get(pending.pop(), []):
+                if included_file_path not in result:
+                    result[included_file_path] = included_content_hash
+                    pending.append(included_file_path)
+        return result
+
+    def dependents(self, file_path: str) -> set:
+        """
+        :param file_path: string - the included file
+        :return: set of strings - all files which include file_path, directly or transitively
+        """
+        included_by = {}
+        for including_file_path, edges in self.includes.items():
+            for included_file_path, _ in edges:
+                included_by.setdefault(included_file_path, set()).add(including_file_path)
+
+        result = set()
+        pending = [os.path.normpath(file_path)]
+        while pending:
+            for including_file_path in included_by.get(pending.pop(), ()):
+                if including_file_path not in result:
+                    result.add(including_file_path)
+                    pending.append(including_file_path)
+        return result
+
+
 class PreProcessor(TokenProcessor):
-    def __init__(self, tokens, file_path):
+    # the passes of preprocess() in order, as pairs of name and method
+    PASSES = (
+        ('remove_comments', '_remove_comments'),
+        ('replace_includes', '_replace_includes'),
+        ('remove_escaped_newlines', '_remove_escaped_newlines'),
+        ('process_directives', '_process_directives'),
+    )
+
+    def __init__(self, tokens, file_path, include_roots=None, token_spans=False):
         """
         :param tokens:
         :param file_path:
+        :param include_roots: list of strings - directories to resolve absolute includes (e.g., '\\z\\ace\\...') in,
+                              e.g., the extracted game data or a checkout of a mod
+        :param token_spans: bool - if True, included files are lexed into SpanTokens, see lexer.Lexer
         """
         TokenProcessor.__init__(self, tokens)
+        # the tokens are processed from left to right into a new list, so that removing directives and inserting
+        # expanded macros does not shift the remaining tokens each time
+        self.output = []
         self.file_path = file_path
+        self.include_roots = list(include_roots) if include_roots else []
+        self.token_spans = token_spans
         self.defines = {}
+        self.include_graph = IncludeGraph()
 
     def preprocess(self) -> list:
         """
@@ -36,10 +113,8 @@ class PreProcessor(TokenProcessor):
 
         :return: list of tokens - the input after pre-processing
         """
-        self._remove_comments()
-        self._replace_includes()
-        self._remove_escaped_newlines()
-        self._process_directives()
+        for _, method_name in self.PASSES:
+            getattr(self, method_name)()
 
         return self.tokens
 
@@ -48,7 +123,7 @@ class PreProcessor(TokenProcessor):
         Lookup the file path of an #include directive and resolve to an absolute path. For relative paths (e.g.,
         #include 'script_component.hpp') the input will be resolved on the file location of the pre-processed file. For
         absolute paths (e.g., #include '\\z\\ace\\...') it will first look on the same drive the currently pre-processed
-        file is on and if it cannot be found it will try to look in project drive (P:).
+        file is on, then in the include roots and if it cannot be found it will try to look in project drive (P:).
 
         NOTE: this probably won't work on Linux!
 
@@ -61,13 +136,17 @@ class PreProcessor(TokenProcessor):
             path_on_current_drive = os.path.join(drive, include_file_path)
             if os.path.isfile(path_on_current_drive):
                 return path_on_current_drive
-            else:
-                # file could not be found on current drive, use p-drive instead
-                path_on_p_drive = os.path.join('P:', include_file_path)
-                if not os.path.isfile(path_on_p_drive):
-                    msg = 'could not resolve absolute include "{}" in file {}'.format(include_file_path, self.file_path)
-                    raise PreProcessingError(msg)
-                return path_on_p_drive
+            for include_root in self.include_roots:
+                path_in_include_root = os.path.join(include_root, *include_file_path.strip('\\').split('\\'))
+                if os.path.isfile(path_in_include_root):
+                    return path_in_include_root
+
+            # file could not be found on current drive or in the include roots, use p-drive instead
+            path_on_p_drive = os.path.join('P:', include_file_path)
+            if not os.path.isfile(path_on_p_drive):
+                msg = 'could not resolve absolute include "{}" in file {}'.format(include_file_path, self.file_path)
+                raise PreProcessingError(msg)
+            return path_on_p_drive
         else:
             # relative file path, e.g., 'script_component.hpp'
             current_absolute_file_path = os.path.abspath(self.file_path)
@@ -106,49 +185,51 @@ class PreProcessor(TokenProcessor):
         """
         Processes #include directives by parsing the included file and inserting it contents in place of the #include.
         """
+        output = []
         self.index = 0
         while self.index < len(self.tokens):
             token = self.token()
             if token.token_type == TokenType.KEYWORD_INCLUDE:
-                include_start = self.index
                 self.expect(TokenType.KEYWORD_INCLUDE)
                 self.expect_next(TokenType.WHITESPACE)
                 self.index += 1
                 include_file_path = self._parse_include_file_path()
-                include_end = self.index
 
-                # recursively process the file to be included
+                # recursively process the file to be included, its contents replace the include statement
                 dst_file_path = self._resolve_include_file_path(include_file_path)
                 with open(dst_file_path, 'r', encoding='utf-8', newline=None) as fp:
                     input_data = fp.read()
-                tokens = Lexer(input_data, dst_file_path).tokenize()
+                self.include_graph.add_include(self.file_path, dst_file_path, content_hash(input_data))
+                tokens = Lexer(input_data, dst_file_path, self.token_spans).tokenize()
 
-                preprocessor = PreProcessor(tokens, dst_file_path)
+                preprocessor = PreProcessor(tokens, dst_file_path, self.include_roots, self.token_spans)
                 preprocessor.defines = self.defines
-                tokens = preprocessor.preprocess()
-
-                # replace include statement with included content
-                del self.tokens[include_start:include_end]
-                self.tokens = self.tokens[:include_start] + tokens + self.tokens[include_start:]
-                self.index += len(tokens) - (include_end - include_start)
+                preprocessor.include_graph = self.include_graph
+                output += preprocessor.preprocess()
 
             elif token.token_type in [TokenType.COMMENT, TokenType.MCOMMENT_START, TokenType.MCOMMENT_END]:
                 msg = 'expected comments to have been handled already, but found {}'.format(repr(token))
                 raise PreProcessingError(msg)
             else:
+                output.append(token)
                 self.index += 1
+        self.tokens = output
 
     def _remove_escaped_newlines(self):
         """
         Removes all newline symbols which are escaped using \\, such as might happen for macro definitions.
         """
+        output = []
         self.index = 0
         while self.index < len(self.tokens):
-            if self.token().token_type == TokenType.BACKSLASH:
-                next_token = self.tokens[self.index + 1]
-                if next_token.token_type == TokenType.NEWLINE:
-                    del self.tokens[self.index:self.index + 2]
-            self.index += 1
+            token = self.token()
+            if token.token_type == TokenType.BACKSLASH and self.has_next() and \
+                    self.tokens[self.index + 1].token_type == TokenType.NEWLINE:
+                self.index += 2
+            else:
+                output.append(token)
+                self.index += 1
+        self.tokens = output
 
     def _remove_comments(self):
         """
@@ -182,25 +263,26 @@ class PreProcessor(TokenProcessor):
             else:
                 self.next()
 
-        for start, end in reversed(removals):
-            del self.tokens[start:end + 1]
+        if removals:
+            output = []
+            keep_start = 0
+            for start, end in removals:
+                output += self.tokens[keep_start:start]
+                keep_start = end + 1
+            output += self.tokens[keep_start:]
+            self.tokens = output
 
-    def _delete_tokens_update_index(self, start_index, end_index):
+    def _skip_token(self):
         """
-        Deletes all tokens between [start_index:end_index] including the token at end_index, then updates self.index.
-
-        :param start_index: int - index at which to start deleting (inclusive)
-        :param end_index: int - index until which to delete (inclusive)
+        Skips the current token without adding it to the output, e.g., the last token of a resolved directive.
         """
-        del self.tokens[start_index:end_index + 1]
-        self.index -= end_index - start_index
+        self.index = min(self.index + 1, len(self.tokens))
 
     def _process_define(self):
         """
         Processes #define directives, e.g., #define EXP(x) x * x. The resulting Define object is put into the
         map of defines (self.defines) for later lookup.
         """
-        start_index = self.index
         self.expect(TokenType.KEYWORD_DEFINE)
         self.expect_next([TokenType.WHITESPACE, TokenType.TAB])
         self.skip_whitespaces()
@@ -244,14 +326,13 @@ class PreProcessor(TokenProcessor):
             print(msg, file=sys.stderr)
         self.defines[macro_name] = Define(macro_name, right_side, args)
 
-        # define was resolved, delete corresponding tokens
-        self._delete_tokens_update_index(start_index, self.index)
+        # define was resolved, skip the newline as well
+        self._skip_token()
 
     def _process_undefine(self):
         """
         Processes #undef directives and removes them from the mapping (self.defines).
         """
-        start_index = self.index
         self.expect(TokenType.KEYWORD_UNDEF)
         self.expect_next([TokenType.WHITESPACE, TokenType.TAB])
         self.skip_whitespaces()
@@ -267,17 +348,17 @@ class PreProcessor(TokenProcessor):
                 self.token().line_no)
             print(msg, file=sys.stderr)
 
-        # undefine was resolved, delete corresponding tokens
-        self._delete_tokens_update_index(start_index, self.index)
+        # undefine was resolved, skip its last token
+        self._skip_token()
 
     def _skip_until(self, break_tokens):
         """
-        Skips all tokens until one of the break tokens is encountered. The skipped tokens are deleted.
+        Skips all tokens until one of the break tokens is encountered. The skipped tokens are not added to the output.
 
         :param break_tokens: list of tokens - the tokens on which to stop skipping
         """
         while self.index < len(self.tokens) and self.token().token_type not in break_tokens:
-            del self.tokens[self.index]
+            self.index += 1
 
         if self.index == len(self.tokens):
             raise PreProcessingError('reached EOF while skipping until {}'.format(break_tokens))
@@ -300,39 +381,37 @@ class PreProcessor(TokenProcessor):
 
     def _process_if_else(self):
         """
-        Processes and replaces #ifdef, #ifndef, #else, #endif directives in place.
+        Processes #ifdef, #ifndef, #else, #endif directives, only the tokens of the active branch are added to the
+        output.
         """
-        start_index = self.index
         if_token = self.expect([TokenType.KEYWORD_IFDEF, TokenType.KEYWORD_IFNDEF])
 
         self.expect_next([TokenType.WHITESPACE, TokenType.TAB])
         self.skip_whitespaces()
         macro_name = self.expect(TokenType.WORD).value
         self.expect_next(TokenType.NEWLINE)
-        self._delete_tokens_update_index(start_index, self.index)
+        self._skip_token()
 
         if (if_token.token_type == TokenType.KEYWORD_IFDEF and macro_name in self.defines) or \
                 (if_token.token_type == TokenType.KEYWORD_IFNDEF and macro_name not in self.defines):
             # process until #else or #endif
             self._process_until([TokenType.KEYWORD_ELSE, TokenType.KEYWORD_ENDIF])
             if self.token().token_type == TokenType.KEYWORD_ELSE:
-                del self.tokens[self.index]
-                self.expect(TokenType.NEWLINE)
-                del self.tokens[self.index]
+                self.expect_next(TokenType.NEWLINE)
+                self._skip_token()
                 self._skip_until([TokenType.KEYWORD_ENDIF])
         else:
             # skip until #else or #endif
             self._skip_until([TokenType.KEYWORD_ELSE, TokenType.KEYWORD_ENDIF])
             if self.token().token_type == TokenType.KEYWORD_ELSE:
-                del self.tokens[self.index]
-                self.expect(TokenType.NEWLINE)
-                del self.tokens[self.index]
+                self.expect_next(TokenType.NEWLINE)
+                self._skip_token()
                 self._process_until([TokenType.KEYWORD_ENDIF])
 
-        # #endif was reached in any case, ignore and delete including newline
-        del self.tokens[self.index]
-        while self.token().token_type in [TokenType.NEWLINE, TokenType.TAB, TokenType.NEWLINE]:
-            del self.tokens[self.index]
+        # #endif was reached in any case, skip it including the following newlines
+        self._skip_token()
+        while self.index < len(self.tokens) and self.token().token_type in [TokenType.NEWLINE, TokenType.TAB]:
+            self.index += 1
 
     def _expand_macro(self, tokens):
         """
@@ -377,22 +456,19 @@ class PreProcessor(TokenProcessor):
                 # little trick: we treat all of the previously parsed arguments
                 right_side_processor.defines[key] = Define(key, value)
             right_side_processor._process_directives()
-            replacement = right_side_processor.tokens
-
-            return replacement
+            return right_side_processor.tokens
 
         else:
             # simple macro, just return processed right side
             right_side_processor = PreProcessor(define.right_side.copy(), file_path='<MACRO>')
             right_side_processor.defines = self.defines
             right_side_processor._process_directives()
-            replacement = right_side_processor.tokens
-            return replacement
+            return right_side_processor.tokens
 
     def _process_macro_usage(self):
         """
-        Processes one macro usage, e.g., "ADDON" or "EGVAR(main,variable)", replaces the old macro directive with the
-        expanded version and updates index accordingly.
+        Processes one macro usage, e.g., "ADDON" or "EGVAR(main,variable)", adds the expanded version to the output and
+        skips the tokens of the macro usage.
 
         :return: list of tokens - the expanded macro
         """
@@ -412,16 +488,15 @@ class PreProcessor(TokenProcessor):
                     unclosed_l_rounds -= 1
                 self.index += 1
 
-            # expand the entire macro and insert it into the tokens + update index
+            # expand the entire macro, the index is already behind the macro usage
             expanded_macro = self._expand_macro(self.tokens[start_index:self.index])
-            self.tokens = self.tokens[:start_index] + expanded_macro + self.tokens[self.index:]
-            self.index = start_index + len(expanded_macro)
         else:
-            # macro consists of only 1 token, expand it and insert into tokens + update index
+            # macro consists of only 1 token, expand it and skip the macro token
             expanded_macro = self._expand_macro([self.token()])
+            self.index += 1
 
-            if self.index > 0:
-                previous_token = self.tokens[self.index - 1]
+            if self.output:
+                previous_token = self.output[-1]
                 if previous_token.token_type == TokenType.HASH:
                     # special case of stringify, e.g., #define QUOTE(var) #var -> QUOTE(hello) -> "hello"
                     l_quote = Token(TokenType.DOUBLE_QUOTES, previous_token.file_path, previous_token.line_no,
@@ -429,19 +504,15 @@ class PreProcessor(TokenProcessor):
                     r_quote = Token(TokenType.DOUBLE_QUOTES, previous_token.file_path, previous_token.line_no,
                                     previous_token.line_pos)
                     expanded_macro = [l_quote] + expanded_macro + [r_quote]
-                    self.index -= 1
-                    del self.tokens[self.index]
-                    start_index -= 1
-
-            self.tokens = self.tokens[:start_index] + expanded_macro + self.tokens[start_index + 1:]
-            self.index = self.index + len(expanded_macro)
+                    self.output.pop()
 
+        self.output += expanded_macro
         return expanded_macro
 
     def _process_next(self):
         """
         Processes next token or pre-processor directive. If token is a pre-processor directive it will be processed and
-        replaced/deleted. Leaves all other tokens as is.
+        skipped, macro usages are expanded. All resulting tokens are added to the output.
         Returns a list of all tokens that replaced the processed one, e.g., in case of macro expansion it will hold the
         newly added tokens. For pre-processor directives #define, #undef and #if/else it will return empty list, as
         these are simply processed and then removed. All other tokens are left as is and returned as [token].
@@ -462,6 +533,7 @@ class PreProcessor(TokenProcessor):
                 return self._process_macro_usage()
 
         token = self.token()
+        self.output.append(token)
         self.index += 1
         return [token]
 
@@ -469,6 +541,8 @@ class PreProcessor(TokenProcessor):
         """
         Processes all pre-processor directives (except #include) and leaves all other tokens as is.
         """
+        self.output = []
         self.index = 0
         while self.index < len(self.tokens):
             self._process_next()
+        self.tokens = self.output
@@ -0,0 +1,164 @@
+import gc
+import tracemalloc
+
+from armaclassparser import lexer, parser, preprocessor
+from armaclassparser.ast import ASTNode
+from armaclassparser.lexer import Token
+
+
+class StageMemory:
+    __slots__ = ('stage', 'peak', 'retained', 'objects')
+
+    def __init__(self, stage: str, peak: int, retained: int, objects: dict):
+        """
+        :param stage: string - 'lex', 'preprocess.<pass>' (see PreProcessor.PASSES) or 'parse'
+        :param peak: int - the most bytes allocated at any time during the stage, relative to the start of profiling
+        :param retained: int - bytes still allocated after the stage, relative to the start of profiling
+        :param objects: dict - maps type names (Token and the ASTNode subclasses) to the number of instances alive
+                        after the stage, relative to the start of profiling
+        """
+        self.stage = stage
+        self.peak = peak
+        self.retained = retained
+        self.objects = objects
+
+    def to_dict(self) -> dict:
+        return {'peak': self.peak, 'retained': self.retained, 'objects': self.objects}
+
+    def __repr__(self):
+        return '<StageMemory {} peak={} retained={}>'.format(self.stage, self.peak, self.retained)
+
+
+def _count_objects() -> dict:
+    counts = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, (Token, ASTNode)):
+            type_name = type(obj).__name__
+            counts[type_name] = counts.get(type_name, 0) + 1
+    return counts
+
+
+# Python < 3.9 cannot reset the peak of tracemalloc, see _restarted_peaks()
+_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+
+class _Profiler:
+    def __init__(self):
+        self.stages = []
+        gc.collect()
+        self.baseline_objects = _count_objects()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        if _RESET_PEAK:
+            tracemalloc.reset_peak()
+
+    def measure(self, stage: str):
+        # the peak is taken before collecting, so that garbage of the stage still counts towards it
+        peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        objects = {}
+        for type_name, count in _count_objects().items():
+            count -= self.baseline_objects.get(type_name, 0)
+            if count:
+                objects[type_name] = count
+        self.stages.append(StageMemory(stage, peak - self.baseline, retained - self.baseline, objects))
+        # counting allocates a list of all objects, which must not show up as the peak of the next stage
+        if _RESET_PEAK:
+            tracemalloc.reset_peak()
+
+
+def _restarted_peaks(stages) -> list:
+    # Without tracemalloc.reset_peak(), tracing is restarted before each stage and the peak of the new traces is taken.
+    # Memory allocated before the restart is not traced, freeing it does not lower the traced memory, so these peaks are
+    # upper bounds of what the stage allocated on top of the memory retained by the previous stages.
+    peaks = []
+    gc.collect()
+    tracemalloc.stop()
+    tracemalloc.start()
+    for _ in stages:
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        gc.collect()
+        tracemalloc.stop()
+        tracemalloc.start()
+    return peaks
+
+
+def _stages(input_data: str, file_path: str, pre_process: bool, class_filter, keep_tokens: bool, typed_arrays: bool,
+            include_roots, token_spans: bool):
+    # runs the stages one by one, yielding the name of each stage while its result is still alive. Intermediate results
+    # are released as soon as the next stage replaced them.
+    tokens = lexer.Lexer(input_data, file_path, token_spans).tokenize()
+    yield 'lex'
+
+    if pre_process:
+        pre_processor = preprocessor.PreProcessor(tokens, file_path, include_roots, token_spans)
+        del tokens
+        for pass_name, method_name in pre_processor.PASSES:
+            getattr(pre_processor, method_name)()
+            yield 'preprocess.' + pass_name
+        tokens = pre_processor.tokens
+        del pre_processor
+
+    ast = parser.Parser(tokens, file_path, class_filter=class_filter, keep_tokens=keep_tokens,
+                        typed_arrays=typed_arrays).parse()
+    del tokens
+    yield 'parse'
+    # the AST is only held so that it counts as retained memory of the parse stage
+    del ast
+
+
+def profile_memory(input_data: str, file_path=lexer.STRING_INPUT_FILE, pre_process=True, class_filter=None,
+                   keep_tokens=True, typed_arrays=False, include_roots=None, token_spans=False) -> list:
+    """
+    Parses a config like armaclassparser.parse_from_string() while tracing memory allocations with tracemalloc. The
+    memory is measured after the lexer, after each pass of the pre-processor and after the parser. Intermediate results
+    are released as soon as the next stage replaced them, so the retained memory after the parser is what the AST
+    needs. Tracing slows parsing down considerably, time it separately (see benchmark.time_stages()).
+
+    Python < 3.9 cannot reset the peak of tracemalloc. There, the config is parsed a second time with tracing restarted
+    before each stage, which loses the traces of a tracing session started before, and the peaks are upper bounds.
+
+    :param input_data: string - the config
+    :param file_path: string - the path of the config, used to resolve relative includes
+    :param pre_process: bool - if True, the config is pre-processed
+    :param class_filter: ClassPathFilter, string or list of strings - only parse the matching classes
+    :param keep_tokens: bool - if True, the AST nodes keep their tokens, see parser.Parser
+    :param typed_arrays: bool - if True, numeric arrays are packed, see parser.Parser
+    :param include_roots: list of strings - directories to resolve absolute includes in, see PreProcessor
+    :param token_spans: bool - if True, the tokens reference the input instead of holding their values, see lexer.Lexer
+    :return: list of StageMemory - one per stage, in order
+    """
+    arguments = input_data, file_path, pre_process, class_filter, keep_tokens, typed_arrays, include_roots, token_spans
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        profiler = _Profiler()
+        for stage in _stages(*arguments):
+            profiler.measure(stage)
+        stages = profiler.stages
+        del profiler
+
+        if not _RESET_PEAK:
+            retained = 0
+            for stage, peak in zip(stages, _restarted_peaks(_stages(*arguments))):
+                stage.peak = max(retained + peak, stage.retained)
+                retained = stage.retained
+        return stages
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def profile_file(file_path: str, pre_process=True, class_filter=None, keep_tokens=True, typed_arrays=False,
+                 include_roots=None, token_spans=False) -> list:
+    """
+    Like profile_memory(), but reads the config from a file. The memory of the file content is not included.
+
+    :param file_path: string - the config file
+    :return: list of StageMemory - one per stage, in order
+    """
+    with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+        input_data = fp.read()
+    return profile_memory(input_data, file_path, pre_process, class_filter, keep_tokens, typed_arrays, include_roots,
+                          token_spans)
@@ -0,0 +1,260 @@
+import functools
+
+from armaclassparser.ast import BodyIndex, ClassDefinition, Constant, StringLiteral, Identifier, parse_number, \
+    lower_name
+
+SEPARATOR = '/'
+ANY_NAME = '*'
+ANY_DEPTH = '**'
+
+
+class Predicate:
+    def __init__(self, name: str, operator=None, value=None):
+        """
+        Condition on a property of a class, e.g., [scope=2], [scope!=0] or [displayName].
+
+        :param name: string - the property name (case-insensitive)
+        :param operator: string - '=', '!=' or None to only check that the property exists
+        :param value: string - the value to compare against
+        """
+        self.name = lower_name(name)
+        self.operator = operator
+        self.value = value
+        self.number = None
+        if value is not None:
+            try:
+                self.number = parse_number(value)
+            except ValueError:
+                pass
+
+    def _equals(self, right) -> bool:
+        if isinstance(right, Constant):
+            return self.number is not None and right.value == self.number
+        if isinstance(right, (StringLiteral, Identifier)):
+            return right.value == self.value
+        return False
+
+    def matches(self, properties: dict) -> bool:
+        """
+        :param properties: dict - maps lower-case property names to Assignments
+        :return: True if the properties fulfill this predicate, False otherwise
+        """
+        assignment = properties.get(self.name)
+        if self.operator is None:
+            return assignment is not None
+        if assignment is None:
+            return False
+        equals = self._equals(assignment.right)
+        return equals if self.operator == '=' else not equals
+
+
+class Step:
+    def __init__(self, predicates: list):
+        # base class of the steps of a path, which implement select(scope, context) -> list of matching nodes
+        self.predicates = predicates
+
+    def _accept(self, node, context) -> bool:
+        if not self.predicates:
+            return True
+        if not isinstance(node, ClassDefinition):
+            return False
+        properties = context.properties(node)
+        return all(predicate.matches(properties) for predicate in self.predicates)
+
+
+class NameStep(Step):
+    def __init__(self, name: str, predicates: list):
+        Step.__init__(self, predicates)
+        self.name = lower_name(name)
+
+    def select(self, scope, context) -> list:
+        result = []
+        for node in [context.classes(scope).get(self.name), context.properties(scope).get(self.name)]:
+            if node is not None and self._accept(node, context):
+                result.append(node)
+        return result
+
+
+class WildcardStep(Step):
+    def select(self, scope, context) -> list:
+        result = [node for node in context.classes(scope).values() if self._accept(node, context)]
+        if not self.predicates:
+            result += context.properties(scope).values()
+        return result
+
+
+class DescendantStep(Step):
+    def select(self, scope, context) -> list:
+        # all classes below scope, including scope itself unless it is the top-level
+        result = []
+        stack = [scope]
+        while stack:
+            node = stack.pop()
+            if node is not None and self._accept(node, context):
+                result.append(node)
+            if node is None or isinstance(node, ClassDefinition):
+                stack.extend(reversed(list(context.classes(node).values())))
+        return result
+
+
+class Context:
+    def __init__(self, ast: list, resolver=None):
+        self.root_index = BodyIndex(ast)
+        self.resolver = resolver
+
+    def classes(self, scope) -> dict:
+        if scope is None:
+            return self.root_index.classes
+        if not isinstance(scope, ClassDefinition):
+            return {}
+        if self.resolver is not None:
+            return self.resolver.get_classes(scope)
+        return scope.index.classes
+
+    def properties(self, scope) -> dict:
+        if scope is None:
+            return self.root_index.properties
+        if not isinstance(scope, ClassDefinition):
+            return {}
+        if self.resolver is not None:
+            return self.resolver.get_properties(scope)
+        return scope.index.properties
+
+
+class Query:
+    def __init__(self, path: str):
+        """
+        Compiled path expression over a parsed config, e.g., 'CfgWeapons/*[scope=2]/magazines'. Each segment selects
+        classes or properties by name (case-insensitive), '*' selects all classes and properties of a class and '**'
+        selects a class and all of its descendant classes. Segments can be followed by predicates on the properties of
+        the selected classes: [name] checks that a property exists, [name=value] and [name!=value] compare its value.
+
+        :param path: string - the path expression
+        """
+        self.path = path
+        self.steps = [self._compile_segment(segment) for segment in self._split(path)]
+        if len(self.steps) == 0:
+            raise ValueError('empty query {}'.format(repr(path)))
+
+    @staticmethod
+    def _split(path: str) -> list:
+        segments = []
+        current = []
+        depth = 0
+        quote = None
+        for char in path:
+            if quote is not None:
+                if char == quote:
+                    quote = None
+            elif char in '"\'' and depth > 0:
+                quote = char
+            elif char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+                if depth < 0:
+                    raise ValueError('unbalanced ] in query {}'.format(repr(path)))
+            elif char == SEPARATOR and depth == 0:
+                segments.append(''.join(current))
+                current = []
+                continue
+            current.append(char)
+        if depth != 0 or quote is not None:
+            raise ValueError('unterminated predicate in query {}'.format(repr(path)))
+        segments.append(''.join(current))
+
+        if segments and segments[0] == '':
+            # leading / is allowed
+            segments = segments[1:]
+        return segments
+
+    @staticmethod
+    def _compile_predicate(text: str) -> Predicate:
+        for operator in ['!=', '=']:
+            if operator in text:
+                name, value = text.split(operator, 1)
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                    value = value[1:-1]
+                return Predicate(Query._check_name(name.strip()), operator, value)
+        return Predicate(Query._check_name(text.strip()))
+
+    @staticmethod
+    def _check_name(name: str) -> str:
+        if len(name) == 0 or not all(char.isalnum() or char == '_' for char in name):
+            raise ValueError('invalid name {} in query'.format(repr(name)))
+        return name
+
+    def _compile_segment(self, segment: str) -> Step:
+        bracket = segment.find('[')
+        name = (segment if bracket < 0 else segment[:bracket]).strip()
+
+        predicates = []
+        rest = '' if bracket < 0 else segment[bracket:]
+        while rest:
+            if not rest.startswith('['):
+                raise ValueError('unexpected {} in query {}'.format(repr(rest), repr(self.path)))
+            end = self._find_predicate_end(rest)
+            predicates.append(self._compile_predicate(rest[1:end]))
+            rest = rest[end + 1:].strip()
+
+        if name == ANY_DEPTH:
+            return DescendantStep(predicates)
+        elif name == ANY_NAME:
+            return WildcardStep(predicates)
+        return NameStep(self._check_name(name), predicates)
+
+    @staticmethod
+    def _find_predicate_end(text: str) -> int:
+        quote = None
+        for index, char in enumerate(text):
+            if quote is not None:
+                if char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == ']':
+                return index
+        raise ValueError('unterminated predicate {}'.format(repr(text)))
+
+    def evaluate(self, ast: list, resolver=None) -> list:
+        """
+        Evaluates the query on a parsed config.
+
+        :param ast: list of AST nodes - the top-level nodes of the config
+        :param resolver: InheritanceResolver - if set, inherited classes and properties are taken into account
+        :return: list of ClassDefinition, ExternalClassReference and Assignment nodes that match the query
+        """
+        context = Context(ast, resolver)
+        scopes = [None]
+        for step in self.steps:
+            selected = []
+            seen = set()
+            for scope in scopes:
+                for node in step.select(scope, context):
+                    if id(node) not in seen:
+                        seen.add(id(node))
+                        selected.append(node)
+            scopes = selected
+        return scopes
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(path: str) -> Query:
+    """
+    :param path: string - the path expression, e.g., 'CfgWeapons/*[scope=2]/magazines'
+    :return: Query - the compiled query, compiled queries are cached
+    """
+    return Query(path)
+
+
+def query(ast: list, path: str, resolver=None) -> list:
+    """
+    Shortcut for compile_query(path).evaluate(ast, resolver).
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param path: string - the path expression, e.g., 'CfgWeapons/*[scope=2]/magazines'
+    :param resolver: InheritanceResolver - if set, inherited classes and properties are taken into account
+    :return: list of ClassDefinition, ExternalClassReference and Assignment nodes that match the query
+    """
+    return compile_query(path).evaluate(ast, resolver)
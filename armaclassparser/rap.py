@@ -0,0 +1,489 @@
+import io
+import mmap
+import os
+import struct
+import sys
+
+from armaclassparser.ast import ASTNodeType, Array, ArrayDeclaration, Assignment, ClassDefinition, Constant, \
+    ExternalClassReference, Identifier, StringLiteral, intern_value
+from armaclassparser.errors import RapError
+
+SIGNATURE = b'\0raP'
+
+# entry types of a class body
+ENTRY_CLASS = 0
+ENTRY_VALUE = 1
+ENTRY_ARRAY = 2
+ENTRY_EXTERN = 3
+ENTRY_DELETE = 4
+ENTRY_ARRAY_APPEND = 5
+
+# types of values and array elements
+VALUE_STRING = 0
+VALUE_FLOAT = 1
+VALUE_LONG = 2
+VALUE_ARRAY = 3
+VALUE_VARIABLE = 4
+VALUE_INT64 = 6
+
+_UINT32 = struct.Struct('<I')
+_INT32 = struct.Struct('<i')
+_INT64 = struct.Struct('<q')
+_FLOAT32 = struct.Struct('<f')
+_HEADER = struct.Struct('<4sIII')
+
+_INT32_MIN = -2 ** 31
+_INT32_MAX = 2 ** 31 - 1
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _asciiz(value: str) -> bytes:
+    data = value.encode('utf-8')
+    if b'\0' in data:
+        raise RapError('cannot store string containing a null character: {}'.format(repr(value)))
+    return data + b'\0'
+
+
+def _number(value) -> tuple:
+    if type(value) is int:
+        # integers must not lose precision by being stored as 32 bit floats
+        if _INT32_MIN <= value <= _INT32_MAX:
+            return VALUE_LONG, _INT32.pack(value)
+        if _INT64_MIN <= value <= _INT64_MAX:
+            return VALUE_INT64, _INT64.pack(value)
+        raise RapError('number {} is out of range'.format(value))
+    try:
+        return VALUE_FLOAT, _FLOAT32.pack(value)
+    except OverflowError:
+        raise RapError('number {} is out of range'.format(value))
+
+
+def _compressed_int(value: int) -> bytes:
+    # 7 bits per byte, least significant first, the high bit marks that another byte follows
+    result = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+class RapWriter:
+    def __init__(self, fp):
+        """
+        Writes parsed configs in the rapified (binarized) config.bin format to a file object. Class bodies are
+        referenced by their absolute file offset, the offsets are filled in once the bodies have been written.
+        Identifiers are stored as strings, as the game does.
+
+        :param fp: file object - the target, opened in binary mode
+        """
+        self.fp = fp
+        self._out = bytearray()
+
+    def _string(self, value: str):
+        self._out += _asciiz(value)
+
+    @staticmethod
+    def _scalar(node):
+        # type and encoded value of a scalar node, None if node is no scalar
+        if isinstance(node, (StringLiteral, Identifier)):
+            return VALUE_STRING, _asciiz(node.value)
+        elif isinstance(node, Constant):
+            return _number(node.value)
+        return None
+
+    def _array(self, root: Array):
+        out = self._out
+        stack = [iter((root,))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+            if isinstance(node, Array):
+                if node is not root:
+                    out.append(VALUE_ARRAY)
+                if node.values is not None:
+                    out += _compressed_int(len(node.values))
+                    for value in node.values:
+                        value_type, data = _number(value)
+                        out.append(value_type)
+                        out += data
+                else:
+                    children = node.children
+                    out += _compressed_int(len(children))
+                    stack.append(iter(children))
+            else:
+                scalar = self._scalar(node)
+                if scalar is None:
+                    raise RapError('cannot store {} inside an array on line {}, col {}'.format(
+                        node.type, node.line_no, node.line_pos))
+                out.append(scalar[0])
+                out += scalar[1]
+
+    def _entry(self, node, pending: list):
+        out = self._out
+        if isinstance(node, ClassDefinition):
+            out.append(ENTRY_CLASS)
+            self._string(node.class_name)
+            pending.append((len(out), node))
+            out += _UINT32.pack(0)
+        elif isinstance(node, ExternalClassReference):
+            out.append(ENTRY_EXTERN)
+            self._string(node.class_name)
+        elif isinstance(node, Assignment) and isinstance(node.left, ArrayDeclaration):
+            if not isinstance(node.right, Array):
+                raise RapError('expected array for {} on line {}, col {}'.format(node.name, node.line_no,
+                                                                                 node.line_pos))
+            out.append(ENTRY_ARRAY)
+            self._string(node.name)
+            self._array(node.right)
+        elif isinstance(node, Assignment):
+            scalar = self._scalar(node.right)
+            if scalar is None:
+                raise RapError('cannot store {} as value of {} on line {}, col {}'.format(
+                    node.right.type, node.name, node.line_no, node.line_pos))
+            out.append(ENTRY_VALUE)
+            out.append(scalar[0])
+            self._string(node.name)
+            out += scalar[1]
+        else:
+            raise RapError('cannot store {} on line {}, col {}'.format(node.type, node.line_no, node.line_pos))
+
+    def _body(self, parent_class, body: list) -> list:
+        # writes a class body, returns (offset position, ClassDefinition) for each class defined in it
+        out = self._out
+        self._string(parent_class or '')
+        out += _compressed_int(len(body))
+        pending = []
+        for node in body:
+            self._entry(node, pending)
+        return pending
+
+    def write(self, ast: list):
+        """
+        :param ast: list of AST nodes - the top-level nodes of the config
+        """
+        out = self._out
+        out += _HEADER.pack(SIGNATURE, 0, 8, 0)
+
+        # bodies are written depth-first, each class body is followed by the bodies of its classes
+        stack = list(reversed(self._body(None, ast)))
+        while stack:
+            position, node = stack.pop()
+            _UINT32.pack_into(out, position, len(out))
+            stack.extend(reversed(self._body(node.parent_class, node.body)))
+
+        # empty enum table
+        _UINT32.pack_into(out, 12, len(out))
+        out += _UINT32.pack(0)
+
+        self.fp.write(out)
+        self._out = bytearray()
+
+
+def dump(ast: list, fp):
+    """
+    Writes a parsed config in the rapified config.bin format to a file object, see RapWriter.
+
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param fp: file object - the target, opened in binary mode
+    """
+    RapWriter(fp).write(ast)
+
+
+def dumps(ast: list) -> bytes:
+    """
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :return: bytes - the config in the rapified config.bin format
+    """
+    fp = io.BytesIO()
+    dump(ast, fp)
+    return fp.getvalue()
+
+
+def _shortest_float(packed: bytes) -> float:
+    # shortest decimal representation that yields the same 32 bit float, e.g., 0.1 instead of 0.10000000149011612
+    value = _FLOAT32.unpack(packed)[0]
+    for digits in range(6, 10):
+        shortest = float('{:.{}g}'.format(value, digits))
+        if _FLOAT32.pack(shortest) == packed:
+            return shortest
+    return value
+
+
+class LazyClassDefinition(ClassDefinition):
+    __slots__ = ('_reader', '_offset')
+
+    @classmethod
+    def from_offset(cls, reader, class_name: str, parent_class, offset: int):
+        node = cls._new_slim(ASTNodeType.CLASS_DEFINITION, 1, offset + 1)
+        node.class_name = class_name
+        node.parent_class = parent_class
+        node._index = None
+        node._output = None
+        node._reader = reader
+        node._offset = offset
+        node._body = None
+        return node
+
+    @property
+    def body(self):
+        # decoded from the rapified data on first access
+        if self._reader is not None:
+            self.body = self._reader.read_body(self._offset)
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        ClassDefinition.body.fset(self, body)
+        self._reader = None
+
+
+class RapReader:
+    def __init__(self, data, lazy=False, typed_arrays=False):
+        """
+        Reads configs in the rapified (binarized) config.bin format into the same AST types as parser.Parser, without
+        lexing or pre-processing. All nodes are slim, as there are no tokens. Their line_no is 1 and their line_pos is
+        the offset of the entry in the data plus 1.
+
+        :param data: bytes-like object or mmap - the rapified config
+        :param lazy: bool - if True, class bodies are decoded when they are accessed for the first time, data has to
+                     stay available until then
+        :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are packed, see
+                             Array.pack()
+        """
+        if len(data) < _HEADER.size or data[:len(SIGNATURE)] != SIGNATURE:
+            raise RapError('not a rapified config')
+        self.data = data
+        self.lazy = lazy
+        self.typed_arrays = typed_arrays
+
+    def _string(self, position: int) -> tuple:
+        end = self.data.find(b'\0', position)
+        if end < 0:
+            raise RapError('unterminated string at offset {}'.format(position))
+        try:
+            return self.data[position:end].decode('utf-8'), end + 1
+        except UnicodeDecodeError as e:
+            raise RapError('invalid string at offset {}: {}'.format(position, e))
+
+    def _compressed_int(self, position: int) -> tuple:
+        value = 0
+        shift = 0
+        while True:
+            byte = self.data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte < 0x80:
+                return value, position
+
+    def _scalar(self, value_type: int, position: int) -> tuple:
+        data = self.data
+        if value_type == VALUE_STRING:
+            value, end = self._string(position)
+            return StringLiteral.from_values(intern_value(value), 1, position + 1), end
+        elif value_type == VALUE_VARIABLE:
+            value, end = self._string(position)
+            return Identifier.from_values(intern_value(value), 1, position + 1), end
+        elif value_type == VALUE_FLOAT:
+            value = _shortest_float(bytes(data[position:position + 4]))
+            return Constant.from_values(value, 1, position + 1), position + 4
+        elif value_type == VALUE_LONG:
+            return Constant.from_values(_INT32.unpack_from(data, position)[0], 1, position + 1), position + 4
+        elif value_type == VALUE_INT64:
+            return Constant.from_values(_INT64.unpack_from(data, position)[0], 1, position + 1), position + 8
+        raise RapError('unknown value type {} at offset {}'.format(value_type, position - 1))
+
+    def _array(self, position: int) -> tuple:
+        count, position = self._compressed_int(position)
+        root = Array.from_values([], 1, position + 1)
+        # (array, number of elements still to read)
+        stack = [[root, count]]
+        while stack:
+            frame = stack[-1]
+            array_node, remaining = frame
+            if remaining == 0:
+                stack.pop()
+                array_node._adopt(array_node.children)
+                if self.typed_arrays:
+                    array_node.pack()
+                continue
+            frame[1] -= 1
+
+            value_type = self.data[position]
+            if value_type == VALUE_ARRAY:
+                count, position = self._compressed_int(position + 1)
+                child = Array.from_values([], 1, position + 1)
+                array_node.children.append(child)
+                stack.append([child, count])
+            else:
+                child, position = self._scalar(value_type, position + 1)
+                array_node.children.append(child)
+        return root, position
+
+    def _class(self, class_name: str, offset: int, pending):
+        parent_class, _ = self._string(offset)
+        parent_class = intern_value(parent_class) if parent_class else None
+        if pending is None:
+            return LazyClassDefinition.from_offset(self, class_name, parent_class, offset)
+        node = ClassDefinition.from_values(class_name, [], parent_class, 1, offset + 1)
+        pending.append((node, offset))
+        return node
+
+    def _entry(self, position: int, pending) -> tuple:
+        start = position + 1
+        entry_type = self.data[position]
+        if entry_type == ENTRY_CLASS:
+            name, position = self._string(start)
+            offset = _UINT32.unpack_from(self.data, position)[0]
+            return self._class(intern_value(name), offset, pending), position + 4
+        elif entry_type == ENTRY_VALUE:
+            value_type = self.data[start]
+            name, position = self._string(start + 1)
+            value, position = self._scalar(value_type, position)
+            identifier = Identifier.from_values(intern_value(name), 1, start + 2)
+            return Assignment.from_values(identifier, value, 1, start), position
+        elif entry_type == ENTRY_ARRAY:
+            name, position = self._string(start)
+            value, position = self._array(position)
+            identifier = Identifier.from_values(intern_value(name), 1, start + 1)
+            return Assignment.from_values(ArrayDeclaration.from_values(identifier), value, 1, start), position
+        elif entry_type == ENTRY_EXTERN:
+            name, position = self._string(start)
+            return ExternalClassReference.from_values(intern_value(name), 1, start), position
+        elif entry_type == ENTRY_ARRAY_APPEND:
+            # name[] += {...}, read as a plain array assignment like the parser does
+            name, position = self._string(start + 4)
+            print('WARNING: reading {}[] += as {}[] = at offset {}'.format(name, name, start - 1), file=sys.stderr)
+            value, position = self._array(position)
+            identifier = Identifier.from_values(intern_value(name), 1, start + 5)
+            return Assignment.from_values(ArrayDeclaration.from_values(identifier), value, 1, start), position
+        elif entry_type == ENTRY_DELETE:
+            # delete name; has no equivalent in the AST
+            name, position = self._string(start)
+            print('WARNING: skipping delete {} at offset {}'.format(name, start - 1), file=sys.stderr)
+            return None, position
+        raise RapError('unsupported entry type {} at offset {}'.format(entry_type, position))
+
+    def _body(self, offset: int, pending) -> list:
+        _, position = self._string(offset)
+        count, position = self._compressed_int(position)
+        body = []
+        for _ in range(count):
+            node, position = self._entry(position, pending)
+            if node is not None:
+                body.append(node)
+        return body
+
+    def read_body(self, offset: int) -> list:
+        """
+        :param offset: int - the offset of a class body in the data
+        :return: list of AST nodes - the body of the class
+        """
+        if self.data is None:
+            raise RapError('cannot read class body at offset {}, the config has been closed'.format(offset))
+        try:
+            return self._body(offset, None)
+        except (IndexError, struct.error) as e:
+            raise RapError('truncated data in class body at offset {}: {}'.format(offset, e))
+
+    def read(self) -> list:
+        """
+        :return: list of AST nodes - the top-level nodes of the config
+        """
+        try:
+            if self.lazy:
+                return self._body(_HEADER.size, None)
+
+            pending = []
+            ast = self._body(_HEADER.size, pending)
+            while pending:
+                node, offset = pending.pop()
+                node.body = self._body(offset, pending)
+            return ast
+        except (IndexError, struct.error) as e:
+            raise RapError('truncated data: {}'.format(e))
+
+    def close(self):
+        """
+        Releases the data, closing it if it is a memory map (see open_file()). Class bodies which have not been decoded
+        yet cannot be accessed afterwards.
+        """
+        data, self.data = self.data, None
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def loads(data, lazy=False, typed_arrays=False) -> list:
+    """
+    :param data: bytes-like object - the config in the rapified config.bin format
+    :param lazy: bool - if True, class bodies are decoded when they are accessed for the first time
+    :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are packed
+    :return: list of AST nodes - the top-level nodes of the config
+    """
+    return RapReader(data, lazy, typed_arrays).read()
+
+
+def load(fp, lazy=False, typed_arrays=False) -> list:
+    """
+    :param fp: file object - the source, opened in binary mode
+    :param lazy: bool - if True, class bodies are decoded when they are accessed for the first time
+    :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are packed
+    :return: list of AST nodes - the top-level nodes of the config
+    """
+    return loads(fp.read(), lazy, typed_arrays)
+
+
+def open_file(file_path: str, lazy=True, typed_arrays=False) -> RapReader:
+    """
+    Memory-maps a config.bin file. The returned reader owns the memory map, close it (or use it as a context manager)
+    once the config is no longer accessed.
+
+    :param file_path: string - path of the config.bin file
+    :param lazy: bool - if True, class bodies are decoded when they are accessed for the first time
+    :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are packed
+    :return: RapReader - call read() for the top-level nodes of the config
+    """
+    with open(file_path, 'rb') as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            raise RapError('not a rapified config: {}'.format(file_path))
+        data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return RapReader(data, lazy, typed_arrays)
+    except RapError:
+        data.close()
+        raise
+
+
+def load_file(file_path: str, lazy=True, typed_arrays=False) -> list:
+    """
+    Reads a config.bin file. The file is memory-mapped, so with lazy loading only the class bodies that are accessed
+    are read from disk. Without lazy loading the memory map is closed before returning, with lazy loading it stays open
+    until the nodes are garbage collected, use open_file() to close it explicitly.
+
+    Entries deleting a class (delete Name;) are skipped and appending to an array (name[] += {...};) is read as an
+    assignment, each with a warning, as neither has an equivalent in the AST.
+
+    :param file_path: string - path of the config.bin file
+    :param lazy: bool - if True, class bodies are decoded when they are accessed for the first time
+    :param typed_arrays: bool - if True, arrays consisting only of integers or only of floats are packed
+    :return: list of AST nodes - the top-level nodes of the config
+    """
+    reader = open_file(file_path, lazy, typed_arrays)
+    if lazy:
+        return reader.read()
+    with reader:
+        return reader.read()
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+
+from armaclassparser.ast import BodyIndex, ClassDefinition, ExternalClassReference, lower_name
+from armaclassparser.errors import ResolutionError
+
+
+class InheritanceResolver:
+    def __init__(self, ast: list, strict=False):
+        """
+        Resolves class inheritance on a parsed (or merged) config. Parent classes are looked up like Arma does: first in
+        the scope the class is defined in (including everything that scope inherits), then in the enclosing scopes. A
+        class inheriting from a class of the same name, e.g., "class Turrets : Turrets", inherits from the class of that
+        name in the parent of its enclosing class. The flattened properties and subclasses are cached per class, so
+        every parent chain is only walked once.
+
+        :param ast: list of AST nodes - the top-level nodes of the config
+        :param strict: bool - if True, raise ResolutionError for parent classes that cannot be found instead of
+                       treating the class as if it had no parent
+        """
+        self.ast = ast
+        self.strict = strict
+        self.root_index = BodyIndex(ast)
+        self._scopes = {}
+        self._parents = {}
+        self._properties = {}
+        self._classes = {}
+        self._in_progress = set()
+
+        stack = [(ast, None)]
+        while stack:
+            nodes, scope = stack.pop()
+            for node in nodes:
+                if isinstance(node, (ClassDefinition, ExternalClassReference)):
+                    self._scopes[id(node)] = scope
+                    if isinstance(node, ClassDefinition):
+                        stack.append((node.body, node))
+
+    def get_scope(self, class_definition):
+        """
+        :param class_definition: ClassDefinition or ExternalClassReference - a class of the resolved config
+        :return: ClassDefinition - the class the given class is defined in or None for top-level classes
+        """
+        try:
+            return self._scopes[id(class_definition)]
+        except KeyError:
+            raise ValueError('class {} is not part of the resolved config'.format(class_definition.class_name))
+
+    def _members(self, scope) -> dict:
+        if scope is None:
+            return self.root_index.classes
+        return self.get_classes(scope)
+
+    def get_parent(self, class_definition):
+        """
+        Looks up the parent class of a class.
+
+        :param class_definition: ClassDefinition - a class of the resolved config
+        :return: ClassDefinition or ExternalClassReference - the parent class or None if the class has no parent
+        """
+        if not isinstance(class_definition, ClassDefinition) or class_definition.parent_class is None:
+            return None
+
+        key = id(class_definition)
+        if key in self._parents:
+            return self._parents[key]
+
+        name = lower_name(class_definition.parent_class)
+        scope = self.get_scope(class_definition)
+        parent = None
+        while True:
+            candidate = self._members(scope).get(name)
+            if candidate is class_definition:
+                # e.g., class Turrets : Turrets, the parent is the class of the same name inherited by the scope
+                scope_parent = self.get_parent(scope) if scope is not None else None
+                if isinstance(scope_parent, ClassDefinition):
+                    candidate = self.get_classes(scope_parent).get(name)
+                else:
+                    candidate = None
+            if candidate is not None:
+                parent = candidate
+                break
+            if scope is None:
+                break
+            scope = self.get_scope(scope)
+
+        if parent is None and self.strict:
+            raise ResolutionError('could not resolve parent class {} of class {}'.format(
+                class_definition.parent_class, class_definition.class_name))
+
+        self._parents[key] = parent
+        return parent
+
+    def _flatten(self, class_definition, cache: dict, own_members) -> dict:
+        key = id(class_definition)
+        members = cache.get(key)
+        if members is not None:
+            return members
+
+        progress_key = (id(cache), key)
+        if progress_key in self._in_progress:
+            raise ResolutionError('cyclic inheritance detected for class {}'.format(class_definition.class_name))
+        self._in_progress.add(progress_key)
+        try:
+            parent = self.get_parent(class_definition)
+            if isinstance(parent, ClassDefinition):
+                members = OrderedDict(self._flatten(parent, cache, own_members))
+            else:
+                members = OrderedDict()
+            for name, member in own_members(class_definition).items():
+                if isinstance(member, ExternalClassReference) and name in members:
+                    # a forward declaration does not hide an inherited class
+                    continue
+                members[name] = member
+        finally:
+            self._in_progress.discard(progress_key)
+
+        cache[key] = members
+        return members
+
+    def get_properties(self, class_definition) -> dict:
+        """
+        :param class_definition: ClassDefinition or ExternalClassReference - a class of the resolved config
+        :return: dict - maps lower-case property names to the effective Assignment of the class, including inherited
+                 properties
+        """
+        if not isinstance(class_definition, ClassDefinition):
+            return {}
+        return self._flatten(class_definition, self._properties, lambda node: node.index.properties)
+
+    def get_classes(self, class_definition) -> dict:
+        """
+        :param class_definition: ClassDefinition or ExternalClassReference - a class of the resolved config
+        :return: dict - maps lower-case class names to the effective subclasses of the class, including inherited ones
+        """
+        if not isinstance(class_definition, ClassDefinition):
+            return {}
+        return self._flatten(class_definition, self._classes, lambda node: node.index.classes)
+
+    def get_property(self, class_definition, name: str):
+        """
+        :param class_definition: ClassDefinition - a class of the resolved config
+        :param name: string - the property name (case-insensitive)
+        :return: Assignment - the effective property or None if neither the class nor its parents define it
+        """
+        return self.get_properties(class_definition).get(lower_name(name))
+
+    def get_class(self, class_definition, name: str):
+        """
+        :param class_definition: ClassDefinition - a class of the resolved config
+        :param name: string - the subclass name (case-insensitive)
+        :return: ClassDefinition or ExternalClassReference - the effective subclass or None
+        """
+        return self.get_classes(class_definition).get(lower_name(name))
+
+    def get_lineage(self, class_definition) -> list:
+        """
+        :param class_definition: ClassDefinition - a class of the resolved config
+        :return: list - all ancestors of the class, starting with its parent
+        """
+        lineage = []
+        seen = {id(class_definition)}
+        parent = self.get_parent(class_definition)
+        while parent is not None:
+            if id(parent) in seen:
+                raise ResolutionError('cyclic inheritance detected for class {}'.format(parent.class_name))
+            seen.add(id(parent))
+            lineage.append(parent)
+            parent = self.get_parent(parent)
+        return lineage
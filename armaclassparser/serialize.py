@@ -0,0 +1,346 @@
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+from armaclassparser.ast import Array, ArrayDeclaration, Assignment, ClassDefinition, Constant, \
+    ExternalClassReference, Identifier, IncludeStatement, StringLiteral, intern_value
+from armaclassparser.errors import SerializationError
+
+SIGNATURE = b'ACPB'
+FORMAT_VERSION = 1
+
+# header flags
+FLAG_POSITIONS = 1
+
+# node tags
+TAG_STRING = 1
+TAG_IDENTIFIER = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_ARRAY = 5
+TAG_INT_ARRAY = 6
+TAG_FLOAT_ARRAY = 7
+TAG_ARRAY_DECLARATION = 8
+TAG_ASSIGNMENT = 9
+TAG_INCLUDE = 10
+TAG_CLASS = 11
+TAG_EXTERN = 12
+
+_HEADER = struct.Struct('<4sBB')
+_FLOAT64 = struct.Struct('<d')
+
+# packed arrays are stored little-endian
+_SWAP_BYTES = sys.byteorder == 'big'
+
+
+def _varint(out: bytearray, value: int):
+    # 7 bits per byte, least significant first, the high bit marks that another byte follows
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    # maps signed to unsigned integers, small negative numbers stay short: 0, -1, 1, -2, ... -> 0, 1, 2, 3, ...
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _read_varint(data, position: int) -> tuple:
+    byte = data[position]
+    if byte < 0x80:
+        return byte, position + 1
+    value = byte & 0x7f
+    shift = 7
+    while True:
+        position += 1
+        byte = data[position]
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position + 1
+        shift += 7
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class BinaryWriter:
+    def __init__(self, positions=True):
+        """
+        Writes parsed configs in a compact binary format: a table of all distinct strings followed by the nodes in
+        pre-order, with their tags, string table indices, counts and integers encoded as varints. Tokens are not
+        stored, the loaded nodes are slim (see parser.Parser's keep_tokens). Packed arrays are stored as raw 8 byte
+        values.
+
+        :param positions: bool - if False, the source positions of the nodes are not stored and all loaded nodes are at
+                          line 1, position 1
+        """
+        self.positions = positions
+
+    def write(self, ast: list) -> bytes:
+        """
+        :param ast: list of AST nodes - the top-level nodes of the config
+        :return: bytes - the serialized config
+        """
+        out = bytearray()
+        strings = OrderedDict()
+        positions = self.positions
+        previous_line_no = 0
+
+        def string(value: str):
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            _varint(out, index)
+
+        _varint(out, len(ast))
+        stack = [iter(ast)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            if isinstance(node, ArrayDeclaration):
+                # the position is the one of the identifier
+                out.append(TAG_ARRAY_DECLARATION)
+                stack.append(iter((node.identifier,)))
+                continue
+            if isinstance(node, StringLiteral):
+                tag = TAG_STRING
+            elif isinstance(node, Identifier):
+                tag = TAG_IDENTIFIER
+            elif isinstance(node, Constant):
+                tag = TAG_FLOAT if isinstance(node.value, float) else TAG_INT
+            elif isinstance(node, Array):
+                if node.values is not None:
+                    tag = TAG_FLOAT_ARRAY if node.values.typecode == 'd' else TAG_INT_ARRAY
+                else:
+                    tag = TAG_ARRAY
+            elif isinstance(node, Assignment):
+                tag = TAG_ASSIGNMENT
+            elif isinstance(node, IncludeStatement):
+                tag = TAG_INCLUDE
+            elif isinstance(node, ClassDefinition):
+                tag = TAG_CLASS
+            elif isinstance(node, ExternalClassReference):
+                tag = TAG_EXTERN
+            else:
+                raise SerializationError('cannot serialize {} on line {}, col {}'.format(
+                    type(node).__name__, node.line_no, node.line_pos))
+
+            out.append(tag)
+            if positions:
+                # lines mostly increase by small steps, so the difference is stored
+                _varint(out, _zigzag(node.line_no - previous_line_no))
+                _varint(out, node.line_pos)
+                previous_line_no = node.line_no
+
+            if tag == TAG_STRING or tag == TAG_IDENTIFIER or tag == TAG_INCLUDE:
+                string(node.value)
+            elif tag == TAG_INT:
+                _varint(out, _zigzag(node.value))
+            elif tag == TAG_FLOAT:
+                out += _FLOAT64.pack(node.value)
+            elif tag == TAG_ARRAY:
+                children = node.children
+                _varint(out, len(children))
+                stack.append(iter(children))
+            elif tag == TAG_INT_ARRAY or tag == TAG_FLOAT_ARRAY:
+                values = node.values
+                if _SWAP_BYTES:
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                _varint(out, len(values))
+                out += values.tobytes()
+            elif tag == TAG_ASSIGNMENT:
+                stack.append(iter((node.left, node.right)))
+            elif tag == TAG_CLASS:
+                string(node.class_name)
+                if node.parent_class is None:
+                    out.append(0)
+                else:
+                    out.append(1)
+                    string(node.parent_class)
+                body = node.body
+                _varint(out, len(body))
+                stack.append(iter(body))
+            else:
+                string(node.class_name)
+
+        result = bytearray(_HEADER.pack(SIGNATURE, FORMAT_VERSION, FLAG_POSITIONS if positions else 0))
+        _varint(result, len(strings))
+        for value in strings:
+            data = value.encode('utf-8')
+            _varint(result, len(data))
+            result += data
+        result += out
+        return bytes(result)
+
+
+class BinaryReader:
+    def __init__(self, data):
+        """
+        Reads configs written by BinaryWriter. All nodes are slim.
+
+        :param data: bytes-like object - the serialized config
+        """
+        if len(data) < _HEADER.size:
+            raise SerializationError('not a serialized config')
+        signature, version, flags = _HEADER.unpack_from(data)
+        if signature != SIGNATURE:
+            raise SerializationError('not a serialized config')
+        if version != FORMAT_VERSION:
+            raise SerializationError('unsupported format version {}, expected {}'.format(version, FORMAT_VERSION))
+        self.data = data
+        self.positions = bool(flags & FLAG_POSITIONS)
+
+    def _strings(self, position: int) -> tuple:
+        data = self.data
+        count, position = _read_varint(data, position)
+        strings = []
+        for _ in range(count):
+            length, position = _read_varint(data, position)
+            end = position + length
+            if end > len(data):
+                raise SerializationError('truncated string table')
+            strings.append(intern_value(bytes(data[position:end]).decode('utf-8')))
+            position = end
+        return strings, position
+
+    @staticmethod
+    def _finish(frame: list):
+        tag, _, children, line_no, line_pos, name, parent_class = frame
+        if tag == TAG_CLASS:
+            return ClassDefinition.from_values(name, children, parent_class, line_no, line_pos)
+        elif tag == TAG_ARRAY:
+            return Array.from_values(children, line_no, line_pos)
+        elif tag == TAG_ASSIGNMENT:
+            return Assignment.from_values(children[0], children[1], line_no, line_pos)
+        return ArrayDeclaration.from_values(children[0])
+
+    def read(self) -> list:
+        """
+        :return: list of AST nodes - the top-level nodes of the config
+        """
+        try:
+            return self._read()
+        except (IndexError, struct.error, UnicodeDecodeError, ValueError) as e:
+            raise SerializationError('invalid or truncated data: {}'.format(e))
+
+    def _read(self) -> list:
+        data = self.data
+        positions = self.positions
+        strings, position = self._strings(_HEADER.size)
+        # without positions all nodes are at line 1, position 1, with positions line_no is the previous line
+        line_no = 0 if positions else 1
+        line_pos = 1
+
+        count, position = _read_varint(data, position)
+        # frames of the nodes whose children are being read: [tag, number of children still to read, children,
+        # line_no, line_pos, class name, parent class]
+        root = [None, count, [], 1, 1, None, None]
+        stack = [root]
+        while True:
+            frame = stack[-1]
+            if frame[1] == 0:
+                stack.pop()
+                if not stack:
+                    return root[2]
+                stack[-1][2].append(self._finish(frame))
+                continue
+            frame[1] -= 1
+
+            tag = data[position]
+            position += 1
+            if tag == TAG_ARRAY_DECLARATION:
+                stack.append([tag, 1, [], 1, 1, None, None])
+                continue
+            if positions:
+                delta, position = _read_varint(data, position)
+                line_no += _unzigzag(delta)
+                line_pos, position = _read_varint(data, position)
+
+            if tag == TAG_STRING:
+                index, position = _read_varint(data, position)
+                frame[2].append(StringLiteral.from_values(strings[index], line_no, line_pos))
+            elif tag == TAG_IDENTIFIER:
+                index, position = _read_varint(data, position)
+                frame[2].append(Identifier.from_values(strings[index], line_no, line_pos))
+            elif tag == TAG_INT:
+                value, position = _read_varint(data, position)
+                frame[2].append(Constant.from_values(_unzigzag(value), line_no, line_pos))
+            elif tag == TAG_FLOAT:
+                value = _FLOAT64.unpack_from(data, position)[0]
+                position += 8
+                frame[2].append(Constant.from_values(value, line_no, line_pos))
+            elif tag == TAG_INT_ARRAY or tag == TAG_FLOAT_ARRAY:
+                length, position = _read_varint(data, position)
+                end = position + length * 8
+                if end > len(data):
+                    raise SerializationError('truncated array at offset {}'.format(position))
+                values = array('d' if tag == TAG_FLOAT_ARRAY else 'q')
+                values.frombytes(data[position:end])
+                if _SWAP_BYTES:
+                    values.byteswap()
+                position = end
+                frame[2].append(Array.from_numbers(values, line_no, line_pos))
+            elif tag == TAG_ARRAY:
+                length, position = _read_varint(data, position)
+                stack.append([tag, length, [], line_no, line_pos, None, None])
+            elif tag == TAG_ASSIGNMENT:
+                stack.append([tag, 2, [], line_no, line_pos, None, None])
+            elif tag == TAG_CLASS:
+                index, position = _read_varint(data, position)
+                parent_class = None
+                if data[position]:
+                    parent_index, position = _read_varint(data, position + 1)
+                    parent_class = strings[parent_index]
+                else:
+                    position += 1
+                length, position = _read_varint(data, position)
+                stack.append([tag, length, [], line_no, line_pos, strings[index], parent_class])
+            elif tag == TAG_INCLUDE:
+                index, position = _read_varint(data, position)
+                frame[2].append(IncludeStatement.from_values(strings[index], line_no, line_pos))
+            elif tag == TAG_EXTERN:
+                index, position = _read_varint(data, position)
+                frame[2].append(ExternalClassReference.from_values(strings[index], line_no, line_pos))
+            else:
+                raise SerializationError('unknown tag {} at offset {}'.format(tag, position - 1))
+
+
+def dumps(ast: list, positions=True) -> bytes:
+    """
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param positions: bool - if True, the source positions of the nodes are stored
+    :return: bytes - the serialized config, see BinaryWriter
+    """
+    return BinaryWriter(positions).write(ast)
+
+
+def dump(ast: list, fp, positions=True):
+    """
+    :param ast: list of AST nodes - the top-level nodes of the config
+    :param fp: file object - the target, opened in binary mode
+    :param positions: bool - if True, the source positions of the nodes are stored
+    """
+    fp.write(dumps(ast, positions))
+
+
+def loads(data) -> list:
+    """
+    :param data: bytes-like object - a config serialized with dumps()
+    :return: list of AST nodes - the top-level nodes of the config
+    """
+    return BinaryReader(data).read()
+
+
+def load(fp) -> list:
+    """
+    :param fp: file object - the source, opened in binary mode
+    :return: list of AST nodes - the top-level nodes of the config
+    """
+    return loads(fp.read())
@@ -8,5 +8,8 @@ setup(
    author_email='tom.ryan@posteo.de',
    packages=['armaclassparser'],
    install_requires=[],
+   entry_points={
+      'console_scripts': ['armaclassparser=armaclassparser.cli:main'],
+   },
    test_suite="tests",
 )
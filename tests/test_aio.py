@@ -0,0 +1,103 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from armaclassparser import aio
+from armaclassparser.errors import BatchParsingError
+
+
+def _run(coroutine):
+    # _run() needs Python 3.7
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+class TestAio(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(5):
+            file_path = os.path.join(self.directory.name, 'config{}.cpp'.format(i))
+            with open(file_path, 'w') as fp:
+                fp.write('#include "common.hpp"\nclass C{} {{ scope = SCOPE; }};'.format(i))
+            self.paths.append(file_path)
+        with open(os.path.join(self.directory.name, 'common.hpp'), 'w') as fp:
+            fp.write('#define SCOPE 2\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_file_async(self):
+        ast = _run(aio.parse_file_async(self.paths[0], keep_tokens=False))
+        self.assertEqual('C0', ast[0].class_name)
+        self.assertEqual(2, ast[0].get_property('scope').right.value)
+
+    def test_parse_string_async(self):
+        async def parse():
+            with ThreadPoolExecutor(2) as executor:
+                parser = aio.AsyncParser(executor, max_concurrency=1)
+                return await asyncio.gather(aio.parse_string_async('class A {};', parser=parser),
+                                            aio.parse_string_async('class B {};', parser=parser))
+
+        self.assertEqual(['A', 'B'], [ast[0].class_name for ast in _run(parse())])
+
+    def test_parse_many_async(self):
+        broken_path = os.path.join(self.directory.name, 'missing.cpp')
+
+        async def parse():
+            results = []
+            async for result in aio.parse_many_async(self.paths + [broken_path], max_concurrency=2):
+                results.append(result)
+            return results
+
+        results = {result.file_path: result for result in _run(parse())}
+        self.assertEqual(sorted(self.paths + [broken_path]), sorted(results))
+        self.assertIsInstance(results[broken_path].error, BatchParsingError)
+        self.assertEqual('FileNotFoundError', results[broken_path].error.error_type)
+        for file_path in self.paths:
+            self.assertIsNone(results[file_path].error)
+            self.assertIsNone(results[file_path].ast[0].tokens)
+
+    def test_parse_many_async_close(self):
+        async def parse():
+            results = aio.parse_many_async(self.paths, max_concurrency=1)
+            async for result in results:
+                await results.aclose()
+                await asyncio.gather(*results._tasks, return_exceptions=True)
+                return result, results._tasks
+
+        result, tasks = _run(parse())
+        self.assertIsNone(result.error)
+        self.assertTrue(any(task.cancelled() for task in tasks))
+        # cancelled files are not reported as failed
+        for task in tasks:
+            if not task.cancelled():
+                self.assertIsNone(task.result().error)
+
+    def test_max_concurrency(self):
+        running = []
+        maximum = []
+
+        def parse(input_data):
+            running.append(input_data)
+            maximum.append(len(running))
+            time.sleep(0.01)
+            running.remove(input_data)
+            return input_data
+
+        async def run():
+            parser = aio.AsyncParser(max_concurrency=2)
+            return await asyncio.gather(*[parser._run(parse, i) for i in range(6)])
+
+        self.assertEqual(list(range(6)), _run(run()))
+        self.assertEqual(2, max(maximum))
+        self.assertRaises(ValueError, aio.AsyncParser, max_concurrency=0)
@@ -0,0 +1,168 @@
+import importlib.util
+import unittest
+
+import armaclassparser
+from armaclassparser import generator
+from armaclassparser.ast import BodyIndex, ExternalClassReference, structurally_equal, lower_name, intern_value, \
+    INTERN_MAX_LENGTH, LOWER_NAME_CACHE_SIZE
+
+
+class TestAST(unittest.TestCase):
+    input_data = """class CfgPatches {};
+class CfgWeapons {
+    class Rifle;
+    class Rifle_Base_F : Rifle {
+        displayName = "Base";
+        magazines[] = {"30Rnd_65x39_caseless_mag"};
+        scope = 1;
+    };
+    class arifle_MX_F : Rifle_Base_F {
+        scope = 2;
+        Scope = 1;
+    };
+};
+"""
+
+    def test_index_lookup(self):
+        ast = armaclassparser.parse_from_string(self.input_data)
+        root = BodyIndex(ast)
+        cfg_weapons = root.get_class('cfgweapons')
+        self.assertEqual('CfgWeapons', cfg_weapons.class_name)
+
+        rifle_base = cfg_weapons.get_class('RIFLE_BASE_F')
+        self.assertEqual('Rifle_Base_F', rifle_base.class_name)
+        magazines = rifle_base.get_property('Magazines')
+        self.assertEqual('magazines', magazines.name)
+        self.assertEqual('30Rnd_65x39_caseless_mag', magazines.right.children[0].value)
+        self.assertEqual('displayName', rifle_base.get_property('displayname').name)
+
+        self.assertIsInstance(cfg_weapons.get_class('Rifle'), ExternalClassReference)
+        self.assertIsNone(cfg_weapons.get_class('scope'))
+        self.assertIsNone(rifle_base.get_property('Rifle'))
+
+    def test_index_order(self):
+        ast = armaclassparser.parse_from_string(self.input_data)
+        cfg_weapons = BodyIndex(ast).get_class('CfgWeapons')
+        self.assertEqual(['rifle', 'rifle_base_f', 'arifle_mx_f'], list(cfg_weapons.index.classes))
+        self.assertEqual(['displayname', 'magazines', 'scope'],
+                         list(cfg_weapons.get_class('Rifle_Base_F').index.properties))
+
+    def test_index_duplicates(self):
+        ast = armaclassparser.parse_from_string(self.input_data)
+        arifle = BodyIndex(ast).get_class('CfgWeapons').get_class('arifle_MX_F')
+        # later definitions win
+        self.assertEqual(1, arifle.get_property('scope').right.value)
+
+        ast = armaclassparser.parse_from_string("class Foo {}; class Foo;")
+        self.assertEqual(ast[0], BodyIndex(ast).get_class('foo'))
+
+    def test_invalidate_index(self):
+        ast = armaclassparser.parse_from_string(self.input_data)
+        cfg_weapons = BodyIndex(ast).get_class('CfgWeapons')
+        self.assertIsNotNone(cfg_weapons.get_class('Rifle'))
+        del cfg_weapons.body[0]
+        cfg_weapons.invalidate_index()
+        self.assertIsNone(cfg_weapons.get_class('Rifle'))
+
+    def test_structural_hash(self):
+        ast1 = armaclassparser.parse_from_string(self.input_data)
+        ast2 = armaclassparser.parse_from_string("\n\n" + self.input_data.replace('    ', '\t'), keep_tokens=False)
+        self.assertNotEqual(ast1[1], ast2[1])
+        self.assertEqual(ast1[1].structural_hash(), ast2[1].structural_hash())
+        self.assertTrue(structurally_equal(ast1, ast2))
+        self.assertEqual(1, len({ast1[1], ast1[1]}))
+
+    def test_hash(self):
+        # full-token classes compare their tokens only, equal nodes have equal hashes
+        class_a = armaclassparser.parse_from_string('class A { x = 1; };')[0]
+        other_a = armaclassparser.parse_from_string('class A { x = 2; };')[0]
+        self.assertEqual(class_a, other_a)
+        self.assertEqual(1, len({class_a, other_a}))
+
+        nodes = {class_a}
+        class_a.body[0].right.value = 3
+        class_a.body[0].right.mark_dirty()
+        self.assertIn(class_a, nodes)
+
+    def test_structural_difference(self):
+        ast1 = armaclassparser.parse_from_string("class Foo : Bar { a = 1; b[] = {1, 2}; };")
+        for other in ["class Foo : Baz { a = 1; b[] = {1, 2}; };",
+                      "class Foo { a = 1; b[] = {1, 2}; };",
+                      "class Foo : Bar { a = 1.0; b[] = {1, 2}; };",
+                      "class Foo : Bar { a = 1; b[] = {1, 2, 3}; };",
+                      "class Foo : Bar { a = 1; b = 2; };",
+                      "class Foo : Bar { a = \"1\"; b[] = {1, 2}; };",
+                      "class Foo : Bar { b[] = {1, 2}; a = 1; };",
+                      "class Foo;"]:
+            ast2 = armaclassparser.parse_from_string(other)
+            self.assertFalse(structurally_equal(ast1, ast2), other)
+
+    def test_structural_hash_invalidate(self):
+        ast1 = armaclassparser.parse_from_string("class Foo { a = 1; };")
+        ast2 = armaclassparser.parse_from_string("class Foo { a = 1; b = 2; };")
+        self.assertFalse(structurally_equal(ast1, ast2))
+        ast1[0].body.append(ast2[0].body[1])
+        ast1[0].invalidate()
+        self.assertTrue(structurally_equal(ast1, ast2))
+
+    def test_typed_arrays(self):
+        input_data = "ints[] = {1, -2, 3}; floats[] = {0.5, -1.25}; mixed[] = {1, 0.5}; strings[] = {1, \"a\"};"
+        ast = armaclassparser.parse_from_string(input_data)
+        packed_ast = armaclassparser.parse_from_string(input_data, typed_arrays=True)
+
+        ints, floats, mixed, strings = [assignment.right for assignment in packed_ast]
+        self.assertEqual('q', ints.values.typecode)
+        self.assertEqual('d', floats.values.typecode)
+        self.assertIsNone(mixed.values)
+        self.assertIsNone(strings.values)
+
+        self.assertEqual(3, len(ints.children))
+        self.assertEqual(-2, ints.children[1].value)
+        self.assertEqual([1, -2, 3], [child.value for child in ints.children])
+        self.assertEqual([-1.25], [child.value for child in floats.children[1:]])
+        self.assertEqual(generator.from_ast(ast), generator.from_ast(packed_ast))
+        self.assertTrue(structurally_equal(ast, packed_ast))
+        self.assertEqual(ast[0].structural_hash(), packed_ast[0].structural_hash())
+
+        ints.children = [ints.children[0]]
+        self.assertIsNone(ints.values)
+        self.assertEqual('{1}', str(ints))
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def test_typed_arrays_numpy(self):
+        ast = armaclassparser.parse_from_string("a[] = {1.5, 2.5, 3.5};", typed_arrays=True)
+        values = ast[0].right.numpy()
+        self.assertEqual(7.5, values.sum())
+        values[0] = 0.5
+        self.assertEqual(0.5, ast[0].right.children[0].value)
+
+    def test_interning(self):
+        ast = armaclassparser.parse_from_string('class A { a = "true"; }; class B { A = "true"; };', keep_tokens=False)
+        a, b = ast
+        self.assertIs(a.body[0].right.value, b.body[0].right.value)
+        self.assertIs(lower_name('A'), lower_name(''.join(['', 'a'])))
+        self.assertEqual(LOWER_NAME_CACHE_SIZE, lower_name.cache_info().maxsize)
+        self.assertIs(list(a.index.properties)[0], list(b.index.properties)[0])
+
+        long_value = 'x' * (INTERN_MAX_LENGTH + 1)
+        self.assertIsNot(intern_value(long_value), intern_value(''.join(['x'] * (INTERN_MAX_LENGTH + 1))))
+
+    def test_parent(self):
+        ast = armaclassparser.parse_from_string('class A { class B { x[] = {1, {2}}; }; };')
+        class_b = ast[0].body[0]
+        assignment = class_b.body[0]
+        inner = assignment.right.children[1]
+        self.assertIsNone(ast[0].parent)
+        self.assertIs(ast[0], class_b.parent)
+        self.assertIs(class_b, assignment.parent)
+        self.assertIs(assignment, assignment.left.parent)
+        self.assertIs(assignment.left, assignment.left.identifier.parent)
+        self.assertIs(assignment.right, inner.parent)
+        self.assertIs(inner, inner.children[0].parent)
+
+        hash_a = ast[0].structural_hash()
+        self.assertIsNotNone(class_b.get_property('x'))
+        inner.children[0].value = 3
+        inner.children[0].mark_dirty()
+        self.assertIsNone(class_b._index)
+        self.assertNotEqual(hash_a, ast[0].structural_hash())
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from armaclassparser import batch, generator
+from armaclassparser.errors import BatchParsingError
+
+
+class _CrashWorker:
+    # passed as class filter, ends the worker process that unpickles it
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = {
+            'addon_a/config.cpp': 'class CfgPatches { class addon_a { units[] = {}; }; };',
+            'addon_b/config.cpp': 'class CfgPatches { class addon_b { requiredAddons[] = {"addon_a"}; }; };',
+            'addon_b/CfgVehicles.hpp': 'class CfgVehicles { class Car { scope = 2; }; };',
+            'addon_b/broken.hpp': 'class Broken { scope = 2;',
+            'addon_b/readme.txt': 'not a config',
+        }
+        for file_name, content in self.files.items():
+            file_path = os.path.join(self.directory.name, file_name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as fp:
+                fp.write(content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, file_name):
+        return os.path.join(self.directory.name, file_name)
+
+    def _check(self, results):
+        results = {os.path.relpath(result.file_path, self.directory.name).replace(os.sep, '/'): result
+                   for result in results}
+        self.assertEqual(['addon_a/config.cpp', 'addon_b/CfgVehicles.hpp', 'addon_b/broken.hpp',
+                          'addon_b/config.cpp'], sorted(results))
+
+        broken = results.pop('addon_b/broken.hpp')
+        self.assertIsNone(broken.ast)
+        self.assertIsInstance(broken.error, BatchParsingError)
+        self.assertEqual(self._path('addon_b/broken.hpp'), broken.error.file_path)
+        self.assertIn(broken.error.error_type, str(broken.error))
+
+        for file_name, result in results.items():
+            self.assertIsNone(result.error)
+            self.assertIsNone(result.ast[0].tokens)
+            self.assertEqual(generator.from_ast(result.ast).replace('\n', '').replace(' ', ''),
+                             self.files[file_name].replace(' ', ''))
+
+    def test_parse_many_in_process(self):
+        self._check(batch.parse_many([self._path(file_name) for file_name in self.files if
+                                      not file_name.endswith('.txt')], jobs=1))
+
+    def test_parse_directory(self):
+        self._check(batch.parse_directory(self.directory.name, jobs=2))
+
+    def test_parse_many_worker_crash(self):
+        paths = [self._path('addon_a/config.cpp'), self._path('addon_b/config.cpp')]
+        results = list(batch.parse_many(paths, jobs=2, class_filter=_CrashWorker()))
+        self.assertEqual(sorted(paths), sorted(result.file_path for result in results))
+        for result in results:
+            self.assertIsNone(result.ast)
+            self.assertEqual('BrokenProcessPool', result.error.error_type)
+
+    def test_parse_many_close(self):
+        results = batch.parse_many([self._path(file_name) for file_name in self.files], jobs=2)
+        self.assertIsInstance(next(results), batch.BatchResult)
+        results.close()
+
+    def test_find_files(self):
+        self.assertEqual(4, len(batch.find_files(self.directory.name)))
+        self.assertEqual([self._path('addon_b/CfgVehicles.hpp'), self._path('addon_b/broken.hpp')],
+                         batch.find_files(self.directory.name, extensions=('.HPP',)))
+
+    def test_largest_first(self):
+        paths = [self._path('addon_a/config.cpp'), self._path('addon_b/config.cpp'), self._path('missing.cpp')]
+        self.assertEqual([paths[1], paths[0], paths[2]], batch._largest_first(paths))
+
+    def test_invalid_jobs(self):
+        self.assertRaises(ValueError, list, batch.parse_many([], jobs=0))
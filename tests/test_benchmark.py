@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import armaclassparser
+from armaclassparser import benchmark
+from armaclassparser.ast import ClassDefinition
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_generate_deep_inheritance(self):
+        ast = armaclassparser.parse_from_string(benchmark.generate_deep_inheritance(20, 5))
+        vehicles = ast[0].body
+        self.assertEqual(21, len(vehicles))
+        self.assertEqual('All', vehicles[1].parent_class)
+        self.assertEqual('Vehicle_3', vehicles[5].parent_class)
+
+    def test_generate_numeric_arrays(self):
+        ast = armaclassparser.parse_from_string(benchmark.generate_numeric_arrays(2, 4))
+        self.assertEqual(2, len(ast[0].body))
+        self.assertEqual(4, len(ast[0].body[1].right.children))
+
+    def test_generate_macro_header(self):
+        ast = armaclassparser.parse_from_string(benchmark.generate_macro_header(3))
+        items = ast[0].body[0].body[1].body
+        self.assertEqual(['item_0', 'item_1', 'item_2'], [item.class_name for item in items])
+        self.assertEqual('class item_2 {\nname = "item_2";\ncount = 2;\nposition[] = {2,0,1};\nscope = 2;\n};\n',
+                         str(items[2]))
+
+    def test_write_include_fanout(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = benchmark.write_include_fanout(directory, 3, 2)
+            self.assertEqual(os.path.join(directory, 'config.cpp'), config)
+            ast = armaclassparser.parse_from_file(config)
+        self.assertEqual(6, len(ast[1].body))
+
+    def test_generate_mission(self):
+        ast = armaclassparser.parse_from_string(benchmark.generate_mission(3))
+        entities = ast[1].body[0].body
+        self.assertEqual(4, len(entities))
+        self.assertTrue(all(isinstance(entity, ClassDefinition) for entity in entities[1:]))
+
+    def test_run_suite(self):
+        report = benchmark.run_suite(repeat=1)
+        self.assertEqual(benchmark.REPORT_FORMAT, report['format'])
+        self.assertEqual(1, report['scale'])
+        self.assertEqual(set(benchmark.WORKLOADS), set(report['results']))
+        for result in report['results'].values():
+            self.assertGreater(result['size'], 0)
+            self.assertGreater(result['tokens'], 0)
+            self.assertEqual(set(benchmark.STAGES), set(result['stages']))
+
+    def test_run_suite_memory(self):
+        report = benchmark.run_suite(repeat=1, workloads=['macro_header'], memory=True)
+        memory = report['results']['macro_header']['memory']
+        self.assertEqual('lex', next(iter(memory)))
+        self.assertGreater(memory['parse']['objects']['ClassDefinition'], 100)
+
+        ratios = benchmark.compare(report, report)['macro_header']
+        self.assertEqual(1.0, ratios['memory.parse'])
+
+    def test_run_suite_unknown_workload(self):
+        with self.assertRaises(ValueError):
+            benchmark.run_suite(workloads=['unknown'])
+
+    def test_compare(self):
+        baseline = {'results': {'a': {'stages': {'lex': 2.0, 'parse': 0.0}}}}
+        report = {'results': {'a': {'stages': {'lex': 1.0, 'parse': 1.0}}, 'b': {'stages': {'lex': 1.0}}}}
+        self.assertEqual({'a': {'lex': 0.5, 'parse': None}}, benchmark.compare(baseline, report))
+
+    def test_growth_exponent(self):
+        self.assertAlmostEqual(1.0, benchmark.growth_exponent([1, 2, 4], [0.5, 1.0, 2.0]))
+        self.assertAlmostEqual(2.0, benchmark.growth_exponent([1, 2, 4], [0.5, 2.0, 8.0]))
+        with self.assertRaises(ValueError):
+            benchmark.growth_exponent([1, 1], [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
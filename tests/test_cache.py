@@ -0,0 +1,83 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from armaclassparser import generator
+from armaclassparser.cache import ParseCache
+
+
+class _Exploit:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __reduce__(self):
+        return os.mkdir, (os.path.join(self.directory, 'exploited'),)
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, 'cache')
+        self.file_path = self._write('config.cpp', '#include "common.hpp"\nclass A { scope = SCOPE; };\n')
+        self._write('common.hpp', '#define SCOPE 2\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, file_name, content):
+        file_path = os.path.join(self.directory.name, file_name)
+        with open(file_path, 'w') as fp:
+            fp.write(content)
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return file_path
+
+    def test_parse_file(self):
+        cache = ParseCache(self.cache_dir)
+        ast = cache.parse_file(self.file_path)
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assertIsNone(ast[0].tokens)
+
+        timings = {}
+        cached_ast = ParseCache(self.cache_dir).parse_file(self.file_path, timings=timings)
+        self.assertEqual(generator.from_ast(ast), generator.from_ast(cached_ast))
+        self.assertEqual(['cache'], list(timings))
+
+        # other options use other entries
+        cache.parse_file(self.file_path, class_filter='CfgPatches')
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        cache.parse_file(self.file_path)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_invalidation(self):
+        cache = ParseCache(self.cache_dir)
+        cache.parse_file(self.file_path)
+
+        # same content, new modification time
+        self._write('common.hpp', '#define SCOPE 2\n')
+        cache.parse_file(self.file_path)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        self._write('common.hpp', '#define SCOPE 1\n')
+        ast = cache.parse_file(self.file_path)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        self.assertEqual(1, ast[0].get_property('scope').right.value)
+
+    def test_corrupt_entry(self):
+        cache = ParseCache(self.cache_dir)
+        cache.parse_file(self.file_path)
+        for file_name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, file_name), 'wb') as fp:
+                fp.write(b'garbage')
+        cache.parse_file(self.file_path)
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+        # a pickle in the cache directory is never unpickled
+        for file_name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, file_name), 'wb') as fp:
+                fp.write(pickle.dumps(_Exploit(self.directory.name)))
+        cache.parse_file(self.file_path)
+        self.assertEqual((0, 3), (cache.hits, cache.misses))
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, 'exploited')))
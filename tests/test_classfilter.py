@@ -0,0 +1,91 @@
+import unittest
+
+import armaclassparser
+from armaclassparser.ast import ClassDefinition, ExternalClassReference
+from armaclassparser.classfilter import ClassPathFilter, MATCHED
+
+
+class TestClassFilter(unittest.TestCase):
+
+    def test_matches_simple(self):
+        class_filter = ClassPathFilter('CfgPatches')
+        self.assertTrue(class_filter.matches('CfgPatches'))
+        self.assertTrue(class_filter.matches('cfgpatches'))
+        self.assertTrue(class_filter.matches('CfgPatches/my_addon'))
+        self.assertFalse(class_filter.matches('CfgVehicles'))
+
+    def test_matches_wildcards(self):
+        class_filter = ClassPathFilter('CfgVehicles/*/Turrets/**')
+        self.assertTrue(class_filter.matches('CfgVehicles'))
+        self.assertTrue(class_filter.matches('CfgVehicles/Car'))
+        self.assertTrue(class_filter.matches('CfgVehicles/Car/Turrets'))
+        self.assertTrue(class_filter.matches('CfgVehicles/Car/Turrets/MainTurret/ViewOptics'))
+        self.assertFalse(class_filter.matches('CfgVehicles/Car/Wheels'))
+        self.assertFalse(class_filter.matches('CfgWeapons'))
+
+    def test_matches_any_depth(self):
+        class_filter = ClassPathFilter('**/Turrets')
+        self.assertTrue(class_filter.matches('Turrets'))
+        self.assertTrue(class_filter.matches('CfgVehicles/Car/Turrets/MainTurret'))
+        self.assertEqual(MATCHED, ClassPathFilter('**').initial_state())
+
+    def test_multiple_patterns(self):
+        class_filter = ClassPathFilter(['CfgPatches', 'CfgWeapons/arifle_MX_F'])
+        self.assertTrue(class_filter.matches('CfgPatches'))
+        self.assertTrue(class_filter.matches('CfgWeapons/arifle_MX_F'))
+        self.assertFalse(class_filter.matches('CfgWeapons/arifle_Katiba_F'))
+
+    def test_invalid_pattern(self):
+        self.assertRaises(ValueError, ClassPathFilter, 'CfgVehicles//Turrets')
+        self.assertRaises(ValueError, ClassPathFilter, [])
+        self.assertRaises(TypeError, ClassPathFilter, None)
+
+    def test_parse_filtered(self):
+        input_data = """class CfgPatches {
+    class my_addon {
+        units[] = {};
+    };
+};
+class CfgVehicles {
+    class Car;
+    class MyCar : Car {
+        displayName = "{not a brace}";
+        class Turrets {
+            class MainTurret {};
+        };
+        class Wheels {};
+    };
+};
+class CfgWeapons {
+    class Rifle {};
+};
+"""
+        ast = armaclassparser.parse_from_string(input_data, class_filter='CfgVehicles/*/Turrets/**')
+        self.assertEqual(1, len(ast))
+        cfg_vehicles = ast[0]
+        self.assertEqual('CfgVehicles', cfg_vehicles.class_name)
+        # forward declarations are kept as long as their path can match
+        self.assertEqual(2, len(cfg_vehicles.body))
+        self.assertIsInstance(cfg_vehicles.body[0], ExternalClassReference)
+
+        my_car = cfg_vehicles.body[1]
+        self.assertEqual('MyCar', my_car.class_name)
+        self.assertEqual(['displayName', 'Turrets'],
+                         [child.class_name if isinstance(child, ClassDefinition) else child.left.value
+                          for child in my_car.body])
+        turrets = my_car.body[1]
+        self.assertEqual('MainTurret', turrets.body[0].class_name)
+
+    def test_parse_filtered_top_level(self):
+        input_data = """class CfgPatches {
+    class my_addon {};
+};
+class Car;
+class CfgVehicles {
+    class Car {};
+};
+"""
+        ast = armaclassparser.parse_from_string(input_data, class_filter=['cfgpatches', 'Car'])
+        self.assertEqual(['CfgPatches', 'Car'], [node.class_name for node in ast])
+        self.assertIsInstance(ast[1], ExternalClassReference)
+        self.assertEqual('my_addon', ast[0].body[0].class_name)
@@ -0,0 +1,111 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from armaclassparser import cli
+
+
+class _CrashWorker:
+    # passed as an option, ends the worker process that unpickles it
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.include_root = os.path.join(self.directory.name, 'include')
+        os.makedirs(os.path.join(self.include_root, 'x', 'main'))
+        with open(os.path.join(self.include_root, 'x', 'main', 'macros.hpp'), 'w') as fp:
+            fp.write('#define SCOPE 2\n')
+        self.addon = os.path.join(self.directory.name, 'addon')
+        os.makedirs(self.addon)
+        self.config = os.path.join(self.addon, 'config.cpp')
+        with open(self.config, 'w') as fp:
+            fp.write('#include "\\x\\main\\macros.hpp"\nclass CfgPatches { class addon { scope = SCOPE; }; };\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _main(self, *argv):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(list(argv))
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_parse(self):
+        exit_code, stdout, stderr = self._main('parse', self.config, '--include-root', self.include_root, '--indent',
+                                               '2')
+        self.assertEqual(0, exit_code)
+        self.assertEqual('class CfgPatches {\n  class addon {\n    scope = 2;\n  };\n};\n', stdout)
+        self.assertEqual('', stderr)
+
+    def test_parse_errors(self):
+        exit_code, stdout, stderr = self._main('parse', self.config, '--check')
+        self.assertEqual(1, exit_code)
+        self.assertEqual('', stdout)
+        self.assertIn('PreProcessingError', stderr)
+
+    def test_preprocess(self):
+        exit_code, stdout, _ = self._main('preprocess', self.addon, '--include-root', self.include_root)
+        self.assertEqual(0, exit_code)
+        self.assertIn('scope = 2;', stdout)
+
+    def test_dump_json(self):
+        exit_code, stdout, stderr = self._main('dump-json', self.config, self.config, '--include-root',
+                                               self.include_root, '--jobs', '2', '--stats',
+                                               '--cache-dir', os.path.join(self.directory.name, 'cache'))
+        self.assertEqual(0, exit_code)
+        lines = stdout.splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual({'CfgPatches': {'addon': {'scope': 2}}}, json.loads(lines[0]))
+        self.assertIn('files: 2, failed: 0', stderr)
+        self.assertIn('parse', stderr)
+
+        _, _, stderr = self._main('dump-json', self.config, '--include-root', self.include_root, '--stats',
+                                  '--cache-dir', os.path.join(self.directory.name, 'cache'))
+        self.assertIn('cache hits: 1', stderr)
+
+    def test_cache_per_process(self):
+        cache_dir = os.path.join(self.directory.name, 'cache')
+        exit_code, _, stderr = self._main('parse', self.config, self.config, '--include-root', self.include_root,
+                                          '--stats', '--cache-dir', cache_dir)
+        self.assertEqual(0, exit_code)
+        self.assertIn('cache hits: 1', stderr)
+        self.assertIs(cli._cache(cache_dir), cli._cache(cache_dir))
+        self.assertEqual(1, cli._cache(cache_dir).misses)
+
+    def test_worker_crash(self):
+        options = {'include_roots': [], 'cache_dir': None, 'pre_process': True, 'class_filter': _CrashWorker(),
+                   'typed_arrays': False, 'check': True, 'indent': None}
+        paths = [self.config, os.path.join(self.addon, 'other.cpp')]
+        results = list(cli._run('parse', paths, options, 2))
+        self.assertEqual(paths, [result.file_path for result in results])
+        for result in results:
+            self.assertIsNone(result.output)
+            self.assertTrue(result.error.startswith('BrokenProcessPool'))
+
+    def test_bench(self):
+        exit_code, stdout, _ = self._main('bench', self.config, '--include-root', self.include_root, '--repeat', '2')
+        self.assertEqual(0, exit_code)
+        report = json.loads(stdout)
+        self.assertEqual(2, report['repeat'])
+        self.assertEqual({'lex', 'preprocess', 'parse', 'generate', 'load'},
+                         set(report['results'][self.config]['stages']))
+
+    def test_bench_suite(self):
+        output = os.path.join(self.directory.name, 'bench.json')
+        exit_code, stdout, _ = self._main('bench', '--workload', 'mission', '--repeat', '1', '--output', output)
+        self.assertEqual(0, exit_code)
+        self.assertEqual('', stdout)
+
+        exit_code, stdout, _ = self._main('bench', '--workload', 'mission', '--repeat', '1', '--compare', output)
+        self.assertEqual(0, exit_code)
+        report = json.loads(stdout)
+        self.assertEqual(['mission'], list(report['results']))
+        self.assertEqual({'lex', 'preprocess', 'parse', 'generate', 'load'}, set(report['comparison']['mission']))
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from armaclassparser import benchmark
+
+# wall-clock measurements are unreliable on busy machines, so they only run on request
+TIMING_TESTS = os.environ.get('ARMACLASSPARSER_TIMING_TESTS') == '1'
+
+# n log n between 1x and 16x fits an exponent of about 1.1, quadratic behaviour shows up well above 1.3
+MAX_GROWTH_EXPONENT = 1.3
+
+# stages faster than this at the largest size are dominated by timer noise
+MIN_SECONDS = 0.01
+
+# runs per size, the best time is used
+REPEAT = 5
+
+
+@unittest.skipUnless(TIMING_TESTS, 'set ARMACLASSPARSER_TIMING_TESTS=1 to run the timing tests')
+class TestComplexity(unittest.TestCase):
+
+    def _assert_scaling(self, scenario):
+        result = benchmark.measure_scaling(benchmark.SCALING_SCENARIOS[scenario], repeat=REPEAT)
+        for stage, exponent in result['exponents'].items():
+            if result['stages'][stage][-1] < MIN_SECONDS:
+                continue
+            with self.subTest(stage=stage):
+                self.assertLessEqual(exponent, MAX_GROWTH_EXPONENT,
+                                     '{} of {} grows with exponent {:.2f}, times: {}'.format(
+                                         stage, scenario, exponent, result['stages'][stage]))
+
+    def test_deep_inheritance(self):
+        self._assert_scaling('deep_inheritance')
+
+    def test_numeric_arrays(self):
+        self._assert_scaling('numeric_arrays')
+
+    def test_macro_expansions(self):
+        self._assert_scaling('macro_expansions')
+
+    def test_includes(self):
+        self._assert_scaling('includes')
+
+    def test_mission(self):
+        self._assert_scaling('mission')
+
+
+if __name__ == '__main__':
+    unittest.main()
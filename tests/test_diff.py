@@ -0,0 +1,82 @@
+import unittest
+
+import armaclassparser
+from armaclassparser.diff import diff, ChangeType
+
+
+class TestDiff(unittest.TestCase):
+    old_data = """class CfgPatches {
+    class my_addon {
+        version = 1;
+    };
+};
+class CfgWeapons {
+    class Rifle_Base_F;
+    class arifle_MX_F : Rifle_Base_F {
+        displayName = "MX";
+        magazines[] = {"30Rnd_65x39_caseless_mag"};
+        class WeaponSlotsInfo {
+            mass = 100;
+        };
+    };
+    class arifle_MX_SW_F : arifle_MX_F {
+        scope = 2;
+    };
+    class arifle_Old_F {};
+};
+"""
+    new_data = """class CfgPatches {
+    class my_addon {
+        version = 2;
+    };
+};
+class CfgWeapons {
+    class Rifle_Base_F;
+    class arifle_MX_Base_F;
+    class ARIFLE_MX_F : arifle_MX_Base_F {
+        displayName = "MX";
+        magazines[] = {"30Rnd_65x39_caseless_mag", "100Rnd_65x39_caseless_mag"};
+        class WeaponSlotsInfo {
+            mass = 90;
+            class MuzzleSlot {};
+        };
+    };
+    class arifle_MX_SW_F : arifle_MX_F {
+        scope = 2;
+        author = "Me";
+    };
+};
+"""
+
+    def _diff(self, old_data, new_data):
+        return diff(armaclassparser.parse_from_string(old_data), armaclassparser.parse_from_string(new_data))
+
+    def test_identical(self):
+        self.assertEqual([], self._diff(self.old_data, self.old_data))
+        self.assertEqual([], self._diff(self.old_data, self.old_data.replace('    ', '\t')))
+
+    def test_diff(self):
+        changes = self._diff(self.old_data, self.new_data)
+        self.assertEqual([
+            (ChangeType.PROPERTY_CHANGED, 'CfgPatches/my_addon/version'),
+            (ChangeType.CLASS_REMOVED, 'CfgWeapons/arifle_Old_F'),
+            (ChangeType.CLASS_ADDED, 'CfgWeapons/arifle_MX_Base_F'),
+            (ChangeType.PARENT_CHANGED, 'CfgWeapons/ARIFLE_MX_F'),
+            (ChangeType.PROPERTY_CHANGED, 'CfgWeapons/ARIFLE_MX_F/magazines'),
+            (ChangeType.PROPERTY_CHANGED, 'CfgWeapons/ARIFLE_MX_F/WeaponSlotsInfo/mass'),
+            (ChangeType.CLASS_ADDED, 'CfgWeapons/ARIFLE_MX_F/WeaponSlotsInfo/MuzzleSlot'),
+            (ChangeType.PROPERTY_ADDED, 'CfgWeapons/arifle_MX_SW_F/author'),
+        ], [(change.change_type, '/'.join(change.path)) for change in changes])
+
+        self.assertEqual('~ CfgPatches/my_addon/version = 1 -> 2', str(changes[0]))
+        self.assertEqual('- CfgWeapons/arifle_Old_F', str(changes[1]))
+        self.assertEqual('~ CfgWeapons/ARIFLE_MX_F : Rifle_Base_F -> arifle_MX_Base_F', str(changes[3]))
+
+    def test_reverse(self):
+        changes = self._diff(self.new_data, self.old_data)
+        self.assertIn((ChangeType.PROPERTY_REMOVED, 'CfgWeapons/arifle_MX_SW_F/author'),
+                      [(change.change_type, '/'.join(change.path)) for change in changes])
+
+    def test_declaration_changed(self):
+        changes = self._diff("class Foo;", "class Foo {};")
+        self.assertEqual([ChangeType.CLASS_REMOVED, ChangeType.CLASS_ADDED], [change.change_type for change in changes])
@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+
+import armaclassparser
+from armaclassparser.export import to_dict, dump_json
+
+
+class TestExport(unittest.TestCase):
+    input_data = """class CfgPatches {
+    class my_addon {
+        units[] = {};
+        requiredAddons[] = {"A3_Data_F", {1, 2.5}};
+    };
+};
+class CfgVehicles {
+    class Car;
+    class MyCar : Car {
+        scope = 2;
+        displayName = "My Car";
+        Scope = 1;
+        side = TEast;
+    };
+};
+"""
+
+    def setUp(self):
+        self.ast = armaclassparser.parse_from_string(self.input_data)
+
+    def test_to_dict(self):
+        expected = {
+            'CfgPatches': {'my_addon': {'units': [], 'requiredAddons': ['A3_Data_F', [1, 2.5]]}},
+            'CfgVehicles': {
+                'Car': None,
+                'MyCar': {'__parent__': 'Car', 'displayName': 'My Car', 'Scope': 1, 'side': 'TEast'}
+            }
+        }
+        result = to_dict(self.ast)
+        self.assertEqual(expected, result)
+        self.assertEqual(['__parent__', 'displayName', 'Scope', 'side'], list(result['CfgVehicles']['MyCar']))
+
+    def test_to_dict_options(self):
+        result = to_dict(self.ast, casefold=True, preserve_order=False)
+        self.assertEqual(['__parent__', 'displayname', 'scope', 'side'], list(result['cfgvehicles']['mycar']))
+        self.assertEqual(['requiredaddons', 'units'], list(result['cfgpatches']['my_addon']))
+
+    def _dump(self, **kwargs):
+        fp = io.StringIO()
+        dump_json(self.ast, fp, **kwargs)
+        return fp.getvalue()
+
+    def test_dump_json(self):
+        for kwargs in [{}, {'casefold': True}, {'preserve_order': False}, {'indent': 2}]:
+            output = self._dump(**kwargs)
+            self.assertEqual(json.dumps(to_dict(self.ast, **{key: value for key, value in kwargs.items()
+                                                             if key != 'indent'}),
+                                        indent=kwargs.get('indent'),
+                                        separators=(',', ': ' if 'indent' in kwargs else ':')), output)
+
+    def test_dump_json_compact(self):
+        ast = armaclassparser.parse_from_string("class Foo { a[] = {}; class Bar {}; };")
+        fp = io.StringIO()
+        dump_json(ast, fp)
+        self.assertEqual('{"Foo":{"a":[],"Bar":{}}}', fp.getvalue())
+
+    def test_name_collision(self):
+        for input_data in ["class Foo { class Bar {}; bar = 1; };", "Foo = 1; class foo;"]:
+            ast = armaclassparser.parse_from_string(input_data)
+            with self.assertRaises(ValueError):
+                to_dict(ast)
+            with self.assertRaises(ValueError):
+                dump_json(ast, io.StringIO())
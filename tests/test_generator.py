@@ -1,7 +1,9 @@
+import io
 import unittest
 
 import armaclassparser
 from armaclassparser import lexer, generator
+from armaclassparser.ast import ClassDefinition
 from armaclassparser.lexer import Lexer
 
 
@@ -51,3 +53,77 @@ class TestGenerator(unittest.TestCase):
         expected_output = """class Foo {
 };\n"""
         self._test_generator_ast(input_data, expected_output)
+
+    def test_parent_class(self):
+        input_data = "class Foo : Bar {};"
+        expected_output = """class Foo : Bar {
+};\n"""
+        self._test_generator_ast(input_data, expected_output)
+        self.assertEqual(expected_output, str(armaclassparser.parse_from_string(input_data)[0]))
+
+    def test_indent(self):
+        input_data = 'class Foo { class Bar; class Baz : Bar { a[] = {1, {"x", y}}; b = 2; }; };'
+        expected_output = """class Foo {
+\tclass Bar;
+\tclass Baz : Bar {
+\t\ta[] = {1,{"x",y}};
+\t\tb = 2;
+\t};
+};\n"""
+        ast = armaclassparser.parse_from_string(input_data)
+        self.assertEqual(expected_output, generator.from_ast(ast, indent='\t'))
+        self.assertEqual(expected_output.replace('\t', ''), generator.from_ast(ast))
+
+    def test_write_ast(self):
+        input_data = 'class A { numbers[] = {1,2.5,-3}; class B { class C { s = "text"; }; }; };'
+        ast = armaclassparser.parse_from_string(input_data)
+        expected_output = ''.join(str(node) for node in ast)
+        for buffer_size in [1, 7, generator.DEFAULT_BUFFER_SIZE]:
+            fp = io.StringIO()
+            generator.write_ast(ast, fp, buffer_size=buffer_size)
+            self.assertEqual(expected_output, fp.getvalue())
+
+        typed_ast = armaclassparser.parse_from_string(input_data, typed_arrays=True)
+        self.assertEqual(expected_output, generator.from_ast(typed_ast))
+
+    def test_write_deep(self):
+        depth = 5000
+        ast = [ClassDefinition.from_values('C', [], None, 1, 1)]
+        node = ast[0]
+        for _ in range(depth - 1):
+            child = ClassDefinition.from_values('C', [], None, 1, 1)
+            node.body.append(child)
+            node = child
+        output = generator.from_ast(ast)
+        self.assertEqual('class C {\n' * depth + '};\n' * depth, output)
+
+    def test_write_tokens(self):
+        input_data = 'class Foo {\n  bar = "baz";\n};'
+        tokens = Lexer(input_data, lexer.STRING_INPUT_FILE).tokenize()
+        fp = io.StringIO()
+        generator.write_tokens(tokens, fp, buffer_size=3)
+        self.assertEqual(input_data, fp.getvalue())
+
+    def test_cache(self):
+        input_data = 'class A { x = 1; class B { y[] = {1, {2}}; }; class C { z = "c"; }; }; w = 3;'
+        ast = armaclassparser.parse_from_string(input_data)
+        expected_output = generator.from_ast(ast, indent='  ')
+        self.assertEqual(expected_output, generator.from_ast(ast, indent='  ', cache=True))
+        class_a, class_b, class_c = ast[0], ast[0].body[1], ast[0].body[2]
+        cached_c = class_c._output
+        self.assertIsNotNone(cached_c)
+        self.assertEqual(expected_output, generator.from_ast(ast, indent='  ', cache=True))
+        self.assertIs(cached_c, class_c._output)
+
+        # changing a value only invalidates the classes containing it
+        class_b.body[0].right.children[1].children[0].value = 5
+        class_b.body[0].right.children[1].children[0].mark_dirty()
+        self.assertIsNone(class_b._output)
+        self.assertIsNone(class_a._output)
+        self.assertIs(cached_c, class_c._output)
+        self.assertEqual(expected_output.replace('{2}', '{5}'), generator.from_ast(ast, indent='  ', cache=True))
+        self.assertIs(cached_c, class_c._output)
+
+        # a different indentation renders everything again
+        self.assertEqual(generator.from_ast(ast), generator.from_ast(ast, cache=True))
+        self.assertIsNot(cached_c, class_c._output)
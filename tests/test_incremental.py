@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from armaclassparser.incremental import IncrementalParser
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self._write('common.hpp', '#define SCOPE 2\n')
+        self._write('a.hpp', 'class A { scope = SCOPE; };\n')
+        self._write('config_a.cpp', '#include "common.hpp"\n#include "a.hpp"\n')
+        self._write('config_b.cpp', '#include "common.hpp"\nclass B { scope = SCOPE; };\n')
+        self.root_a = self._path('config_a.cpp')
+        self.root_b = self._path('config_b.cpp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, file_name):
+        return os.path.join(self.directory.name, file_name)
+
+    def _write(self, file_name, content):
+        file_path = self._path(file_name)
+        with open(file_path, 'w') as fp:
+            fp.write(content)
+        # make sure the modification is visible, even on file systems with a coarse timestamp resolution
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def _scope(self, incremental, root_path):
+        return incremental.get(root_path)[0].get_property('scope').right.value
+
+    def test_update(self):
+        incremental = IncrementalParser([self.root_a, self.root_b])
+        ast_b = incremental.get(self.root_b)
+        self.assertEqual(2, self._scope(incremental, self.root_a))
+
+        self._write('a.hpp', 'class A { scope = 1; };\n')
+        self.assertEqual([self.root_a], incremental.update([self._path('a.hpp')]))
+        self.assertEqual(1, self._scope(incremental, self.root_a))
+        self.assertIs(ast_b, incremental.get(self.root_b))
+
+        # unchanged content does not trigger a parse
+        self.assertEqual([], incremental.update([self._path('a.hpp'), self._path('unknown.hpp')]))
+
+        self._write('common.hpp', '#define SCOPE 0\n')
+        self.assertEqual([self.root_a, self.root_b], incremental.update([self._path('common.hpp')]))
+        self.assertEqual(0, self._scope(incremental, self.root_b))
+
+    def test_poll(self):
+        incremental = IncrementalParser([self.root_a, self.root_b])
+        self.assertEqual([], incremental.poll())
+        self._write('config_b.cpp', 'class B { scope = 1; };\n')
+        self.assertEqual([self.root_b], incremental.poll())
+        self.assertEqual(1, self._scope(incremental, self.root_b))
+
+        # config_b no longer includes common.hpp
+        self._write('common.hpp', '#define SCOPE 3\n')
+        self.assertEqual([self.root_a], incremental.poll())
+
+    def test_errors(self):
+        incremental = IncrementalParser([self.root_a])
+        ast_a = incremental.get(self.root_a)
+        os.remove(self._path('a.hpp'))
+        self.assertEqual([self.root_a], incremental.poll())
+        self.assertIn(self.root_a, incremental.errors)
+        self.assertIs(ast_a, incremental.get(self.root_a))
+
+        self._write('a.hpp', 'class A { scope = 5; };\n')
+        self.assertEqual([self.root_a], incremental.poll())
+        self.assertNotIn(self.root_a, incremental.errors)
+        self.assertEqual(5, self._scope(incremental, self.root_a))
+
+        incremental.remove(self.root_a)
+        self.assertIsNone(incremental.get(self.root_a))
+        self.assertEqual({}, incremental._stats)
+        # forgetting a root that is not known does nothing
+        incremental.remove(self.root_a)
+        incremental.remove(self._path('unknown.cpp'))
+
+    def test_partially_written(self):
+        incremental = IncrementalParser([self.root_a, self.root_b])
+        ast_a = incremental.get(self.root_a)
+        ast_b = incremental.get(self.root_b)
+        # a truncated UTF-8 sequence, in an include and in a root
+        for file_name in ['a.hpp', 'config_b.cpp']:
+            with open(self._path(file_name), 'ab') as fp:
+                fp.write('// \u00e4'.encode('utf-8')[:-1])
+        self.assertEqual([self.root_a, self.root_b], incremental.poll())
+        self.assertIsInstance(incremental.errors[self.root_a], UnicodeDecodeError)
+        self.assertIsInstance(incremental.errors[self.root_b], UnicodeDecodeError)
+        self.assertIs(ast_a, incremental.get(self.root_a))
+        self.assertIs(ast_b, incremental.get(self.root_b))
+
+        self._write('a.hpp', 'class A { scope = 4; };\n')
+        self._write('config_b.cpp', 'class B { scope = 5; };\n')
+        self.assertEqual([self.root_a, self.root_b], incremental.poll())
+        self.assertEqual({}, incremental.errors)
+        self.assertEqual([4, 5], [self._scope(incremental, self.root_a), self._scope(incremental, self.root_b)])
+
+    def test_watch(self):
+        incremental = IncrementalParser([self.root_a])
+        stop_event = threading.Event()
+        updates = []
+
+        def callback(roots):
+            updates.append(roots)
+            stop_event.set()
+
+        self._write('a.hpp', 'class A { scope = 1; };\n')
+        incremental.watch(interval=0.01, callback=callback, stop_event=stop_event)
+        self.assertEqual([[self.root_a]], updates)
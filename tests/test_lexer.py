@@ -183,3 +183,37 @@ _fnc_sizeEx = {\
     str _sizeEx + " * " + _pixelH + " * pixelGrid * " + str pixelScale\
 };"""
         Lexer(input_data, lexer.STRING_INPUT_FILE).tokenize()
+
+    def test_interned_values(self):
+        tokens = Lexer('scope = 2; Scope = 2; displayName = "a";', lexer.STRING_INPUT_FILE).tokenize()
+        words = [token for token in tokens if token.token_type in [TokenType.WORD, TokenType.NUMBER]]
+        self.assertIs(words[1].value, words[3].value)
+        self.assertIs(words[0].value, Lexer('scope', lexer.STRING_INPUT_FILE).tokenize()[0].value)
+
+    def test_spans(self):
+        input_data = '#include "a.hpp"\nclass Foo: Bar {\n  value[] = {1.5, -2, "x y"}; // note\n  __EXEC(a = 1)\n};'
+        expected = Lexer(input_data, lexer.STRING_INPUT_FILE).tokenize()
+        tokens = Lexer(input_data, lexer.STRING_INPUT_FILE, spans=True).tokenize()
+        self.assertTrue(all(isinstance(token, lexer.SpanToken) for token in tokens))
+        self.assertEqual(expected, tokens)
+
+    def test_span_values_lazy(self):
+        tokens = Lexer('class Foo {\n  scope = 2;\n};', lexer.STRING_INPUT_FILE, spans=True).tokenize()
+        scope = tokens[8]
+        self.assertEqual(TokenType.WORD, scope.token_type)
+        self.assertEqual((14, 19), (scope.start, scope.end))
+        # the value slot stays empty until the value is read
+        with self.assertRaises(AttributeError):
+            Token.value.__get__(scope)
+        self.assertEqual('scope', scope.value)
+        self.assertEqual('scope', Token.value.__get__(scope))
+        self.assertIs(scope.value, Lexer('scope', lexer.STRING_INPUT_FILE).tokenize()[0].value)
+        self.assertEqual('=', tokens[10].value)
+
+    def test_source_text(self):
+        tokens = Lexer('a = "foo  bar";', lexer.STRING_INPUT_FILE, spans=True).tokenize()
+        content = tokens[5:9]
+        self.assertEqual('foo  bar', lexer.source_text(content))
+        self.assertIsNone(lexer.source_text([content[0], content[-1]]))
+        self.assertEqual('', lexer.source_text([]))
+        self.assertIsNone(lexer.source_text(Lexer('a', lexer.STRING_INPUT_FILE).tokenize()))
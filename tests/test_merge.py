@@ -0,0 +1,149 @@
+import gc
+import unittest
+import weakref
+from unittest import mock
+
+import armaclassparser
+from armaclassparser import generator
+from armaclassparser.ast import BodyIndex, ClassDefinition
+from armaclassparser.errors import MergeError
+from armaclassparser.merge import merge_configs, sort_by_load_order, get_patches, ConfigMerger
+
+
+def _config(addon, required, body):
+    return armaclassparser.parse_from_string("""class CfgPatches {{
+    class {} {{
+        requiredAddons[] = {{{}}};
+    }};
+}};
+{}""".format(addon, ', '.join('"{}"'.format(name) for name in required), body))
+
+
+class TestMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.base = _config('A3_Data_F', [], """class CfgVehicles {
+    class Car {
+        scope = 1;
+        maxSpeed = 100;
+        class Turrets {
+            class MainTurret {};
+        };
+    };
+    class Tank {
+        scope = 1;
+    };
+};""")
+        self.mod = _config('my_mod', ['A3_Data_F'], """class CfgVehicles {
+    class Car;
+    class Car_F : Car {};
+    class Car {
+        maxSpeed = 120;
+        class Turrets {
+            class SideTurret {};
+        };
+    };
+};""")
+        self.patch = _config('my_patch', ['my_mod'], """class CfgVehicles {
+    class Car {
+        maxSpeed = 140;
+    };
+};""")
+
+    def test_get_patches(self):
+        self.assertEqual((['my_mod'], ['A3_Data_F']), get_patches(self.mod))
+        self.assertEqual(([], []), get_patches(armaclassparser.parse_from_string("class Foo {};")))
+
+    def test_load_order(self):
+        self.assertEqual([0, 1, 2], sort_by_load_order([self.base, self.mod, self.patch]))
+        self.assertEqual([1, 2, 0], sort_by_load_order([self.patch, self.base, self.mod]))
+        unrelated = armaclassparser.parse_from_string("class Foo {};")
+        self.assertEqual([1, 0, 2, 3], sort_by_load_order([self.mod, self.base, unrelated, self.patch]))
+
+    def test_load_order_cycle(self):
+        a = _config('a', ['b'], '')
+        b = _config('b', ['a'], '')
+        self.assertRaises(MergeError, sort_by_load_order, [a, b])
+
+    def test_merge(self):
+        merged = merge_configs([self.patch, self.mod, self.base])
+        cfg_vehicles = BodyIndex(merged).get_class('CfgVehicles')
+        self.assertEqual(['car', 'tank', 'car_f'], list(cfg_vehicles.index.classes))
+
+        car = cfg_vehicles.get_class('Car')
+        self.assertEqual(1, car.get_property('scope').right.value)
+        self.assertEqual(140, car.get_property('maxSpeed').right.value)
+        self.assertEqual(['MainTurret', 'SideTurret'],
+                         [turret.class_name for turret in car.get_class('Turrets').body])
+        self.assertEqual(['A3_Data_F', 'my_mod', 'my_patch'],
+                         [patch.class_name for patch in BodyIndex(merged).get_class('CfgPatches').body])
+
+    def test_merge_shares_subtrees(self):
+        base_output = generator.from_ast(self.base)
+        merged = merge_configs([self.base, self.mod])
+        self.assertEqual(base_output, generator.from_ast(self.base))
+
+        cfg_vehicles = BodyIndex(merged).get_class('CfgVehicles')
+        base_cfg_vehicles = BodyIndex(self.base).get_class('CfgVehicles')
+        self.assertIs(base_cfg_vehicles.get_class('Tank'), cfg_vehicles.get_class('Tank'))
+        self.assertIs(base_cfg_vehicles.get_class('Car').get_class('Turrets').get_class('MainTurret'),
+                      cfg_vehicles.get_class('Car').get_class('Turrets').get_class('MainTurret'))
+
+    def test_edit_merged(self):
+        merged = merge_configs([self.base, self.mod])
+        car = BodyIndex(merged).get_class('CfgVehicles').get_class('Car')
+        scope = car.get_property('scope')
+        # shared with the base config, whose class is the parent of the node
+        self.assertIs(BodyIndex(self.base).get_class('CfgVehicles').get_class('Car'), scope.parent)
+        self.assertIn('scope = 1;', generator.from_ast(merged, cache=True))
+        hash_car = car.structural_hash()
+        hash_merged = merged[-1].structural_hash()
+
+        scope.right.value = 99
+        scope.right.mark_dirty()
+        self.assertEqual(generator.from_ast(merged), generator.from_ast(merged, cache=True))
+        self.assertIn('scope = 99;', generator.from_ast(merged, cache=True))
+        self.assertNotEqual(hash_car, car.structural_hash())
+        self.assertNotEqual(hash_merged, merged[-1].structural_hash())
+
+        # a cached hash is returned without walking the tree
+        with mock.patch.object(ClassDefinition, 'body', property(lambda node: self.fail('walked the tree'))):
+            self.assertEqual(merged[-1].structural_hash(), merged[-1].structural_hash())
+
+    def test_merged_classes_released(self):
+        car = BodyIndex(self.base).get_class('CfgVehicles').get_class('Car')
+        scope = car.get_property('scope')
+        merged = weakref.ref(BodyIndex(merge_configs([self.base, self.mod])).get_class('CfgVehicles'))
+        gc.collect()
+        # the nodes shared with the base config do not keep the merged classes alive
+        self.assertIsNone(merged())
+        scope.mark_dirty()
+        self.assertEqual([], [parent for parent in scope._shared_parents if parent() is not None])
+
+    def test_merge_parent(self):
+        merged = merge_configs([armaclassparser.parse_from_string("class A {}; class B : A {}; class C : A {};"),
+                                armaclassparser.parse_from_string("class B : C {}; class C : A {};")])
+        self.assertEqual([None, 'C', 'A'], [node.parent_class for node in merged])
+
+    def test_merger_incremental(self):
+        merger = ConfigMerger()
+        merger.set_config('base', self.base)
+        merger.set_config('mod', self.mod)
+        merger.set_config('patch', self.patch)
+        merged = merger.merge()
+        self.assertEqual(['base', 'mod', 'patch'], merger.load_order)
+        snapshots = list(merger._snapshots)
+
+        patch = _config('my_patch', ['my_mod'], "class CfgVehicles { class Car { maxSpeed = 160; }; };")
+        merger.set_config('patch', patch)
+        remerged = merger.merge()
+        self.assertIs(snapshots[0], merger._snapshots[0])
+        self.assertIs(snapshots[1], merger._snapshots[1])
+        car = BodyIndex(remerged).get_class('CfgVehicles').get_class('Car')
+        self.assertEqual(160, car.get_property('maxSpeed').right.value)
+        self.assertEqual(140, BodyIndex(merged).get_class('CfgVehicles').get_class('Car')
+                         .get_property('maxSpeed').right.value)
+
+        merger.remove_config('patch')
+        car = BodyIndex(merger.merge()).get_class('CfgVehicles').get_class('Car')
+        self.assertEqual(120, car.get_property('maxSpeed').right.value)
@@ -1,7 +1,8 @@
 import os
 import unittest
 
-from armaclassparser import lexer
+import armaclassparser
+from armaclassparser import generator, lexer
 from armaclassparser.ast import Array
 from armaclassparser.lexer import Lexer, Token, TokenType
 from armaclassparser.parser import Parser, Identifier, Constant, Assignment, StringLiteral, ArrayDeclaration
@@ -306,3 +307,54 @@ class TestParser(unittest.TestCase):
         tokens = Lexer(input_data, file_path).tokenize()
         parser = Parser(tokens, lexer.STRING_INPUT_FILE)
         parser.parse()
+
+    def test_slots(self):
+        ast = armaclassparser.parse_from_string('class Foo { a = 1; b[] = {"x", y}; };')
+        nodes = [ast[0], ast[0].body[0], ast[0].body[1], ast[0].body[1].left, ast[0].body[1].right]
+        for node in nodes:
+            self.assertFalse(hasattr(node, '__dict__'), repr(node))
+
+    def test_keep_tokens(self):
+        input_data = 'class Foo : Bar { a = 1; b[] = {"hello", world, 2.5}; class Baz; };'
+        full_ast = armaclassparser.parse_from_string(input_data)
+        slim_ast = armaclassparser.parse_from_string(input_data, keep_tokens=False)
+
+        foo = slim_ast[0]
+        self.assertIsNone(foo.tokens)
+        self.assertEqual('Foo', foo.class_name)
+        self.assertEqual('Bar', foo.parent_class)
+        self.assertEqual((1, 1), (foo.line_no, foo.line_pos))
+
+        assignment = foo.body[1]
+        self.assertIsNone(assignment.tokens)
+        self.assertIsNone(assignment.right.tokens)
+        self.assertEqual(['hello', 'world', 2.5], [child.value for child in assignment.right.children])
+        self.assertEqual((1, 30), (assignment.line_no, assignment.line_pos))
+
+        self.assertEqual(full_ast, slim_ast)
+        self.assertEqual(generator.from_ast(full_ast), generator.from_ast(slim_ast))
+
+    def test_array_number_run(self):
+        input_data = '{1, 2,\n 3, "a", 4 , 5, {6, 7}, 8}'
+        tokens = Lexer(input_data, lexer.STRING_INPUT_FILE).tokenize()
+        ast = Parser(tokens, lexer.STRING_INPUT_FILE).parse()
+        children = ast[0].children
+        self.assertEqual([1, 2, 3, 'a', 4, 5], [child.value for child in children[:6]])
+        self.assertEqual([6, 7], [child.value for child in children[6].children])
+        self.assertEqual(8, children[7].value)
+        self.assertEqual([(1, 2), (1, 5), (2, 2), (2, 10)],
+                         [(child.line_no, child.line_pos) for child in children[:3] + children[4:5]])
+        self.assertEqual(Constant(Token(TokenType.NUMBER, lexer.STRING_INPUT_FILE, 2, 2, value='3')), children[2])
+
+    def test_array_number_run_typed(self):
+        input_data = 'a[] = {1, 2, 3};\nb[] = {1, 2.5};\nc[] = {1, 2, "c"};\nd[] = {};'
+        ast = armaclassparser.parse_from_string(input_data, typed_arrays=True)
+        a, b, c, d = [assignment.right for assignment in ast]
+        self.assertEqual([1, 2, 3], list(a.values))
+        self.assertIsNone(b.values)
+        self.assertEqual([(2, 8), (2, 11)], [(child.line_no, child.line_pos) for child in b.children])
+        self.assertIsNotNone(b.children[1].tokens)
+        self.assertIsNone(c.values)
+        self.assertEqual([1, 2, 'c'], [child.value for child in c.children])
+        self.assertEqual([], d.children)
+        self.assertEqual(generator.from_ast(armaclassparser.parse_from_string(input_data)), generator.from_ast(ast))
@@ -3,7 +3,7 @@ import unittest
 
 from armaclassparser import generator, lexer
 from armaclassparser.lexer import Lexer
-from armaclassparser.preprocessor import PreProcessor
+from armaclassparser.preprocessor import PreProcessor, content_hash
 
 
 class TestPreProcessor(unittest.TestCase):
@@ -184,6 +184,22 @@ class Foo {};
         expected_output = "\ntest"
         self.assertEqual(expected_output, output)
 
+    def test_include_graph(self):
+        dir_path = os.path.dirname(os.path.realpath(__file__))
+        file_path = os.path.join(dir_path, "examples/include/01_include_test_config.cpp")
+        with open(file_path, 'r', encoding='utf-8', newline=None) as fp:
+            input_data = fp.read()
+        preprocessor = PreProcessor(Lexer(input_data, file_path).tokenize(), file_path)
+        preprocessor.preprocess()
+
+        include_dir_path = os.path.join(dir_path, "examples", "include")
+        included_file_paths = [os.path.join(include_dir_path, "01_include_test_file{}.hpp".format(i)) for i in [1, 2, 3]]
+        dependencies = preprocessor.include_graph.dependencies(file_path)
+        self.assertEqual(included_file_paths, list(dependencies))
+        with open(included_file_paths[0], 'r', encoding='utf-8', newline=None) as fp:
+            self.assertEqual(content_hash(fp.read()), dependencies[included_file_paths[0]])
+        self.assertEqual({os.path.normpath(file_path)}, preprocessor.include_graph.dependents(included_file_paths[2]))
+
     def test_escaped_newlines(self):
         input_data = """\\
 """
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from armaclassparser import profiling
+
+CONFIG = '''#define SCOPE 2
+// comment
+class CfgPatches {
+    class addon {
+        scope = SCOPE;
+        units[] = {"a", "b"};
+    };
+};
+'''
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_profile_memory(self):
+        stages = profiling.profile_memory(CONFIG)
+        self.assertEqual(['lex', 'preprocess.remove_comments', 'preprocess.replace_includes',
+                          'preprocess.remove_escaped_newlines', 'preprocess.process_directives', 'parse'],
+                         [stage.stage for stage in stages])
+        for stage in stages:
+            self.assertGreaterEqual(stage.peak, stage.retained)
+        self.assertGreater(stages[0].objects['Token'], 0)
+        # the comment and the #define are removed by the pre-processor
+        self.assertLess(stages[-2].objects['Token'], stages[0].objects['Token'])
+        self.assertEqual(2, stages[-1].objects['ClassDefinition'])
+        self.assertEqual(2, stages[-1].objects['StringLiteral'])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_profile_memory_without_reset_peak(self):
+        # Python < 3.9
+        expected = profiling.profile_memory(CONFIG)
+        reset_peak = profiling._RESET_PEAK
+        profiling._RESET_PEAK = False
+        try:
+            stages = profiling.profile_memory(CONFIG)
+        finally:
+            profiling._RESET_PEAK = reset_peak
+        self.assertEqual([stage.stage for stage in expected], [stage.stage for stage in stages])
+        for stage in stages:
+            self.assertGreaterEqual(stage.peak, stage.retained)
+        self.assertGreater(stages[0].peak, 0)
+        self.assertEqual(expected[-1].objects, stages[-1].objects)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_profile_memory_without_tokens(self):
+        stages = profiling.profile_memory('class a {\n    values[] = {1, 2, 3};\n};\n', pre_process=False,
+                                          keep_tokens=False)
+        self.assertEqual(['lex', 'parse'], [stage.stage for stage in stages])
+        self.assertNotIn('Token', stages[-1].objects)
+        self.assertLess(stages[-1].retained, stages[0].retained)
+
+    def test_profile_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'config.cpp')
+            with open(file_path, 'w') as fp:
+                fp.write(CONFIG)
+            tracemalloc.start()
+            try:
+                stages = profiling.profile_file(file_path)
+                # profiling does not stop tracing that was started before
+                self.assertTrue(tracemalloc.is_tracing())
+            finally:
+                tracemalloc.stop()
+        self.assertEqual({'peak', 'retained', 'objects'}, set(stages[-1].to_dict()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import armaclassparser
+from armaclassparser.query import query, compile_query
+from armaclassparser.resolver import InheritanceResolver
+
+
+class TestQuery(unittest.TestCase):
+    input_data = """class CfgPatches {
+    class my_addon {};
+};
+class CfgWeapons {
+    class Rifle_Base_F {
+        scope = 0;
+        magazines[] = {"30Rnd_65x39_caseless_mag"};
+    };
+    class arifle_MX_F : Rifle_Base_F {
+        scope = 2;
+        displayName = "MX 6.5 mm";
+        magazines[] = {"30Rnd_65x39_caseless_mag", "100Rnd_65x39_caseless_mag"};
+    };
+    class arifle_MX_SW_F : arifle_MX_F {
+        scope = 2;
+    };
+    class arifle_MX_Hidden_F : arifle_MX_F {
+        scope = 1;
+        class WeaponSlotsInfo {
+            class MuzzleSlot {};
+        };
+    };
+};
+"""
+
+    def setUp(self):
+        self.ast = armaclassparser.parse_from_string(self.input_data)
+
+    def _names(self, nodes):
+        return [node.class_name if hasattr(node, 'class_name') else node.name for node in nodes]
+
+    def test_names(self):
+        self.assertEqual(['CfgPatches'], self._names(query(self.ast, 'cfgpatches')))
+        self.assertEqual(['my_addon'], self._names(query(self.ast, '/CfgPatches/MY_ADDON')))
+        self.assertEqual(['scope'], self._names(query(self.ast, 'CfgWeapons/Rifle_Base_F/scope')))
+        self.assertEqual([], query(self.ast, 'CfgWeapons/Unknown/scope'))
+
+    def test_wildcard(self):
+        result = query(self.ast, 'CfgWeapons/*')
+        self.assertEqual(['Rifle_Base_F', 'arifle_MX_F', 'arifle_MX_SW_F', 'arifle_MX_Hidden_F'], self._names(result))
+        result = query(self.ast, 'CfgWeapons/arifle_MX_F/*')
+        self.assertEqual(['scope', 'displayName', 'magazines'], self._names(result))
+
+    def test_predicates(self):
+        result = query(self.ast, 'CfgWeapons/*[scope=2]/magazines')
+        self.assertEqual(1, len(result))
+        self.assertEqual(2, len(result[0].right.children))
+
+        self.assertEqual(['arifle_MX_F'], self._names(query(self.ast, 'CfgWeapons/*[displayName="MX 6.5 mm"]')))
+        self.assertEqual(['arifle_MX_F'], self._names(query(self.ast, 'CfgWeapons/*[displayName]')))
+        self.assertEqual(['Rifle_Base_F', 'arifle_MX_Hidden_F'],
+                         self._names(query(self.ast, 'CfgWeapons/*[scope!=2]')))
+        self.assertEqual(['arifle_MX_F'], self._names(query(self.ast, 'CfgWeapons/*[scope=2][magazines]')))
+
+    def test_resolver(self):
+        resolver = InheritanceResolver(self.ast)
+        self.assertEqual(['arifle_MX_F', 'arifle_MX_SW_F'],
+                         self._names(query(self.ast, 'CfgWeapons/*[scope=2][magazines]', resolver)))
+        # inherited properties are the same node, so they are only returned once
+        result = query(self.ast, 'CfgWeapons/*[scope=2]/magazines', resolver)
+        self.assertEqual(1, len(result))
+        self.assertEqual(['WeaponSlotsInfo', 'scope', 'magazines', 'displayName'],
+                         self._names(query(self.ast, 'CfgWeapons/arifle_MX_Hidden_F/*', resolver)))
+
+    def test_descendants(self):
+        self.assertEqual(['MuzzleSlot'], self._names(query(self.ast, '**/MuzzleSlot')))
+        self.assertEqual(['CfgWeapons', 'Rifle_Base_F', 'arifle_MX_F', 'arifle_MX_SW_F', 'arifle_MX_Hidden_F',
+                          'WeaponSlotsInfo', 'MuzzleSlot'], self._names(query(self.ast, 'CfgWeapons/**')))
+        self.assertEqual(['arifle_MX_F', 'arifle_MX_SW_F'], self._names(query(self.ast, '**[scope=2]')))
+
+    def test_compile(self):
+        compiled = compile_query('CfgWeapons/*[scope=2]')
+        self.assertIs(compiled, compile_query('CfgWeapons/*[scope=2]'))
+        self.assertEqual(2, len(compiled.evaluate(self.ast)))
+        self.assertRaises(ValueError, compile_query, 'CfgWeapons/*[scope=2')
+        self.assertRaises(ValueError, compile_query, 'CfgWeapons//scope')
+        self.assertRaises(ValueError, compile_query, 'CfgWeapons/*[]')
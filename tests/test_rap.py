@@ -0,0 +1,183 @@
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+import armaclassparser
+from armaclassparser import generator, rap
+from armaclassparser.ast import ClassDefinition, structurally_equal
+from armaclassparser.diff import diff
+from armaclassparser.errors import RapError
+
+
+class TestRap(unittest.TestCase):
+
+    def test_compressed_int(self):
+        self.assertEqual(b'\x00', rap._compressed_int(0))
+        self.assertEqual(b'\x7f', rap._compressed_int(127))
+        self.assertEqual(b'\x80\x01', rap._compressed_int(128))
+        self.assertEqual(b'\xac\x02', rap._compressed_int(300))
+
+    def test_dumps(self):
+        input_data = """class Base;
+class Foo : Base {
+    name = "foo";
+    scope = 2;
+    mass = 1.5;
+    items[] = {1, "a", {2.5}};
+    class Inner {};
+};
+"""
+        ast = armaclassparser.parse_from_string(input_data)
+        # root body
+        root = b'\0' + b'\x02' + b'\x03Base\0' + b'\x00Foo\0' + b'FOO_'
+        foo_offset = 16 + len(root)
+        root = root.replace(b'FOO_', struct.pack('<I', foo_offset))
+        foo = b'Base\0' + b'\x05' \
+              + b'\x01\x00name\0foo\0' \
+              + b'\x01\x02scope\0' + struct.pack('<i', 2) \
+              + b'\x01\x01mass\0' + struct.pack('<f', 1.5) \
+              + b'\x02items\0\x03' + b'\x02' + struct.pack('<i', 1) + b'\x00a\0' + b'\x03\x01\x01' \
+              + struct.pack('<f', 2.5) \
+              + b'\x00Inner\0INR_'
+        inner_offset = foo_offset + len(foo)
+        foo = foo.replace(b'INR_', struct.pack('<I', inner_offset))
+        inner = b'\0\x00'
+        enum_offset = inner_offset + len(inner)
+        expected = b'\0raP' + struct.pack('<III', 0, 8, enum_offset) + root + foo + inner + struct.pack('<I', 0)
+        self.assertEqual(expected, rap.dumps(ast))
+
+        fp = io.BytesIO()
+        rap.dump(ast, fp)
+        self.assertEqual(expected, fp.getvalue())
+
+    def test_dumps_typed_arrays(self):
+        input_data = 'a[] = {1, 2, 3}; b[] = {0.5, 1.5};'
+        self.assertEqual(rap.dumps(armaclassparser.parse_from_string(input_data)),
+                         rap.dumps(armaclassparser.parse_from_string(input_data, keep_tokens=False, typed_arrays=True)))
+
+    def test_numbers(self):
+        self.assertEqual((rap.VALUE_LONG, struct.pack('<i', -5)), rap._number(-5))
+        self.assertEqual((rap.VALUE_INT64, struct.pack('<q', 2 ** 40)), rap._number(2 ** 40))
+        self.assertEqual((rap.VALUE_FLOAT, struct.pack('<f', 2.0 ** 40)), rap._number(2.0 ** 40))
+        self.assertRaises(RapError, rap._number, 1e300)
+        self.assertRaises(RapError, rap._number, 2 ** 63)
+
+    def test_int64_round_trip(self):
+        input_data = 'a = 3000000001; b = -1234567890123; c[] = {1, 1234567890123}; d = 2147483647;'
+        for typed_arrays in [False, True]:
+            ast = armaclassparser.parse_from_string(input_data, typed_arrays=typed_arrays)
+            loaded = rap.loads(rap.dumps(ast))
+            self.assertEqual([3000000001, -1234567890123, 2147483647],
+                             [loaded[0].right.value, loaded[1].right.value, loaded[3].right.value])
+            self.assertEqual([1, 1234567890123], [child.value for child in loaded[2].right.children])
+            self.assertEqual(generator.from_ast(ast), generator.from_ast(loaded))
+
+    def test_invalid(self):
+        ast = armaclassparser.parse_from_string('a = "x";')
+        ast[0].right.value = 'a\0b'
+        self.assertRaises(RapError, rap.dumps, ast)
+        ast = armaclassparser.parse_from_string('a = {1};', pre_process=False)
+        self.assertRaises(RapError, rap.dumps, ast)
+
+    INPUT_DATA = """class CfgPatches {
+    class my_addon {
+        units[] = {};
+        requiredVersion = 0.1;
+        author = "Schwaggot";
+    };
+};
+class CfgVehicles {
+    class Car;
+    class MyCar : Car {
+        scope = 2;
+        armor = 120.5;
+        hiddenSelections[] = {"camo", "camo2"};
+        positions[] = {{0, 1.25, -3}, {}};
+        class Turrets {
+            class MainTurret {
+                maxElev = 60;
+            };
+        };
+    };
+};
+"""
+
+    def test_round_trip(self):
+        ast = armaclassparser.parse_from_string(self.INPUT_DATA)
+        data = rap.dumps(ast)
+        for lazy in [False, True]:
+            loaded = rap.loads(data, lazy=lazy)
+            self.assertEqual(generator.from_ast(ast), generator.from_ast(loaded))
+            self.assertTrue(structurally_equal(ast, loaded))
+            self.assertEqual([], diff(ast, loaded))
+            self.assertEqual(data, rap.dumps(loaded))
+
+    def test_lazy(self):
+        data = rap.dumps(armaclassparser.parse_from_string(self.INPUT_DATA))
+        ast = rap.loads(data, lazy=True)
+        cfg_vehicles = ast[1]
+        self.assertIsInstance(cfg_vehicles, ClassDefinition)
+        self.assertIsNone(cfg_vehicles._body)
+        my_car = cfg_vehicles.get_class('mycar')
+        self.assertEqual('Car', my_car.parent_class)
+        self.assertIsNone(my_car._body)
+        self.assertIsNone(ast[0]._body)
+        self.assertEqual(2, my_car.get_property('scope').right.value)
+
+        my_car.body = []
+        self.assertEqual([], my_car.body)
+
+    def test_load_file(self):
+        data = rap.dumps(armaclassparser.parse_from_string(self.INPUT_DATA))
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'config.bin')
+            with open(file_path, 'wb') as fp:
+                fp.write(data)
+            ast = rap.load_file(file_path)
+            self.assertEqual('MainTurret', ast[1].body[1].get_class('Turrets').body[0].class_name)
+            with open(file_path, 'rb') as fp:
+                self.assertEqual(rap.dumps(ast), rap.dumps(rap.load(fp)))
+
+            open(file_path, 'wb').close()
+            self.assertRaises(RapError, rap.load_file, file_path)
+
+    def test_load_delete_and_append(self):
+        # scope = 2; delete Old; items[] += {1, "a"};
+        body = b'\0\x03' + b'\x01\x02scope\0' + struct.pack('<i', 2) + b'\x04Old\0' \
+            + b'\x05' + struct.pack('<I', 1) + b'items\0\x02' + b'\x02' + struct.pack('<i', 1) + b'\x00a\0'
+        data = b'\0raP' + struct.pack('<III', 0, 8, 16 + len(body)) + body + struct.pack('<I', 0)
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            ast = rap.loads(data)
+        self.assertEqual('scope = 2;\nitems[] = {1,"a"};\n', generator.from_ast(ast))
+        self.assertIn('delete Old', stderr.getvalue())
+        self.assertIn('items[] +=', stderr.getvalue())
+
+    def test_open_file(self):
+        data = rap.dumps(armaclassparser.parse_from_string(self.INPUT_DATA))
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'config.bin')
+            with open(file_path, 'wb') as fp:
+                fp.write(data)
+            with rap.open_file(file_path) as reader:
+                ast = reader.read()
+                self.assertEqual(2, ast[1].get_class('MyCar').get_property('scope').right.value)
+            self.assertIsNone(reader.data)
+            # bodies which have not been decoded before closing are no longer available
+            self.assertRaises(RapError, lambda: ast[0].body)
+
+    def test_load_values(self):
+        ast = rap.loads(rap.dumps(armaclassparser.parse_from_string('a = 0.1; b = -7; c = flag; d[] = {1, 2};')),
+                        typed_arrays=True)
+        self.assertEqual([0.1, -7], [ast[0].right.value, ast[1].right.value])
+        self.assertEqual('"flag"', str(ast[2].right))
+        self.assertEqual('q', ast[3].right.values.typecode)
+        self.assertEqual((1, 19), (ast[0].line_no, ast[0].line_pos))
+
+    def test_load_invalid(self):
+        self.assertRaises(RapError, rap.loads, b'class Foo {};')
+        data = rap.dumps(armaclassparser.parse_from_string(self.INPUT_DATA))
+        self.assertRaises(RapError, rap.loads, data[:40])
+        self.assertRaises(RapError, rap.loads, data[:16] + b'\0\x01\x09')
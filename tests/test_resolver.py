@@ -0,0 +1,119 @@
+import unittest
+
+import armaclassparser
+from armaclassparser.ast import ExternalClassReference
+from armaclassparser.errors import ResolutionError
+from armaclassparser.resolver import InheritanceResolver
+
+
+class TestResolver(unittest.TestCase):
+    input_data = """class CfgVehicles {
+    class AllVehicles {
+        scope = 0;
+        maxSpeed = 100;
+        class Turrets {
+            class MainTurret {
+                gunnerName = "Gunner";
+                optics = 1;
+            };
+        };
+    };
+    class Car : AllVehicles {
+        scope = 1;
+        class Turrets : Turrets {
+            class MainTurret : MainTurret {
+                optics = 2;
+            };
+        };
+    };
+    class MyCar : Car {
+        displayName = "My Car";
+    };
+    class Tank : Car {
+        class Turrets : Turrets {};
+    };
+};
+"""
+
+    def _resolve(self, input_data=None):
+        ast = armaclassparser.parse_from_string(input_data or self.input_data)
+        return InheritanceResolver(ast), ast
+
+    def test_parent(self):
+        resolver, ast = self._resolve()
+        cfg_vehicles = ast[0]
+        car = cfg_vehicles.get_class('Car')
+        my_car = cfg_vehicles.get_class('MyCar')
+        self.assertIs(car, resolver.get_parent(my_car))
+        self.assertIs(cfg_vehicles.get_class('AllVehicles'), resolver.get_parent(car))
+        self.assertIsNone(resolver.get_parent(cfg_vehicles))
+        self.assertEqual(['Car', 'AllVehicles'], [parent.class_name for parent in resolver.get_lineage(my_car)])
+
+    def test_properties(self):
+        resolver, ast = self._resolve()
+        my_car = ast[0].get_class('MyCar')
+        self.assertEqual(1, resolver.get_property(my_car, 'SCOPE').right.value)
+        self.assertEqual(100, resolver.get_property(my_car, 'maxSpeed').right.value)
+        self.assertEqual('My Car', resolver.get_property(my_car, 'displayName').right.value)
+        self.assertIsNone(resolver.get_property(my_car, 'armor'))
+        self.assertEqual(['scope', 'maxspeed', 'displayname'], list(resolver.get_properties(my_car)))
+
+    def test_nested_inheritance(self):
+        resolver, ast = self._resolve()
+        cfg_vehicles = ast[0]
+        all_vehicles_turret = cfg_vehicles.get_class('AllVehicles').get_class('Turrets').get_class('MainTurret')
+        car_turret = cfg_vehicles.get_class('Car').get_class('Turrets').get_class('MainTurret')
+        self.assertIs(all_vehicles_turret, resolver.get_parent(car_turret))
+        self.assertEqual(2, resolver.get_property(car_turret, 'optics').right.value)
+        self.assertEqual('Gunner', resolver.get_property(car_turret, 'gunnerName').right.value)
+
+        # MyCar inherits Turrets from Car without redefining it
+        my_car = cfg_vehicles.get_class('MyCar')
+        self.assertIs(cfg_vehicles.get_class('Car').get_class('Turrets'), resolver.get_class(my_car, 'turrets'))
+
+        # Tank >> Turrets inherits Car >> Turrets, including its MainTurret
+        tank_turrets = cfg_vehicles.get_class('Tank').get_class('Turrets')
+        self.assertIs(car_turret, resolver.get_class(tank_turrets, 'MainTurret'))
+
+    def test_external_reference(self):
+        resolver, ast = self._resolve("""class CfgWeapons {
+    class Rifle_Base_F;
+    class MyRifle : Rifle_Base_F {
+        scope = 2;
+    };
+};
+""")
+        my_rifle = ast[0].get_class('MyRifle')
+        self.assertIsInstance(resolver.get_parent(my_rifle), ExternalClassReference)
+        self.assertEqual(['scope'], list(resolver.get_properties(my_rifle)))
+
+    def test_enclosing_scope(self):
+        resolver, ast = self._resolve("""class Base { a = 1; };
+class CfgFoo {
+    class Foo : Base {};
+};
+""")
+        foo = ast[1].get_class('Foo')
+        self.assertIs(ast[0], resolver.get_parent(foo))
+        self.assertEqual(1, resolver.get_property(foo, 'a').right.value)
+
+    def test_unresolved(self):
+        input_data = "class Foo : Unknown { a = 1; };"
+        resolver, ast = self._resolve(input_data)
+        self.assertIsNone(resolver.get_parent(ast[0]))
+        self.assertEqual(1, resolver.get_property(ast[0], 'a').right.value)
+
+        ast = armaclassparser.parse_from_string(input_data)
+        resolver = InheritanceResolver(ast, strict=True)
+        self.assertRaises(ResolutionError, resolver.get_parent, ast[0])
+
+    def test_cycle(self):
+        resolver, ast = self._resolve("class A : B {}; class B : A {};")
+        self.assertRaises(ResolutionError, resolver.get_properties, ast[0])
+        self.assertRaises(ResolutionError, resolver.get_lineage, ast[0])
+
+    def test_cache(self):
+        resolver, ast = self._resolve()
+        my_car = ast[0].get_class('MyCar')
+        self.assertIs(resolver.get_properties(my_car), resolver.get_properties(my_car))
+        self.assertIn(id(ast[0].get_class('Car')), resolver._properties)
@@ -0,0 +1,110 @@
+import io
+import pickle
+import unittest
+
+import armaclassparser
+from armaclassparser import generator, serialize
+from armaclassparser.ast import ClassDefinition, IncludeStatement, structurally_equal
+from armaclassparser.errors import SerializationError
+
+INPUT_DATA = """class Base;
+class Foo : Base {
+    name = "foo";
+    scope = 2;
+    offset = -300;
+    mass = 1.5;
+    model = foo;
+    items[] = {1, "a", {2.5, {}}};
+    class Inner {};
+};
+"""
+
+
+class TestSerialize(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = armaclassparser.parse_from_string(INPUT_DATA, pre_process=False, keep_tokens=False)
+
+    def test_varint(self):
+        out = bytearray()
+        for value in (0, 127, 128, 300):
+            serialize._varint(out, value)
+        self.assertEqual(b'\x00\x7f\x80\x01\xac\x02', bytes(out))
+        self.assertEqual((300, 6), serialize._read_varint(out, 4))
+        for value in (0, -1, 1, -300, 2 ** 40):
+            self.assertEqual(value, serialize._unzigzag(serialize._zigzag(value)))
+
+    def test_round_trip(self):
+        loaded = serialize.loads(serialize.dumps(self.ast))
+        # equal including the positions
+        self.assertEqual(self.ast, loaded)
+        self.assertEqual(generator.from_ast(self.ast), generator.from_ast(loaded))
+        self.assertIs(loaded[1], loaded[1].body[5].parent)
+        self.assertIsInstance(loaded[1].body[2].right.value, int)
+        self.assertIsInstance(loaded[1].body[3].right.value, float)
+
+    def test_include_statement(self):
+        ast = [IncludeStatement.from_values('script_component.hpp', 3, 1)]
+        self.assertEqual(ast, serialize.loads(serialize.dumps(ast)))
+
+    def test_round_trip_tokens(self):
+        ast = armaclassparser.parse_from_string(INPUT_DATA, pre_process=False)
+        loaded = serialize.loads(serialize.dumps(ast))
+        self.assertIsNone(loaded[1].tokens)
+        self.assertEqual(ast, loaded)
+
+    def test_without_positions(self):
+        data = serialize.dumps(self.ast, positions=False)
+        self.assertLess(len(data), len(serialize.dumps(self.ast)))
+        loaded = serialize.loads(data)
+        self.assertTrue(structurally_equal(self.ast, loaded))
+        self.assertEqual((1, 1), (loaded[1].body[0].line_no, loaded[1].body[0].line_pos))
+
+    def test_typed_arrays(self):
+        ast = armaclassparser.parse_from_string('a[] = {1, -2, 3};\nb[] = {0.5, 1.25};\n', keep_tokens=False,
+                                                typed_arrays=True)
+        loaded = serialize.loads(serialize.dumps(ast))
+        self.assertEqual('q', loaded[0].right.values.typecode)
+        self.assertEqual([1, -2, 3], list(loaded[0].right.values))
+        self.assertEqual([0.5, 1.25], list(loaded[1].right.values))
+        self.assertTrue(structurally_equal(ast, loaded))
+
+    def test_strings_are_stored_once(self):
+        ast = armaclassparser.parse_from_string('class a { x = "value"; y = "value"; };', keep_tokens=False)
+        self.assertEqual(1, serialize.dumps(ast).count(b'value'))
+
+    def test_deep_nesting(self):
+        depth = 2000
+        ast = [ClassDefinition.from_values('c', [], None, 1, 1)]
+        node = ast[0]
+        for _ in range(depth):
+            child = ClassDefinition.from_values('c', [], None, 1, 1)
+            node.body = [child]
+            node = child
+        loaded = serialize.loads(serialize.dumps(ast))
+        for _ in range(depth + 1):
+            loaded = loaded[0].body
+        self.assertEqual([], loaded)
+
+    def test_smaller_than_pickle(self):
+        data = serialize.dumps(self.ast)
+        self.assertLess(len(data) * 4, len(pickle.dumps(self.ast, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def test_dump_load(self):
+        fp = io.BytesIO()
+        serialize.dump(self.ast, fp)
+        fp.seek(0)
+        self.assertEqual(self.ast, serialize.load(fp))
+
+    def test_invalid_data(self):
+        data = serialize.dumps(self.ast)
+        with self.assertRaises(SerializationError):
+            serialize.loads(b'class')
+        with self.assertRaises(SerializationError):
+            serialize.loads(data[:-3])
+        with self.assertRaises(SerializationError):
+            serialize.loads(data[:4] + b'\x63' + data[5:])
+
+
+if __name__ == '__main__':
+    unittest.main()